@@ -20,15 +20,56 @@ module Api
       end
     end
 
+    BULK_LIMIT = 500
+
+    # POST /api/job_listings/bulk with { job_listings: [{ job_url: ... }, ...] } (may be gzip-encoded).
+    # Existing rows are loaded with one query and all saves share one transaction; every listing
+    # gets its own result, in request order, so one invalid listing does not fail the batch.
+    def bulk
+      items = Array(params.require(:job_listings))
+      if items.size > BULK_LIMIT
+        return render json: { errors: ["at most #{BULK_LIMIT} listings per request"] }, status: :content_too_large
+      end
+
+      attrs_list = items.map { |item| item.permit(*PERMITTED_KEYS) }
+      existing = JobListing.where(job_url: attrs_list.map { |attrs| attrs[:job_url] }.compact).index_by(&:job_url)
+      results = JobListing.transaction do
+        attrs_list.map { |attrs| save_listing(attrs, existing) }
+      end
+      render json: { results: results }
+    end
+
     private
 
+    def save_listing(attrs, existing)
+      return { job_url: nil, status: "error", errors: ["job_url is required"] } if attrs[:job_url].blank?
+
+      jl = existing[attrs[:job_url]] ||= JobListing.new(job_url: attrs[:job_url])
+      # Same scraped-content fingerprint as the stored row: nothing to write
+      if jl.persisted? && attrs[:content_hash].present? && jl.content_hash == attrs[:content_hash]
+        return { job_url: jl.job_url, id: jl.id, status: "unchanged" }
+      end
+
+      created = jl.new_record?
+      jl.assign_attributes(attrs)
+      # Savepoint per listing: a database error rolls back only this one
+      saved = JobListing.transaction(requires_new: true) { jl.save }
+      if saved
+        { job_url: jl.job_url, id: jl.id, status: created ? "created" : "updated" }
+      else
+        { job_url: jl.job_url, status: "error", errors: jl.errors.full_messages }
+      end
+    rescue ActiveRecord::ActiveRecordError => e
+      { job_url: attrs[:job_url], status: "error", errors: [e.message] }
+    end
+
     PERMITTED_KEYS = [
       :job_url, :title, :description, :location, :post_date, :posted_time, :job_link, :fresh, :source, :listing_type,
       :relevance, :website_present, :website_url, :website_type, :classification_snippet,
       :facebook, :twitter, :linkedin, :instagram, :city, :state, :country, :industry, :owner_name,
       :manual_review, :email_pitch, :sms_pitch,
       :company_name, :contact_name, :contact_email, :contact_phone, :contact_role, :last_contacted_at, :contact_method,
-      :status, :project_type, :budget_min, :budget_max, :timezone,
+      :status, :project_type, :budget_min, :budget_max, :timezone, :content_hash,
       { emails: [], phones: [] }
     ]
 
@@ -38,10 +38,14 @@ class ScraperStatusController < ApplicationController
   def add_progress
     @scraper = Scraper.find(params[:id])
     session[:scraper_messages] ||= []
-    session[:scraper_messages] << {
-      timestamp: Time.current.to_s,
-      message: params[:message]
-    }
+    # The Python publisher batches messages as messages: [{ message:, timestamp: }, ...]
+    entries = params[:messages].presence || [{ message: params[:message] }]
+    entries.each do |entry|
+      session[:scraper_messages] << {
+        timestamp: entry[:timestamp].presence || Time.current.to_s,
+        message: entry[:message]
+      }
+    end
 
     render json: { success: true }
   end
@@ -3,7 +3,18 @@ class Scraper < ApplicationRecord
   validates :kind, inclusion: { in: %w[automated manual custom] }, allow_nil: true
   validates :status, inclusion: { in: %w[running paused needs_login setup error] }, allow_nil: true
 
+  DEFAULT_SEARCH_QUERIES = %w[www].freeze
+
   def display_status
     status.presence || "setup"
   end
+
+  # Search queries the Python collector paginates, from config_json's "queries" list
+  def search_queries
+    config = config_json.present? ? JSON.parse(config_json) : {}
+    queries = Array(config.is_a?(Hash) ? config["queries"] : nil).map { |q| q.to_s.strip }.reject(&:blank?).uniq
+    queries.presence || DEFAULT_SEARCH_QUERIES
+  rescue JSON::ParserError
+    DEFAULT_SEARCH_QUERIES
+  end
 end
@@ -1,7 +1,9 @@
 # frozen_string_literal: true
 
 class ScraperLauncher
-  def self.launch_upwork(hours: 24, pages: 3, scraper_id: nil)
+  def self.launch_upwork(hours: 24, pages: 3, scraper_id: nil, workers: ENV['SCRAPER_WORKERS'],
+                         worker_pause: ENV['SCRAPER_WORKER_PAUSE'], min_interval: ENV['SCRAPER_MIN_INTERVAL'],
+                         search_workers: ENV['SCRAPER_SEARCH_WORKERS'], browser: ENV['SCRAPER_BROWSER'])
     root = Rails.root.to_s
     # Build a DATABASE_URL from the current Rails DB config so Python writes to the same DB
     db_cfg = ActiveRecord::Base.connection_db_config.configuration_hash
@@ -27,6 +29,18 @@ class ScraperLauncher
       "/usr/bin/google-chrome"
     ]
     chrome_bin = chrome_candidates.find { |p| File.exist?(p) }
+
+    # Detail-scraping pool: worker browser count and pacing (read by run_upwork_latest.py)
+    pool_env = {}
+    pool_env['SCRAPER_WORKERS'] = workers.to_s if workers.present?
+    pool_env['SCRAPER_WORKER_PAUSE'] = worker_pause.to_s if worker_pause.present?
+    pool_env['SCRAPER_MIN_INTERVAL'] = min_interval.to_s if min_interval.present?
+    # Query fan-out: the scraper's configured queries and how many browsers paginate them at once
+    scraper = Scraper.find_by(id: scraper_id) if scraper_id.present?
+    pool_env['SCRAPER_QUERIES'] = scraper.search_queries.join(',') if scraper
+    pool_env['SCRAPER_SEARCH_WORKERS'] = search_workers.to_s if search_workers.present?
+    # auto/attach: reuse the warm logged-in Chrome kept by upwork_ai/browser_daemon.py when it is up
+    pool_env['SCRAPER_BROWSER'] = browser.to_s if browser.present?
     if RbConfig::CONFIG['host_os'] =~ /darwin/
       # Run Python process in background without terminal visibility
       upwork_email = ENV['UPWORK_EMAIL']
@@ -39,7 +53,7 @@ class ScraperLauncher
         'DATABASE_URL' => database_url,
         'SCRAPER_ID' => scraper_id.to_s,
         'RAILS_BASE_URL' => "http://localhost:4242"  # Match the port from terminal context
-      }.merge(extra_env)
+      }.merge(extra_env).merge(pool_env)
       env['CHROME_BIN'] = chrome_bin if chrome_bin
 
       runner = File.join(root, 'script', 'run_upwork_scraper.sh')
@@ -65,7 +79,7 @@ class ScraperLauncher
       end
     else
       # Fallback: run Python synchronously (not ideal)
-  env = { 'DATABASE_URL' => database_url, 'SCRAPER_ID' => scraper_id.to_s }
+  env = { 'DATABASE_URL' => database_url, 'SCRAPER_ID' => scraper_id.to_s }.merge(pool_env)
       env['CHROME_BIN'] = chrome_bin if chrome_bin
       system(env, 'python3', '-m', 'pip', 'install', '-r', File.join(root, 'upwork_ai', 'requirements.txt'))
       system(env, 'python3', File.join(root, 'upwork_ai', 'run_upwork_latest.py'), "--hours=#{hours}", "--pages=#{pages}")
@@ -0,0 +1,23 @@
+# Inflate gzip-encoded request bodies before Rails parses params.
+# The Python bulk uploader (upwork_ai/scraper/api_upload.py) gzips its JSON batches.
+class GzipRequestBody
+  def initialize(app)
+    @app = app
+  end
+
+  def call(env)
+    if env["HTTP_CONTENT_ENCODING"].to_s.casecmp?("gzip")
+      begin
+        body = ActiveSupport::Gzip.decompress(env["rack.input"].read)
+      rescue Zlib::Error
+        return [400, { "content-type" => "application/json" }, ['{"errors":["invalid gzip body"]}']]
+      end
+      env.delete("HTTP_CONTENT_ENCODING")
+      env["CONTENT_LENGTH"] = body.bytesize.to_s
+      env["rack.input"] = StringIO.new(body)
+    end
+    @app.call(env)
+  end
+end
+
+Rails.application.config.middleware.use GzipRequestBody
@@ -42,7 +42,11 @@ Rails.application.routes.draw do
   get "analytics", to: "analytics#index"
 
   namespace :api do
-    resources :job_listings, only: [:index, :create]
+    resources :job_listings, only: [:index, :create] do
+      collection do
+        post :bulk
+      end
+    end
     resources :scrapers, only: [] do
       member do
         post :complete
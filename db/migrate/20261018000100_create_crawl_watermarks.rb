@@ -0,0 +1,16 @@
+class CreateCrawlWatermarks < ActiveRecord::Migration[8.0]
+  def change
+    # Newest job seen per search query in the last successful Python scraper run;
+    # collectors stop paginating once they reach it
+    create_table :crawl_watermarks do |t|
+      t.string :source, null: false, default: "upwork"
+      t.string :query, null: false
+      t.string :last_job_url
+      t.datetime :last_posted_at
+      t.datetime :last_run_at
+      t.timestamps
+    end
+
+    add_index :crawl_watermarks, [:source, :query], unique: true
+  end
+end
@@ -0,0 +1,7 @@
+class AddContentHashToJobListings < ActiveRecord::Migration[8.0]
+  def change
+    # BLAKE2b fingerprint of the scraped title/description/location/posted_time, set by the
+    # Python scrapers; their upserts skip rows whose fingerprint has not changed
+    add_column :job_listings, :content_hash, :string
+  end
+end
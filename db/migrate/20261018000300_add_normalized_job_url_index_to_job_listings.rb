@@ -0,0 +1,7 @@
+class AddNormalizedJobUrlIndexToJobListings < ActiveRecord::Migration[8.0]
+  def change
+    # The Python scrapers' seen-URL index hashes job URLs without query string or trailing
+    # slash and confirms its hits against this same expression
+    add_index :job_listings, "rtrim(split_part(btrim(job_url), '?', 1), '/')", name: "index_job_listings_on_normalized_job_url"
+  end
+end
@@ -10,7 +10,7 @@
 #
 # It's strongly recommended that you check this file into your version control system.
 
-ActiveRecord::Schema[8.0].define(version: 2025_11_07_203805) do
+ActiveRecord::Schema[8.0].define(version: 2026_10_18_000300) do
   # These are extensions that must be enabled in order to support this database
   enable_extension "pg_catalog.plpgsql"
 
@@ -25,6 +25,17 @@ ActiveRecord::Schema[8.0].define(version: 2025_11_07_203805) do
     t.index ["status"], name: "index_campaigns_on_status"
   end
 
+  create_table "crawl_watermarks", force: :cascade do |t|
+    t.string "source", default: "upwork", null: false
+    t.string "query", null: false
+    t.string "last_job_url"
+    t.datetime "last_posted_at"
+    t.datetime "last_run_at"
+    t.datetime "created_at", null: false
+    t.datetime "updated_at", null: false
+    t.index ["source", "query"], name: "index_crawl_watermarks_on_source_and_query", unique: true
+  end
+
   create_table "job_listings", force: :cascade do |t|
     t.string "job_url", null: false
     t.string "title"
@@ -80,9 +91,11 @@ ActiveRecord::Schema[8.0].define(version: 2025_11_07_203805) do
     t.datetime "human_reviewed_at"
     t.datetime "ai_scanned_at"
     t.json "viability_analysis"
+    t.string "content_hash"
     t.index ["ai_relevance_score"], name: "index_job_listings_on_ai_relevance_score"
     t.index ["job_url"], name: "index_job_listings_on_job_url", unique: true
     t.index ["listing_type"], name: "index_job_listings_on_listing_type"
+    t.index "rtrim(split_part(btrim((job_url)::text), '?'::text, 1), '/'::text)", name: "index_job_listings_on_normalized_job_url"
     t.index ["project_type"], name: "index_job_listings_on_project_type"
     t.index ["relevance"], name: "index_job_listings_on_relevance"
     t.index ["scanned_for_company_details"], name: "index_job_listings_on_scanned_for_company_details"
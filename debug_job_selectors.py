@@ -7,31 +7,17 @@ import logging
 import time
 import os
 import sys
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import undetected_chromedriver
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-# Add the upwork_ai directory to path so we can import from main.py
-sys.path.insert(0, '/Users/antonioirizarry/Desktop/Projects/lead_system/upwork_ai')
-from main import JobListing, Base, setup_driver, manual_login
+# Add the upwork_ai directory to path so we can import from main.py (imported in main(), when needed)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'upwork_ai'))
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Database setup
-DATABASE_URL = "postgresql://postgres@localhost:5432/lead_system_development"
-engine = create_engine(DATABASE_URL, echo=False)
-Session = sessionmaker(bind=engine)
-session = Session()
-
-def inspect_job_page(driver, job_url, output_file):
-    """Visit a job page and save the HTML for inspection"""
+def inspect_job_page(driver, job_url, output_file, recorder=None):
+    """Visit a job page and save the HTML for inspection (and into the recorder's corpus session)"""
     try:
         logger.info(f"Visiting job page: {job_url}")
         driver.get(job_url)
@@ -45,6 +31,9 @@ def inspect_job_page(driver, job_url, output_file):
             f.write(page_html)
 
         logger.info(f"✅ Saved HTML to {output_file}")
+        if recorder is not None:
+            # Same record format as main.debug_job_page, so replay_corpus.py can run the parsers on it
+            logger.info(f"✅ Recorded page to {recorder.record(driver, 'detail')}")
 
         # Try to find and print key elements
         logger.info("\n=== ELEMENT INSPECTION ===\n")
@@ -126,6 +115,10 @@ def inspect_job_page(driver, job_url, output_file):
 
 
 def main():
+    from main import DATABASE_URL, RECORDER, JobListing, setup_driver, manual_login
+    from scraper.corpus import PageRecorder
+    from scraper.resources import get_session
+
     driver = None
     try:
         driver = setup_driver()
@@ -139,7 +132,7 @@ def main():
         manual_login(driver)
 
         # Get a job from database
-        fresh_job = session.query(JobListing).filter(JobListing.job_url != None).first()
+        fresh_job = get_session(DATABASE_URL).query(JobListing).filter(JobListing.job_url != None).first()
 
         if not fresh_job:
             logger.error("No jobs found in database!")
@@ -147,8 +140,9 @@ def main():
 
         logger.info(f"Inspecting job: {fresh_job.job_url}")
 
-        output_file = "/Users/antonioirizarry/Desktop/Projects/lead_system/debug_job_page.html"
-        inspect_job_page(driver, fresh_job.job_url, output_file)
+        output_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_job_page.html")
+        # Without SCRAPER_RECORD the inspected page still goes into a corpus session of its own
+        inspect_job_page(driver, fresh_job.job_url, output_file, recorder=RECORDER or PageRecorder())
 
         logger.info(f"\n✅ HTML saved to: {output_file}")
         logger.info("You can now open this file in a browser and inspect the structure!")
@@ -0,0 +1,87 @@
+require "test_helper"
+
+# POST /api/job_listings/bulk, as sent by upwork_ai/scraper/api_upload.py (gzip'd JSON batches)
+class ApiJobListingsBulkTest < ActionDispatch::IntegrationTest
+  JSON_HEADERS = { "Content-Type" => "application/json", "Accept" => "application/json" }.freeze
+
+  def post_bulk(listings, gzip: false)
+    body = { job_listings: listings }.to_json
+    headers = JSON_HEADERS
+    if gzip
+      body = ActiveSupport::Gzip.compress(body)
+      headers = headers.merge("Content-Encoding" => "gzip")
+    end
+    post bulk_api_job_listings_path, params: body, headers: headers
+  end
+
+  def results
+    response.parsed_body["results"]
+  end
+
+  test "plain JSON body creates listings with one result per listing" do
+    assert_difference "JobListing.count", 2 do
+      post_bulk([
+        { job_url: "https://www.upwork.com/jobs/~bulk1", title: "First" },
+        { job_url: "https://www.upwork.com/jobs/~bulk2", title: "Second" }
+      ])
+    end
+
+    assert_response :success
+    assert_equal %w[created created], results.map { |r| r["status"] }
+    assert_equal "First", JobListing.find_by(job_url: "https://www.upwork.com/jobs/~bulk1").title
+  end
+
+  test "gzip-encoded body is inflated before params are parsed" do
+    assert_difference "JobListing.count", 1 do
+      post_bulk([{ job_url: "https://www.upwork.com/jobs/~gzip1", title: "Gzipped" }], gzip: true)
+    end
+
+    assert_response :success
+    assert_equal "created", results.first["status"]
+    assert_equal "Gzipped", JobListing.find_by(job_url: "https://www.upwork.com/jobs/~gzip1").title
+  end
+
+  test "invalid gzip body is rejected" do
+    post bulk_api_job_listings_path, params: "not gzip", headers: JSON_HEADERS.merge("Content-Encoding" => "gzip")
+
+    assert_response :bad_request
+    assert_equal ["invalid gzip body"], response.parsed_body["errors"]
+  end
+
+  test "an invalid listing gets an error result without failing the others" do
+    JobListing.create!(job_url: "https://www.upwork.com/jobs/~known", title: "Old title")
+
+    assert_difference "JobListing.count", 1 do
+      post_bulk([
+        { job_url: "https://www.upwork.com/jobs/~known", title: "New title" },
+        { title: "No URL" },
+        { job_url: "https://www.upwork.com/jobs/~new", title: "New" }
+      ])
+    end
+
+    assert_response :success
+    assert_equal %w[updated error created], results.map { |r| r["status"] }
+    assert_equal ["job_url is required"], results.second["errors"]
+    assert_equal "New title", JobListing.find_by(job_url: "https://www.upwork.com/jobs/~known").title
+  end
+
+  test "a listing with an unchanged content hash is not rewritten" do
+    listing = JobListing.create!(job_url: "https://www.upwork.com/jobs/~same", title: "Same", content_hash: "abc123")
+
+    post_bulk([{ job_url: listing.job_url, title: "Same", content_hash: "abc123" }], gzip: true)
+
+    assert_response :success
+    assert_equal "unchanged", results.first["status"]
+    assert_equal listing.updated_at, listing.reload.updated_at
+  end
+
+  test "batches over the limit are refused as content too large" do
+    listings = Array.new(Api::JobListingsController::BULK_LIMIT + 1) { |i| { job_url: "https://www.upwork.com/jobs/~#{i}" } }
+
+    assert_no_difference "JobListing.count" do
+      post_bulk(listings, gzip: true)
+    end
+
+    assert_response :content_too_large
+  end
+end
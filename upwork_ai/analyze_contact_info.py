@@ -8,34 +8,26 @@ import re
 import json
 import logging
 from datetime import datetime
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
 import sys
 import argparse
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("contact_analyzer.log"),
-        logging.StreamHandler()
-    ]
-)
+from scraper.resources import close_session, get_engine, get_session
 
 logger = logging.getLogger(__name__)
 
-# Database connection
-DATABASE_URL = "postgresql://postgres@localhost:5432/lead_system_development"
+def configure_logging():
+    """Log to contact_analyzer.log and the console; called by main(), not at import"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler("contact_analyzer.log"),
+            logging.StreamHandler()
+        ]
+    )
 
-try:
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    logger.info(f"Connected to database: {DATABASE_URL}")
-except Exception as e:
-    logger.error(f"Failed to connect to database: {e}")
-    sys.exit(1)
+# Database connection (opened by main(), not at import)
+DATABASE_URL = "postgresql://postgres@localhost:5432/lead_system_development"
 
 class ContactInfoAnalyzer:
     def __init__(self):
@@ -198,7 +190,10 @@ class ContactInfoAnalyzer:
 
 def analyze_job_listings(limit=None, job_id=None):
     """Analyze job listings for contact information"""
+    from sqlalchemy import text
+
     analyzer = ContactInfoAnalyzer()
+    session = get_session(DATABASE_URL)
 
     # Build query
     if job_id:
@@ -281,6 +276,14 @@ def main():
     parser.add_argument('--job-id', type=int, help='Analyze specific job by ID')
 
     args = parser.parse_args()
+    configure_logging()
+
+    try:
+        with get_engine(DATABASE_URL).connect():
+            logger.info(f"Connected to database: {DATABASE_URL}")
+    except Exception as e:
+        logger.error(f"Failed to connect to database: {e}")
+        sys.exit(1)
 
     try:
         analyze_job_listings(limit=args.limit, job_id=args.job_id)
@@ -289,7 +292,7 @@ def main():
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
     finally:
-        session.close()
+        close_session(DATABASE_URL)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
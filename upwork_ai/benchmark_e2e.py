@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark: run_upwork_latest.main() in headless Chrome against the mock server.
+
+    python3 upwork_ai/benchmark_e2e.py --pages 3 --latency 120
+    python3 upwork_ai/benchmark_e2e.py --pages 3 --workers 3 --challenge-rate 0.05
+    python3 upwork_ai/benchmark_e2e.py --fetch-mode http --workers 4
+    python3 upwork_ai/benchmark_e2e.py --database-url postgresql+pg8000://postgres@localhost:5432/lead_system_bench
+
+The whole path runs: setup_driver -> wait_for_login -> search pagination -> scrape_job_details -> write.
+Without --database-url, jobs are uploaded to the mock server's /api/job_listings sink, so no database is
+touched; with it, the batch writer upserts there (use a scratch database, not the development one).
+Human pacing is switched off so the numbers measure the scraper, not the sleeps.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from mock_upwork_server import add_site_arguments, site_from_args, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark run_upwork_latest end to end against a mock Upwork")
+    add_site_arguments(parser)
+    parser.add_argument("--workers", type=int, default=1, help="Detail workers (browsers, or connections with --fetch-mode http)")
+    parser.add_argument("--fetch-mode", choices=["browser", "http"], default="browser")
+    parser.add_argument("--driver", choices=["selenium", "uc"], default="selenium")
+    parser.add_argument("--database-url", default=None, help="Upsert jobs into this (scratch) database")
+    parser.add_argument("--headed", action="store_true", help="Show the Chrome window")
+    args = parser.parse_args()
+
+    site = site_from_args(args)
+    server, base_url = start_server(site)
+    scratch = tempfile.mkdtemp(prefix="upwork_bench_")
+    # run_upwork_latest and scraper.* read these at import time
+    os.environ.update({
+        "UPWORK_BASE_URL": base_url,
+        "RAILS_BASE_URL": base_url,
+        "SCRAPER_ID": "benchmark",
+        "SCRAPER_HEADLESS": "0" if args.headed else "1",
+        "SCRAPER_PACE_SEARCH": "0,0",
+        "SCRAPER_PACE_DETAIL": "0,0",
+        "SCRAPER_JOURNAL": os.path.join(scratch, "run_journal.jsonl"),
+        "SEEN_URLS_PATH": os.path.join(scratch, "seen_urls.idx"),
+        "SCRAPER_QUERIES": "www",
+    })
+    if args.database_url:
+        os.environ.update({"UPLOAD_DEST": "db", "DATABASE_URL": args.database_url})
+    else:
+        os.environ.update({"UPLOAD_DEST": "api", "RAILS_API_URL": f"{base_url}/api/job_listings"})
+
+    import run_upwork_latest
+
+    sys.argv = [
+        "run_upwork_latest.py", f"--pages={args.pages}", "--hours=10000", f"--driver={args.driver}",
+        f"--fetch-mode={args.fetch_mode}", f"--workers={args.workers}", "--worker-pause=0,0", "--min-interval=0",
+    ]
+    print(f"[Bench] Mock Upwork at {base_url}; running {' '.join(sys.argv[1:])}")
+    start = time.perf_counter()
+    saved = run_upwork_latest.main()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    if saved is None:
+        print(f"[Bench] Run did not complete after {elapsed:.1f}s; mock counters {site.counts}")
+        return 1
+    print(f"[Bench] {saved} jobs saved in {elapsed:.1f}s: {saved / elapsed * 60:.1f} jobs/minute end to end")
+    print(f"[Bench] Mock served {site.counts['search']} search pages, {site.counts['detail']} detail pages, "
+          f"{site.counts['challenge']} challenges; {site.counts['uploaded']} API uploads")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
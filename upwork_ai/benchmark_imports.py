@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long importing each script takes, measured with `python -X importtime`.
+
+    python3 upwork_ai/benchmark_imports.py
+    python3 upwork_ai/benchmark_imports.py --budget-ms 400 --top 10
+    python3 upwork_ai/benchmark_imports.py main analyze_contact_info
+
+Every module is imported in a fresh interpreter (--runs times, best run kept) with upwork_ai/ and the
+repository root on sys.path, the way the scripts run. Importing a script must not connect to Postgres,
+start a browser or load a spaCy model (those are created on first use, see scraper/resources.py), so
+the cumulative import time should stay within --budget-ms. The heaviest imports underneath are listed
+to show what to defer next. Exits 1 when a module fails to import or is over budget.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+DEFAULT_MODULES = ["main", "analyze_contact_info", "original_scrapy", "debug_job_selectors"]
+
+# import time:      self [us] |  cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure(module):
+    """(cumulative seconds, [(cumulative seconds, name) of its direct imports], error) for one fresh import."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [HERE, ROOT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    total, imports = None, []
+    children = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)) / 1e6, len(match.group(3)), match.group(4)
+        if indent == 3:
+            # A module's imports are printed before the module itself
+            children.append((cumulative, name))
+        elif indent == 1:
+            if name == module:
+                total, imports = cumulative, children
+            children = []
+    if result.returncode != 0 or total is None:
+        lines = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        return None, [], (lines[-1] if lines else f"exit status {result.returncode}")
+    return total, sorted(imports, reverse=True), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-script import time against a budget")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import (default: %(default)s)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("IMPORT_BUDGET_MS", "750")),
+                        help="Maximum cumulative import time per module (default 750, or IMPORT_BUDGET_MS)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest direct imports to list per module")
+    args = parser.parse_args()
+
+    failed = 0
+    print(f"[Imports] Budget {args.budget_ms:.0f} ms per module, best of {args.runs} ({sys.executable})")
+    for module in args.modules:
+        best = None
+        for _ in range(args.runs):
+            total, children, error = measure(module)
+            if error:
+                break
+            if best is None or total < best[0]:
+                best = (total, children)
+        if error:
+            failed += 1
+            print(f"[Imports] {module}: import failed: {error}")
+            continue
+        total, children = best
+        over = total * 1000 > args.budget_ms
+        failed += over
+        print(f"[Imports] {module}: {total * 1000:.0f} ms {'OVER BUDGET' if over else 'ok'}")
+        for cumulative, name in children[:args.top]:
+            print(f"[Imports]     {cumulative * 1000:7.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
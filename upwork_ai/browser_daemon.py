@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Keep one logged-in Chrome warm so scraper runs can attach to it instead of starting their own.
+
+    python3 upwork_ai/browser_daemon.py                 # port 9222, stable chrome_profile
+    python3 upwork_ai/browser_daemon.py --port 9333 --check-every 120
+
+Chrome is started with --remote-debugging-port on upwork_ai/chrome_profile and its debuggerAddress
+is written to upwork_ai/browser_daemon.json (SCRAPER_DAEMON_STATE). run_upwork_latest.py attaches to it
+(--browser auto/attach, SCRAPER_BROWSER). Every --check-every seconds, while no run holds the lease,
+the daemon reads the auth cookies; only when they have expired does it open the login page and signal
+Rails that a login is needed. Chrome is restarted if it exits.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import threading
+import time
+
+import requests
+
+from scraper.chrome import HEADLESS, STABLE_PROFILE, find_chrome_binary
+from scraper.rails import send_to_rails
+from scraper.site import LOGIN_URL
+from scraper.warm_browser import (PREPARED_KEY, STATE_PATH, RunLease, attach_driver, detach_driver, read_state,
+                                  session_status, write_state)
+
+
+def launch_chrome(port: int, profile_dir: str):
+    binary = find_chrome_binary() or "google-chrome"
+    os.makedirs(profile_dir, exist_ok=True)
+    args = [
+        binary,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={profile_dir}",
+        "--profile-directory=Default",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--disable-blink-features=AutomationControlled",
+        "--lang=en-US,en;q=0.9",
+        "--window-size=1280,900",
+    ]
+    if HEADLESS:
+        args.append("--headless=new")
+    print(f"[Daemon] Starting {binary} on port {port} with profile {profile_dir}")
+    return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_devtools(address: str, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://{address}/json/version", timeout=1).raise_for_status()
+            return True
+        except Exception:
+            time.sleep(0.5)
+    return False
+
+
+def check_session(address: str, open_login: bool):
+    """Attach briefly, read session health, and open the login page when asked to."""
+    driver = attach_driver(address)
+    try:
+        logged_in, expires = session_status(driver)
+        if not logged_in and open_login:
+            driver.get(LOGIN_URL)
+        return logged_in, expires
+    finally:
+        detach_driver(driver)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm, logged-in Chrome shared by scraper runs")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SCRAPER_DAEMON_PORT", "9222")))
+    parser.add_argument("--profile", default=STABLE_PROFILE)
+    parser.add_argument("--check-every", type=float, default=60.0, help="Seconds between session health checks")
+    args = parser.parse_args()
+
+    address = f"127.0.0.1:{args.port}"
+    state = {"pid": os.getpid(), "debugger_address": address, "profile": args.profile,
+             "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "status": "starting"}
+    chrome = None
+    # Set by SIGTERM; the loop waits on it between checks so shutdown does not sit out --check-every
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    def save_state():
+        # Runs record which tab has the stealth scripts (see scraper.warm_browser); keep that entry
+        state[PREPARED_KEY] = read_state().get(PREPARED_KEY)
+        write_state(state)
+
+    try:
+        while not stopping.is_set():
+            if chrome is None or chrome.poll() is not None:
+                if chrome is not None:
+                    print(f"[Daemon] Chrome exited ({chrome.returncode}); restarting")
+                chrome = launch_chrome(args.port, args.profile)
+                if not wait_for_devtools(address):
+                    print("[Daemon] Chrome did not expose DevTools in time; retrying")
+                    chrome.kill()
+                    continue
+                state.update({"chrome_pid": chrome.pid, "status": "unknown"})
+                save_state()
+
+            lease = RunLease()
+            if lease.acquire():
+                try:
+                    was = state.get("status")
+                    logged_in, expires = check_session(address, open_login=was != "needs_login")
+                    state.update({
+                        "status": "ok" if logged_in else "needs_login",
+                        "expires_at": expires,
+                        "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    })
+                    if not logged_in and was != "needs_login":
+                        print("[Daemon] Session cookies missing or expired; log in in the daemon's Chrome window")
+                        send_to_rails("signal_login_ready")
+                    elif logged_in and was != "ok":
+                        print("[Daemon] Session valid; runs can attach")
+                    if expires and expires - time.time() < args.check_every:
+                        print("[Daemon] Session expires before the next check")
+                except Exception as e:
+                    print(f"[Daemon] Health check failed: {e}")
+                finally:
+                    save_state()  # under the lease, so it cannot interleave with a run's record_stealth
+                    lease.release()
+            stopping.wait(args.check_every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("[Daemon] Shutting down")
+        if chrome is not None and chrome.poll() is None:
+            chrome.terminate()
+        if read_state().get("pid") == os.getpid():
+            os.remove(STATE_PATH)
+
+
+if __name__ == "__main__":
+    main()
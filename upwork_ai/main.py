@@ -1,7 +1,4 @@
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import re
 import time
@@ -9,43 +6,52 @@ import random
 import pdb
 import logging
 
-# Configure the logging system
-logging.basicConfig(
-    level=logging.DEBUG,  # Log everything from DEBUG level and above
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.FileHandler("scraper.log"),  # Save logs to a file
-        logging.StreamHandler()  # logger.info logs to the console
-    ]
-)
-
-# Create a logger instance
+# Create a logger instance; handlers are attached by configure_logging() when main() runs,
+# so importing this module does not create scraper.log
 logger = logging.getLogger(__name__)
 
+
+def configure_logging():
+    logging.basicConfig(
+        level=logging.DEBUG,  # Log everything from DEBUG level and above
+        format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
+        handlers=[
+            logging.FileHandler("scraper.log"),  # Save logs to a file
+            logging.StreamHandler()  # logger.info logs to the console
+        ]
+    )
+
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Boolean, Text
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import os
+from scraper.pipeline import StreamingPipeline
+from scraper.batch_writer import JobDetailsWriter, flush_on_exit
+from scraper.blocking import ResourceBlocker, page_load_strategy
+from scraper.readiness import PageReadiness
+from scraper.corpus import PageRecorder
+from scraper.strategies import StrategyRegistry
+from scraper.text_blocks import scan_text_blocks
+from scraper.seen_urls import fetch_known_urls, load_seen_urls
+from scraper.watermarks import load_watermark, posted_at_from_label, save_watermark
+from scraper.site import LOGIN_URL, search_url
+from scraper.resources import close_session, get_engine, get_session
+try:
+    from scraper.page_parser import parse_job_details, parse_search_page  # requires lxml
+except Exception:
+    parse_job_details = None
+    parse_search_page = None
+
+# Upwork search query the collector paginates (recency-sorted); also keys the crawl watermark
+SEARCH_QUERY = os.environ.get("SCRAPER_QUERY", "www")
+
+# "live" extracts through WebDriver element calls; "offline" snapshots page_source once and parses with lxml
+PARSE_MODE = os.environ.get("SCRAPER_PARSE_MODE", "live").lower()
 
-# Setting up SQLAlchemy - Connect to Rails database (lead_system_development)
+# Rails database (lead_system_development); the engine and session are created on first use
 DATABASE_URL = "postgresql://postgres@localhost:5432/lead_system_development"
 
-try:
-    Base = declarative_base()
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    # Test connection
-    with engine.connect() as conn:
-        pass
-    logger.info(f"Connected to Rails database: {DATABASE_URL}")
-except Exception as e:
-    logger.error(f"Failed to connect to database {DATABASE_URL}: {e}")
-    logger.info("Cannot proceed without database connection")
-    Base = declarative_base()
-    engine = None
-    session = None
+Base = declarative_base()
 
 # Define JobListing model (mirror of Rails model)
 class JobListing(Base):
@@ -67,6 +73,8 @@ class JobListing(Base):
 # Setup the Chrome driver with necessary options
 def setup_driver():
     logger.info("Setting up Chrome driver...")
+    import undetected_chromedriver as uc  # ~0.5s to import; only paid when a browser is wanted
+
     chrome_options = uc.ChromeOptions()
 
     # Use modern user agent with realistic Chrome version
@@ -80,6 +88,7 @@ def setup_driver():
     chrome_options.add_argument("--no-first-run")
     chrome_options.add_argument("--no-default-browser-check")
     chrome_options.add_argument("--lang=en-US,en;q=0.9")
+    chrome_options.page_load_strategy = page_load_strategy()
 
     # Detect Chrome binary
     chrome_binary = os.environ.get("CHROME_BIN")
@@ -104,6 +113,9 @@ def setup_driver():
     driver = uc.Chrome(options=chrome_options, use_subprocess=False, version_main=141)
     driver.set_window_size(1920, 1080)
 
+    # Request-blocking profile (images, media, fonts, trackers by default; see SCRAPER_BLOCK)
+    BLOCKER.apply(driver)
+
     # Add anti-bot detection JavaScript
     try:
         driver.execute_cdp_cmd(
@@ -125,7 +137,7 @@ def setup_driver():
 
 # Function to manually login and prompt user to continue after completing manual steps
 def manual_login(driver):
-    upwork_login_url = 'https://www.upwork.com/ab/account-security/login'
+    upwork_login_url = LOGIN_URL
     logger.info(f"Navigating to Upwork login page: {upwork_login_url}")
     driver.get(upwork_login_url)
 
@@ -143,6 +155,16 @@ def manual_login(driver):
 def human_delay(min_time=2, max_time=5):
     time.sleep(random.uniform(min_time, max_time))
 
+# Readiness waits replace the fixed sleeps after navigation; pacing (SCRAPER_PACE_SEARCH / SCRAPER_PACE_DETAIL)
+# only pads the remaining time to a target measured from the start of navigation
+BLOCKER = ResourceBlocker.from_env()
+# Stats are read from strategy_stats.json on the first extraction, not at import
+STRATEGIES = StrategyRegistry.lazy()
+STRATEGIES.fallbacks.update({("description", "largest main div"), ("description", "paragraphs"), ("description", "body text")})
+RECORDER = PageRecorder.from_env()
+SEARCH_READY = PageReadiness("search", pace=(5, 7), meter=BLOCKER, recorder=RECORDER)
+DETAIL_READY = PageReadiness("detail", pace=(3, 5), meter=BLOCKER, recorder=RECORDER)
+
 # Function to convert relative time like '1 hour ago' and '2 hours ago' into a datetime object
 def parse_post_date(post_date_str):
     now = datetime.now()
@@ -195,48 +217,79 @@ def parse_post_date(post_date_str):
         logger.error(f"❌ Error parsing post date: {post_date_str}. Exception: {e}")
         return now
 
-def get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5):
+def get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5, seen_urls=None, parse_mode="live", watermark=None):
+    return [job for page_jobs in iter_job_url_pages(driver, max_hours_old, consecutive_old_limit, seen_urls, parse_mode, watermark)
+            for job in page_jobs]
+
+# Generator form of get_job_urls: yields the jobs added from each search page as soon as it is processed.
+# With a watermark, pagination stops as soon as the newest job of the last successful run is reached.
+def iter_job_url_pages(driver, max_hours_old=72, consecutive_old_limit=5, seen_urls=None, parse_mode="live", watermark=None):
     logger.info(f"🎯 Starting job URL collection with parameters:")
     logger.info(f"   → Max job age: {max_hours_old/24:.1f} days ({max_hours_old} hours)")
     logger.info(f"   → Stop after {consecutive_old_limit} consecutive old jobs")
+    if watermark is not None:
+        logger.info(f"   → Stop at watermark {watermark}")
 
     page_number = 1
     all_job_urls = []
-    jobs_url_template = "https://www.upwork.com/nx/search/jobs/?q=www&sort=recency&page={}&per_page=50"
     consecutive_old_count = 0  # Counter for consecutive old posts
     duplicate_count = 0  # Counter for consecutive duplicates
     total_processed = 0
     total_added = 0
     total_duplicates = 0
     total_too_old = 0
+    total_lookup_seconds = 0.0
 
     while True:
-        jobs_url = jobs_url_template.format(page_number)
+        page_start = len(all_job_urls)
+        jobs_url = search_url(SEARCH_QUERY, page_number)
         logger.info(f"📄 Scraping page {page_number}: {jobs_url}")
         logger.info(f"   📊 Progress so far: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old")
 
         try:
             logger.debug(f"   🌐 Navigating to page {page_number}...")
+            started = time.monotonic()
             driver.get(jobs_url)
             logger.debug(f"   ⏳ Waiting for page to load...")
-            human_delay(5, 7)
+            SEARCH_READY.settle(driver, started, css="article[data-test='JobTile'] h2 a")
 
             logger.debug(f"   🔍 Searching for job elements on page {page_number}...")
-            job_elements = driver.find_elements(By.XPATH, "//article[@data-test='JobTile']//h2[@class='h5 mb-0 mr-2 job-tile-title']//a")
-            date_elements = driver.find_elements(By.XPATH, "//article[@data-test='JobTile']//small[@data-test='job-pubilshed-date']//span[last()]")
+            if parse_mode == "offline":
+                parse_start = time.perf_counter()
+                job_urls, job_dates = parse_search_page(driver.page_source)
+                logger.debug(f"   🧩 Parsed page snapshot in {(time.perf_counter() - parse_start)*1000:.1f} ms")
 
-            logger.info(f"   ✅ Found {len(job_elements)} job elements and {len(date_elements)} date elements on page {page_number}")
+                logger.info(f"   ✅ Found {len(job_urls)} job elements and {len(job_dates)} date elements on page {page_number}")
 
-            if len(job_elements) == 0 or len(date_elements) == 0:
-                logger.info(f"   ⛔ No more jobs found or date elements are missing on page {page_number}. Stopping pagination.")
-                break
+                if len(job_urls) == 0 or len(job_dates) == 0:
+                    logger.info(f"   ⛔ No more jobs found or date elements are missing on page {page_number}. Stopping pagination.")
+                    break
+                job_dates = job_dates[:len(job_urls)]
+            else:
+                job_elements = driver.find_elements(By.XPATH, "//article[@data-test='JobTile']//h2[@class='h5 mb-0 mr-2 job-tile-title']//a")
+                date_elements = driver.find_elements(By.XPATH, "//article[@data-test='JobTile']//small[@data-test='job-pubilshed-date']//span[last()]")
+
+                logger.info(f"   ✅ Found {len(job_elements)} job elements and {len(date_elements)} date elements on page {page_number}")
+
+                if len(job_elements) == 0 or len(date_elements) == 0:
+                    logger.info(f"   ⛔ No more jobs found or date elements are missing on page {page_number}. Stopping pagination.")
+                    break
 
-            # Filter out None URLs and ensure we have valid job URLs
-            job_urls = [job.get_attribute('href') for job in job_elements if job.get_attribute('href') is not None]
-            job_dates = [date.text for date in date_elements[:len(job_urls)]]  # Match the length
+                # Filter out None URLs and ensure we have valid job URLs
+                job_urls = [job.get_attribute('href') for job in job_elements if job.get_attribute('href') is not None]
+                job_dates = [date.text for date in date_elements[:len(job_urls)]]  # Match the length
 
             logger.debug(f"   📝 Processing {len(job_urls)} valid job URLs from page {page_number}")
 
+            # Only URLs the local seen-URL index reports as stored need a database confirmation,
+            # and those are resolved for the whole page in one round trip
+            lookup_start = time.perf_counter()
+            candidates = [url for url in job_urls if url in seen_urls] if seen_urls is not None else job_urls
+            known_urls = find_jobs_in_database(candidates) if candidates else set()
+            lookup_seconds = time.perf_counter() - lookup_start
+            total_lookup_seconds += lookup_seconds
+            logger.info(f"   🗄️  Duplicate lookup: {len(known_urls)}/{len(job_urls)} already stored, {len(candidates)} confirmed in DB ({lookup_seconds*1000:.1f} ms)")
+
             for i, job_url in enumerate(job_urls):
                 total_processed += 1
                 logger.debug(f"      [{i+1}/{len(job_urls)}] Processing job: {job_url[:80]}...")
@@ -247,16 +300,27 @@ def get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5):
                         logger.info(f"      ⚠️  Skipping empty or invalid job URL at index {i}")
                         continue
 
+                    # Stop paginating once we reach what the last successful run already covered
+                    if watermark is not None:
+                        mark_date = posted_at_from_label(job_dates[i]) if i < len(job_dates) else None
+                        watermark.observe(job_url, mark_date)
+                        if watermark.crossed(job_url, mark_date):
+                            logger.info(f"   ⛔ Reached crawl watermark at {job_url[:80]}. Stopping pagination.")
+                            logger.info(f"   📊 Final stats: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old, {total_processed} total processed, {total_lookup_seconds:.2f}s in duplicate lookups")
+                            yield all_job_urls[page_start:]
+                            return
+
                     # Check for duplicates first
-                    if is_job_in_database(job_url):
+                    if job_url in known_urls:
                         logger.debug(f"      🔄 Job URL already in database. Skipping.")
                         duplicate_count += 1
                         total_duplicates += 1
                         # If we see too many consecutive duplicates, we might be hitting old content
                         if duplicate_count >= 10:
                             logger.info(f"   ⛔ Found {duplicate_count} consecutive duplicates. Likely hitting old content. Stopping pagination.")
-                            logger.info(f"   📊 Final stats: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old, {total_processed} total processed")
-                            return all_job_urls
+                            logger.info(f"   📊 Final stats: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old, {total_processed} total processed, {total_lookup_seconds:.2f}s in duplicate lookups")
+                            yield all_job_urls[page_start:]
+                            return
                         continue
                     else:
                         # Reset duplicate counter when we find a new job
@@ -276,21 +340,27 @@ def get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5):
                         # Stop sooner when hitting old content since jobs are sorted by recency
                         if consecutive_old_count >= consecutive_old_limit:
                             logger.info(f"   ⛔ Reached limit of {consecutive_old_limit} consecutive old jobs. Stopping pagination.")
-                            logger.info(f"   📊 Final stats: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old, {total_processed} total processed")
-                            return all_job_urls
+                            logger.info(f"   📊 Final stats: {total_added} jobs added, {total_duplicates} duplicates, {total_too_old} too old, {total_processed} total processed, {total_lookup_seconds:.2f}s in duplicate lookups")
+                            yield all_job_urls[page_start:]
+                            return
                         continue
 
                     # Reset consecutive_old_count if a recent job is found
                     consecutive_old_count = 0
                     all_job_urls.append((job_url, job_date_str, job_post_date))
+                    if watermark is not None:
+                        watermark.hold(job_url)  # released once its details are written
                     total_added += 1
                     logger.debug(f"      ✅ Added job {total_added}: {job_url[:60]}... (Age: {job_age_in_days:.1f}d)")
                 except Exception as e:
                     logger.warning(f"      ❌ Error processing job URL {job_url}: {e}")
+                    if watermark is not None and job_url:
+                        watermark.hold(job_url)  # never handled; the mark must not pass it
                     continue
 
-            logger.info(f"   ✅ Page {page_number} complete: {len([url for url, _, _ in all_job_urls if any(url == u for u, _, _ in all_job_urls[-len(job_urls):])])} jobs added from this page")
+            logger.info(f"   ✅ Page {page_number} complete: {len(all_job_urls) - page_start} jobs added from this page")
             page_number += 1
+            yield all_job_urls[page_start:]
 
         except Exception as e:
             logger.error(f"   ❌ Error scraping page {page_number}: {e}")
@@ -302,12 +372,96 @@ def get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5):
     logger.info(f"   ❌ {total_too_old} jobs too old")
     logger.info(f"   📄 {page_number-1} pages processed")
     logger.info(f"   📈 {total_processed} total jobs examined")
-    return all_job_urls
+    logger.info(f"   🗄️  {total_lookup_seconds:.2f}s spent in duplicate lookups")
+
+
+
+def find_jobs_in_database(job_urls):
+    """Return the subset of job_urls already stored, using a single indexed query."""
+    with get_engine(DATABASE_URL).connect() as conn:
+        return fetch_known_urls(conn, job_urls)
+
+# Extraction strategies for scrape_job_details, as (name, fn) pairs; fn returns stripped text or None
+LOCATION_XPATHS = [
+    # Primary: Upwork's standard location element (Air3 design)
+    "//div[@class='d-inline-flex align-items-center text-base-sm']//p[@class='text-light-on-muted m-0']",
+    # Fallback: Any p tag with light muted text (may catch location)
+    "//p[contains(@class, 'text-light-on-muted m-0')]",
+    # Old fallback: data-test attribute
+    "//*[@data-test='LocationLabel']",
+    # Old fallback: div with location class
+    "//div[contains(@class, 'location')]/span",
+    # Old fallback: Text-based search
+    "//*[contains(text(), 'Location')]//following-sibling::*[1]",
+]
+
+POSTED_TIME_XPATHS = [
+    # Primary: Upwork Air3 design system - posted line section (gets just the time)
+    "//div[@class='posted-on-line']//span",
+    # Fallback: div containing "Posted" text then next span
+    "//div[contains(text(), 'Posted')]//span",
+    # Old fallback: data-test attribute
+    "//*[@data-test='PostedOn']",
+    # Old fallback: span with Posted text
+    "//span[contains(text(), 'Posted')]",
+]
+
+def _element_text(driver, by, selector):
+    return driver.find_element(by, selector).text.strip() or None
+
+def title_strategies(driver):
+    def main_heading():
+        headings = driver.find_elements(By.XPATH, "//main//h1 | //main//h2 | //main//h3 | //article//h1 | //article//h2")
+        return headings[0].text.strip() if headings else None
+    return [
+        ("h1", lambda: _element_text(driver, By.TAG_NAME, "h1")),
+        ("h4.d-flex span.flex-1", lambda: _element_text(driver, By.CSS_SELECTOR, "h4.d-flex span.flex-1")),
+        ("h2", lambda: _element_text(driver, By.TAG_NAME, "h2")),
+        ("data-test", lambda: _element_text(driver, By.XPATH, "//*[@data-test='JobTitle' or @data-test='job-title']")),
+        ("main heading", main_heading),
+    ]
+
+def description_strategies(driver):
+    scanned = {}
+
+    def text_blocks():
+        # Strategies 4 and 6 share one in-page scan (scraper.text_blocks), run at most once per page
+        if not scanned:
+            scanned.update(scan_text_blocks(driver)[0])
+        return scanned
+
+    def largest_main_div():
+        # Looking for substantial content (more than 20 chars, less than header/nav noise)
+        scan = text_blocks()
+        if scan["block"]:
+            logger.debug(f"            🔎 Largest block at {scan['path']}")
+        return scan["block"]
+
+    def paragraphs():
+        paras = driver.find_elements(By.XPATH, "//main//p | //section//p | //article//p")
+        return "\n".join([p.text.strip() for p in paras if p.text.strip() and len(p.text.strip()) > 10]) or None
+
+    def body_text():
+        # Last resort: skip first few lines (likely title/nav) and last few (footer)
+        return text_blocks()["body"]
+
+    return [
+        ("article", lambda: _element_text(driver, By.TAG_NAME, "article")),
+        ("data-test Description", lambda: _element_text(driver, By.XPATH, "//div[@data-test='Description']")),
+        ("description class", lambda: _element_text(driver, By.XPATH, "//div[contains(@class, 'description') or contains(@class, 'job-description') or contains(@class, 'details-section')]")),
+        ("largest main div", largest_main_div),
+        ("paragraphs", paragraphs),
+        ("body text", body_text),
+    ]
 
+def xpath_text_strategies(driver, xpaths):
+    return [(xpath, (lambda xp=xpath: _element_text(driver, By.XPATH, xp))) for xpath in xpaths]
 
+def posted_time_strategies(driver):
+    return xpath_text_strategies(driver, POSTED_TIME_XPATHS) + [
+        ("//time/@datetime", lambda: driver.find_element(By.XPATH, "//time").get_attribute("datetime") or None),
+    ]
 
-def is_job_in_database(job_url):
-    return session.query(JobListing).filter_by(job_url=job_url).first() is not None
 # Function to scrape details of each job
 def scrape_job_details(driver, job_url):
     logger.debug(f"      🔍 Starting detailed scrape of: {job_url}")
@@ -315,239 +469,50 @@ def scrape_job_details(driver, job_url):
 
     try:
         logger.debug(f"         🌐 Navigating to job page...")
+        started = time.monotonic()
         driver.get(job_url)
         logger.debug(f"         ⏳ Waiting for page to load...")
-        human_delay(3, 5)
-
-        # Wait for page to load - look for common Upwork job detail page indicators
-        try:
-            logger.debug(f"         ⌛ Waiting for page elements to appear...")
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "h4.d-flex span.flex-1"))
-            )
-            logger.debug(f"         ✅ Page loaded successfully")
-        except TimeoutException:
+        # Ready means the job detail title element is present (settle waits up to its 10s timeout)
+        if not DETAIL_READY.settle(driver, started, css="h4.d-flex span.flex-1"):
             logger.warning(f"         ⚠️  Job details page did not load for {job_url}")
             return job_details
+        logger.debug(f"         ✅ Page loaded successfully")
 
-        # Extract title - try multiple strategies
+        # Each field's strategies are tried best-first according to the persisted hit-rate/cost
+        # stats in STRATEGIES; the declared order below is only the tie-breaker, and the
+        # description fallbacks registered above always run last
         logger.debug(f"         📝 Extracting job title...")
-        job_details['title'] = None
-        try:
-            # Strategy 1: h1 tag (primary modern selector)
-            try:
-                job_title = driver.find_element(By.TAG_NAME, "h1").text.strip()
-                if job_title and len(job_title) > 5:
-                    job_details['title'] = job_title
-                    logger.debug(f"            ✅ Title found via H1 tag: {job_title[:60]}...")
-            except:
-                logger.debug(f"            ❌ No title found via H1 tag")
-
-            # Strategy 2: h4 with span.flex-1 (Upwork Air3 design system)
-            if not job_details['title']:
-                try:
-                    job_title = driver.find_element(By.CSS_SELECTOR, "h4.d-flex span.flex-1").text.strip()
-                    if job_title and len(job_title) > 5:
-                        job_details['title'] = job_title
-                        logger.debug(f"            ✅ Title found via h4.d-flex > span.flex-1: {job_title[:60]}...")
-                except:
-                    logger.debug(f"            ❌ No title found via h4.d-flex > span.flex-1")
-
-            # Strategy 3: h2 tag (fallback)
-            if not job_details['title']:
-                try:
-                    job_title = driver.find_element(By.TAG_NAME, "h2").text.strip()
-                    if job_title and len(job_title) > 5:
-                        job_details['title'] = job_title
-                        logger.info(f"✅ Extracted title via H2 tag: {job_title[:60]}...")
-                except:
-                    pass
-
-            # Strategy 4: data-test attribute
-            if not job_details['title']:
-                try:
-                    job_title = driver.find_element(By.XPATH, "//*[@data-test='JobTitle' or @data-test='job-title']").text.strip()
-                    if job_title and len(job_title) > 5:
-                        job_details['title'] = job_title
-                        logger.info(f"✅ Extracted title via data-test: {job_title[:60]}...")
-                except:
-                    pass
-
-            # Strategy 5: Any heading tag in main content area
-            if not job_details['title']:
-                try:
-                    headings = driver.find_elements(By.XPATH, "//main//h1 | //main//h2 | //main//h3 | //article//h1 | //article//h2")
-                    if headings:
-                        job_title = headings[0].text.strip()
-                        if job_title and len(job_title) > 5:
-                            job_details['title'] = job_title
-                            logger.info(f"✅ Extracted title via heading in main: {job_title[:60]}...")
-                except:
-                    pass
-
-            if not job_details['title']:
-                logger.warning(f"            ⚠️  Could not extract title from any selector")
-        except Exception as e:
-            logger.debug(f"         ❌ Error extracting title: {e}")
+        job_details['title'], used = STRATEGIES.extract(
+            "title", title_strategies(driver), accept=lambda t: len(t) > 5)
+        if used:
+            logger.debug(f"            ✅ Title found via {used}: {job_details['title'][:60]}...")
+        else:
+            logger.warning(f"            ⚠️  Could not extract title from any selector")
 
-        # Extract description - this is the main job posting body text
         logger.debug(f"         📄 Extracting job description...")
-        job_details['description'] = None
-        try:
-            # Strategy 1: Look for article tag (often wraps job description)
-            try:
-                article = driver.find_element(By.TAG_NAME, "article")
-                job_description = article.text.strip()
-                if job_description and len(job_description) > 20:
-                    job_details['description'] = job_description
-                    logger.debug(f"            ✅ Description found via ARTICLE tag ({len(job_description)} chars)")
-            except:
-                logger.debug(f"            ❌ No description found via ARTICLE tag")
-
-            # Strategy 2: Look for div with data-test="Description" (Upwork Air3 design system)
-            if not job_details['description']:
-                try:
-                    description_elem = driver.find_element(By.XPATH, "//div[@data-test='Description']")
-                    job_description = description_elem.text.strip()
-                    if job_description and len(job_description) > 20:
-                        job_details['description'] = job_description
-                        logger.info(f"✅ Extracted description via data-test='Description': {job_description[:100]}...")
-                except:
-                    pass
-
-            # Strategy 3: Look for description in common div classes
-            if not job_details['description']:
-                try:
-                    description_elem = driver.find_element(By.XPATH, "//div[contains(@class, 'description') or contains(@class, 'job-description') or contains(@class, 'details-section')]")
-                    job_description = description_elem.text.strip()
-                    if job_description and len(job_description) > 20:
-                        job_details['description'] = job_description
-                        logger.info(f"✅ Extracted description via div class: {job_description[:100]}...")
-                except:
-                    pass
-
-            # Strategy 4: Look for main content area and extract largest text block
-            if not job_details['description']:
-                try:
-                    # Find main content sections
-                    main_elem = driver.find_element(By.TAG_NAME, "main")
-                    # Get all divs with substantial text content
-                    divs = main_elem.find_elements(By.TAG_NAME, "div")
-                    largest_text = ""
-                    for div in divs:
-                        text = div.text.strip()
-                        # Looking for substantial content (more than 20 chars, less than header/nav noise)
-                        if 20 < len(text) < 10000 and len(text) > len(largest_text):
-                            largest_text = text
-                    if largest_text:
-                        job_details['description'] = largest_text
-                        logger.info(f"✅ Extracted description via main div search: {largest_text[:100]}...")
-                except:
-                    pass
-
-            # Strategy 5: Look for p tags and get all text from main content area
-            if not job_details['description']:
-                try:
-                    # Get all paragraphs that are likely job description content
-                    paragraphs = driver.find_elements(By.XPATH, "//main//p | //section//p | //article//p")
-                    if paragraphs:
-                        job_description = "\n".join([p.text.strip() for p in paragraphs if p.text.strip() and len(p.text.strip()) > 10])
-                        if len(job_description) > 20:
-                            job_details['description'] = job_description
-                            logger.info(f"✅ Extracted description via paragraphs: {job_description[:100]}...")
-                except:
-                    pass
-
-            # Strategy 6: Get text from any section/div with substantial content after the title
-            if not job_details['description']:
-                try:
-                    # This is a last resort - get all text after the title area
-                    all_text = driver.find_element(By.TAG_NAME, "body").text
-                    # Split and get the bulk of the middle content
-                    lines = [line.strip() for line in all_text.split('\n') if line.strip() and len(line.strip()) > 10]
-                    if len(lines) > 5:
-                        # Skip first few lines (likely title/nav) and last few (footer)
-                        job_description = "\n".join(lines[2:-3]) if len(lines) > 5 else "\n".join(lines)
-                        if len(job_description) > 20:
-                            job_details['description'] = job_description
-                            logger.info(f"✅ Extracted description via body text fallback: {job_description[:100]}...")
-                except:
-                    pass
-
-            if not job_details['description']:
-                logger.warning(f"            ⚠️  Could not extract description from any selector")
-        except Exception as e:
-            logger.debug(f"         ❌ Error extracting description: {e}")
+        job_details['description'], used = STRATEGIES.extract(
+            "description", description_strategies(driver), accept=lambda d: len(d) > 20)
+        if used:
+            logger.debug(f"            ✅ Description found via {used} ({len(job_details['description'])} chars)")
+        else:
+            logger.warning(f"            ⚠️  Could not extract description from any selector")
 
-        # Extract location
         logger.debug(f"         📍 Extracting job location...")
-        job_details['location'] = None
-        try:
-            # Try multiple location selectors - Upwork Air3 design system
-            location_xpaths = [
-                # Primary: Upwork's standard location element (Air3 design)
-                "//div[@class='d-inline-flex align-items-center text-base-sm']//p[@class='text-light-on-muted m-0']",
-                # Fallback: Any p tag with light muted text (may catch location)
-                "//p[contains(@class, 'text-light-on-muted m-0')]",
-                # Old fallback: data-test attribute
-                "//*[@data-test='LocationLabel']",
-                # Old fallback: div with location class
-                "//div[contains(@class, 'location')]/span",
-                # Old fallback: Text-based search
-                "//*[contains(text(), 'Location')]//following-sibling::*[1]",
-            ]
-
-            for xpath in location_xpaths:
-                try:
-                    location = driver.find_element(By.XPATH, xpath).text.strip()
-                    if location and location != "Location" and len(location) > 0:
-                        job_details['location'] = location
-                        logger.debug(f"            ✅ Location found: {location}")
-                        break
-                except:
-                    continue
-
-            if not job_details['location']:
-                logger.debug(f"            ❌ No location found via any selector")
-        except Exception as e:
-            logger.debug(f"         ❌ Error extracting location: {e}")
+        job_details['location'], used = STRATEGIES.extract(
+            "location", xpath_text_strategies(driver, LOCATION_XPATHS), accept=lambda l: l != "Location")
+        if used:
+            logger.debug(f"            ✅ Location found via {used}: {job_details['location']}")
+        else:
+            logger.debug(f"            ❌ No location found via any selector")
 
-        # Extract posted time
         logger.debug(f"         ⏰ Extracting posted time...")
-        job_details['posted_time'] = None
-        try:
-            posted_time_xpaths = [
-                # Primary: Upwork Air3 design system - posted line section (gets just the time)
-                "//div[@class='posted-on-line']//span",
-                # Fallback: div containing "Posted" text then next span
-                "//div[contains(text(), 'Posted')]//span",
-                # Old fallback: data-test attribute
-                "//*[@data-test='PostedOn']",
-                # Old fallback: span with Posted text
-                "//span[contains(text(), 'Posted')]",
-                # Old fallback: time element datetime
-                "//time/@datetime"
-            ]
-
-            for xpath in posted_time_xpaths:
-                try:
-                    # Use get_attribute for datetime, otherwise .text
-                    if "@" in xpath:
-                        posted_time = driver.find_element(By.XPATH, xpath.replace("/@datetime", "")).get_attribute("datetime")
-                    else:
-                        posted_time = driver.find_element(By.XPATH, xpath).text.strip()
-
-                    if posted_time:
-                        job_details['posted_time'] = posted_time
-                        logger.debug(f"            ✅ Posted time found: {posted_time}")
-                        break
-                except:
-                    continue
-
-            if not job_details['posted_time']:
-                logger.debug(f"            ❌ No posted time found via any selector")
-        except Exception as e:
-            logger.debug(f"         ❌ Error extracting posted_time: {e}")
+        job_details['posted_time'], used = STRATEGIES.extract(
+            "posted_time", posted_time_strategies(driver))
+        if used:
+            logger.debug(f"            ✅ Posted time found via {used}: {job_details['posted_time']}")
+        else:
+            logger.debug(f"            ❌ No posted time found via any selector")
+        STRATEGIES.job_done()
 
         # Extract job link if available
         logger.debug(f"         🔗 Setting job link...")
@@ -581,9 +546,34 @@ def scrape_job_details(driver, job_url):
     logger.debug(f"      🏁 Finished scraping job details")
     return job_details
 
+# Offline variant: the browser only navigates and waits, extraction runs on a page_source snapshot
+def scrape_job_details_offline(driver, job_url):
+    logger.debug(f"      🔍 Starting offline scrape of: {job_url}")
+    try:
+        started = time.monotonic()
+        driver.get(job_url)
+        if not DETAIL_READY.settle(driver, started, css="h4.d-flex span.flex-1"):
+            logger.warning(f"         ⚠️  Job details page did not load for {job_url}")
+            return {}
+        page_source = driver.page_source
+    except Exception as e:
+        logger.error(f"      ❌ Scraping error for {job_url}: {e}")
+        return {}
+
+    parse_start = time.perf_counter()
+    job_details = parse_job_details(page_source, job_url)
+    logger.debug(f"      🧩 Parsed snapshot in {(time.perf_counter() - parse_start)*1000:.1f} ms")
+
+    if not job_details.get('title'):
+        logger.warning(f"      ⚠️  MISSING TITLE - this may affect lead quality")
+    if not job_details.get('description'):
+        logger.warning(f"      ⚠️  MISSING DESCRIPTION - this may affect lead quality")
+    return job_details
+
 # Function to save job listings to PostgreSQL
 def save_job_listings_to_db(job_urls_with_dates):
     logger.info(f"💾 Saving {len(job_urls_with_dates)} job URLs to database...")
+    session = get_session(DATABASE_URL)
 
     jobs_added = 0
     jobs_skipped = 0
@@ -640,6 +630,8 @@ def debug_job_page(driver, job_url):
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(page_html)
         logger.info(f"✅ Saved full HTML to: {output_file}\n")
+        if RECORDER is not None:
+            RECORDER.record(driver, "detail")
 
         # Try to find title with different strategies
         logger.info("--- TITLE DETECTION ---")
@@ -724,20 +716,35 @@ def debug_job_page(driver, job_url):
         return False
 
 # Main function to execute login and scraping with pagination
-def main(debug=False):
+def main(debug=False, parse_mode=PARSE_MODE):
+    configure_logging()
     start_time = datetime.now()
+    if parse_mode == "offline" and parse_job_details is None:
+        logger.warning("⚠️  Offline parse mode needs lxml (pip install lxml); using live extraction")
+        parse_mode = "live"
     logger.info("="*80)
     logger.info("🚀 STARTING UPWORK SCRAPER")
     logger.info(f"   Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"   Debug mode: {debug}")
+    if debug:
+        logger.info("🔍 Running in DEBUG mode - will inspect first job and exit")
+    logger.info(f"   Parse mode: {parse_mode}")
     logger.info("="*80)
 
     driver = None
+    writer = None
     total_jobs_processed = 0
     total_jobs_scraped = 0
     total_jobs_saved = 0
+    success_count = 0
+    error_count = 0
 
     try:
+        engine = get_engine(DATABASE_URL)
+        with engine.connect():
+            logger.info(f"Connected to Rails database: {DATABASE_URL}")
+        session = get_session(DATABASE_URL)
+
         logger.info("\n🔧 PHASE 1: BROWSER SETUP")
         logger.info("Setting up Chrome driver...")
         driver = setup_driver()
@@ -745,29 +752,77 @@ def main(debug=False):
         logger.info("\n🔐 PHASE 2: AUTHENTICATION")
         manual_login(driver)
 
-        logger.info("\n🔍 PHASE 3: JOB URL COLLECTION")
         # Scrape job URLs - using 72 hours for initial run to ensure we get some data
         # TODO: Once you have baseline data, you can reduce this to 18-24 hours for daily runs
-        job_urls_with_dates = get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5)
-        logger.info(f"✅ Job URL collection complete! Found {len(job_urls_with_dates)} fresh job URLs within 72-hour limit.")
-
-        logger.info("\n💾 PHASE 4: DATABASE INSERTION")
-        save_job_listings_to_db(job_urls_with_dates)
+        seen_urls = load_seen_urls(engine)
+        watermark = load_watermark(engine, SEARCH_QUERY)
 
-        # Debug mode: inspect first job and exit
+        # Debug mode: collect, insert, inspect first job and exit
         if debug:
+            logger.info("\n🔍 PHASE 3: JOB URL COLLECTION")
+            job_urls_with_dates = get_job_urls(driver, max_hours_old=72, consecutive_old_limit=5, seen_urls=seen_urls, parse_mode=parse_mode)
+            logger.info(f"✅ Job URL collection complete! Found {len(job_urls_with_dates)} fresh job URLs within 72-hour limit.")
+            save_job_listings_to_db(job_urls_with_dates)
             logger.info("\n🔍 DEBUG MODE: Inspecting first job and exiting...")
             fresh_jobs = session.query(JobListing).filter_by(fresh=True).limit(1).all()
             if fresh_jobs:
                 debug_job_page(driver, fresh_jobs[0].job_url)
             return
 
-        logger.info("\n📄 PHASE 5: DETAILED SCRAPING")
+        logger.info("\n🔍 PHASE 3: STREAMING COLLECTION → DETAIL SCRAPING → DATABASE")
+        # Each search page is inserted as stubs and scraped right away; detail updates go through a
+        # write-behind thread with its own connection, batched, so the browser never waits on Postgres
+        writer = JobDetailsWriter(engine)
+        flush_on_exit(writer)
+        def collected_pages():
+            for page_jobs in iter_job_url_pages(driver, max_hours_old=72, consecutive_old_limit=5, seen_urls=seen_urls, parse_mode=parse_mode, watermark=watermark):
+                if page_jobs:
+                    save_job_listings_to_db(page_jobs)
+                yield page_jobs
+
+        def scrape_item(job_tuple):
+            job_url = job_tuple[0]
+            logger.info(f"\n📋 [{pipeline.stats.scraped + 1}/{pipeline.stats.harvested}] Streaming job: {job_url}")
+            if parse_mode == "offline":
+                return job_url, scrape_job_details_offline(driver, job_url)
+            return job_url, scrape_job_details(driver, job_url)
+
+        def on_saved(record):
+            nonlocal success_count, error_count
+            job_url, job_details = record
+            if job_details:
+                success_count += 1
+                watermark.release(job_url)
+                logger.info(f"   ✅ SUCCESS: {job_url} updated in database")
+            else:
+                error_count += 1
+                logger.warning(f"   ⚠️  NO DETAILS SCRAPED for {job_url}, marked as not fresh")
+
+        def on_error(record, e):
+            nonlocal error_count
+            error_count += 1
+            logger.error(f"   ❌ DATABASE ERROR for job {record[0]}: {e}")
+
+        def on_written(record, future):
+            if future.exception() is None:
+                on_saved(record)
+            else:
+                on_error(record, future.exception())
+
+        pipeline = StreamingPipeline(scrape_item, writer.add, on_saved=on_saved, on_error=on_error)
+        stats = pipeline.run(collected_pages())
+        # Reached only when collection and every write finished without raising; the mark stops
+        # short of any job whose scrape or write failed (still held)
+        if save_watermark(engine, watermark):
+            logger.info(f"   🔖 Crawl watermark advanced to {watermark}")
+        total_jobs_processed += stats.scraped
+        total_jobs_scraped += stats.scraped
+        for line in stats.summary_lines():
+            logger.info(f"   📊 {line}")
+
+        logger.info("\n📄 PHASE 4: REMAINING FRESH JOBS")
         fresh_jobs = session.query(JobListing).filter_by(fresh=True).all()
-        logger.info(f"Processing {len(fresh_jobs)} fresh job listings for detailed data extraction...")
-
-        success_count = 0
-        error_count = 0
+        logger.info(f"Processing {len(fresh_jobs)} fresh job listings left over from earlier runs...")
 
         for idx, job in enumerate(fresh_jobs, 1):
             total_jobs_processed += 1
@@ -777,48 +832,22 @@ def main(debug=False):
 
             try:
                 logger.debug(f"   🔍 Starting detailed scraping...")
-                job_details = scrape_job_details(driver, job.job_url)
+                if parse_mode == "offline":
+                    job_details = scrape_job_details_offline(driver, job.job_url)
+                else:
+                    job_details = scrape_job_details(driver, job.job_url)
                 total_jobs_scraped += 1
 
                 if job_details:
-                    try:
-                        # Log what we're about to save
-                        logger.info(f"   � Updating job with extracted details:")
-                        logger.info(f"      - Title: {'✅' if job_details.get('title') else '❌'} {job_details.get('title', 'NOT FOUND')[:50]}{'...' if job_details.get('title') and len(job_details.get('title')) > 50 else ''}")
-                        logger.info(f"      - Description: {'✅' if job_details.get('description') else '❌'} {len(job_details.get('description', ''))} chars")
-                        logger.info(f"      - Location: {'✅' if job_details.get('location') else '❌'} {job_details.get('location', 'NOT FOUND')}")
-                        logger.info(f"      - Posted time: {'✅' if job_details.get('posted_time') else '❌'} {job_details.get('posted_time', 'NOT FOUND')}")
-
-                        job.title = job_details.get('title')
-                        job.description = job_details.get('description')
-                        job.location = job_details.get('location')
-                        job.posted_time = job_details.get('posted_time')
-                        job.job_link = job_details.get('job_link')
-                        job.fresh = False
-                        session.commit()
-
-                        success_count += 1
-                        total_jobs_saved += 1
-                        logger.info(f"   ✅ SUCCESS: Job ID {job.id} updated in database")
-
-                    except Exception as db_error:
-                        error_count += 1
-                        logger.error(f"   ❌ DATABASE ERROR for job {job.job_url}: {db_error}")
-                        session.rollback()
-                        # Mark as not fresh anyway so we don't retry endlessly
-                        try:
-                            job.fresh = False
-                            session.commit()
-                        except:
-                            session.rollback()
-                else:
-                    error_count += 1
-                    logger.warning(f"   ⚠️  NO DETAILS SCRAPED for {job.job_url}, marking as not fresh")
-                    try:
-                        job.fresh = False
-                        session.commit()
-                    except:
-                        session.rollback()
+                    # Log what we're about to save
+                    logger.info(f"   � Updating job with extracted details:")
+                    logger.info(f"      - Title: {'✅' if job_details.get('title') else '❌'} {job_details.get('title', 'NOT FOUND')[:50]}{'...' if job_details.get('title') and len(job_details.get('title')) > 50 else ''}")
+                    logger.info(f"      - Description: {'✅' if job_details.get('description') else '❌'} {len(job_details.get('description', ''))} chars")
+                    logger.info(f"      - Location: {'✅' if job_details.get('location') else '❌'} {job_details.get('location', 'NOT FOUND')}")
+                    logger.info(f"      - Posted time: {'✅' if job_details.get('posted_time') else '❌'} {job_details.get('posted_time', 'NOT FOUND')}")
+                # Queued for the writer thread; empty details just clear `fresh` so the job is not retried
+                record = (job.job_url, job_details)
+                writer.add(record).add_done_callback(lambda f, r=record: on_written(r, f))
 
                 # Progress update every 10 jobs
                 if idx % 10 == 0 or idx == len(fresh_jobs):
@@ -833,20 +862,21 @@ def main(debug=False):
                         logger.info(f"   🔮 ETA: {remaining/60:.1f} minutes remaining")
 
             except Exception as e:
-                error_count += 1
                 logger.error(f"   ❌ SCRAPING ERROR for job {job.job_url}: {e}")
-                # Try to mark as not fresh to avoid infinite retries
-                try:
-                    job.fresh = False
-                    session.commit()
-                except:
-                    session.rollback()
+                # Mark as not fresh to avoid infinite retries; on_written counts the error either way
+                # (no details saved, or the update itself failed)
+                record = (job.job_url, {})
+                writer.add(record).add_done_callback(lambda f, r=record: on_written(r, f))
                 # Continue to next job instead of crashing
                 continue
 
     except Exception as e:
         logger.error(f"❌ CRITICAL ERROR in main scraping loop: {e}")
     finally:
+        if writer is not None:
+            # Flush queued detail updates before reporting (also runs on Ctrl-C / SIGTERM)
+            writer.close()
+            total_jobs_saved = success_count
         end_time = datetime.now()
         total_duration = end_time - start_time
 
@@ -858,6 +888,21 @@ def main(debug=False):
         logger.info(f"   Jobs processed: {total_jobs_processed}")
         logger.info(f"   Jobs scraped: {total_jobs_scraped}")
         logger.info(f"   Jobs saved: {total_jobs_saved}")
+        for ready in (SEARCH_READY, DETAIL_READY):
+            logger.info(f"   Readiness {ready.summary()}")
+        for line in BLOCKER.summary_lines():
+            logger.info(f"   {line}")
+        if writer is not None:
+            for line in writer.summary_lines():
+                logger.info(f"   Writer {line}")
+        if STRATEGIES.jobs:
+            logger.info("   Extraction strategies:")
+            for line in STRATEGIES.summary_lines():
+                logger.info(f"      {line}")
+            try:
+                STRATEGIES.save()
+            except Exception as e:
+                logger.warning(f"⚠️  Could not save strategy stats: {e}")
         if total_jobs_processed > 0:
             logger.info(f"   Success rate: {(total_jobs_saved/total_jobs_processed)*100:.1f}%")
         logger.info("="*80)
@@ -868,17 +913,15 @@ def main(debug=False):
                 logger.info("🔧 Chrome driver closed.")
             except:
                 logger.warning("⚠️  Error closing Chrome driver")
-        if session is not None:
-            try:
-                session.close()
+        try:
+            if close_session(DATABASE_URL):
                 logger.info("💾 Database session closed.")
-            except:
-                logger.warning("⚠️  Error closing database session")
+        except:
+            logger.warning("⚠️  Error closing database session")
 
 
 if __name__ == "__main__":
     import sys
     debug_mode = "--debug" in sys.argv or "-d" in sys.argv
-    if debug_mode:
-        logger.info("🔍 Running in DEBUG mode - will inspect first job and exit")
-    main(debug=debug_mode)
+    parse_mode = "offline" if "--offline-parse" in sys.argv else PARSE_MODE
+    main(debug=debug_mode, parse_mode=parse_mode)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of Upwork the scrapers touch, for offline end-to-end tests.
+
+    python3 upwork_ai/mock_upwork_server.py --port 8765 --pages 5 --latency 150 --challenge-rate 0.05
+    UPWORK_BASE_URL=http://127.0.0.1:8765 SCRAPER_HEADLESS=1 python3 upwork_ai/run_upwork_latest.py --pages 5
+
+Serves:
+  /ab/account-security/login   login form that signs in without credentials (redirects after --login-delay)
+  /nx/search/jobs/?q=&page=N   search pages of --per-page job tiles, --pages pages per query
+  /jobs/<id>                   job detail pages
+  POST /api/job_listings[/bulk] sink for UPLOAD_DEST=api (gzip'd bulk batches too), counts uploaded jobs
+
+Pages are synthetic, matching the selectors of main.py, run_upwork_latest.py and run_standalone.py,
+or taken from a recorded corpus (--corpus, see scraper/corpus.py). Each response waits --latency ms
+(+/- 50% jitter). With --challenge-rate, that share of page loads returns a "Just a moment..." page
+(HTTP 403) that reloads itself after --challenge-delay seconds.
+"""
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scraper.corpus import corpus_files, load_record
+
+REAL_BASE_URL = "https://www.upwork.com"
+LOCATIONS = ["United States", "United Kingdom", "Canada", "Australia", "Germany", "India"]
+
+
+class MockUpwork:
+    def __init__(self, pages=5, per_page=50, latency_ms=0.0, challenge_rate=0.0, challenge_delay=2.0,
+                 login_delay=0.5, corpus=None, seed=0):
+        self.pages = pages
+        self.per_page = per_page
+        self.latency_ms = latency_ms
+        self.challenge_rate = challenge_rate
+        self.challenge_delay = challenge_delay
+        self.login_delay = login_delay
+        self.random = random.Random(seed)
+        self.search_records = [load_record(f) for f in corpus_files(corpus, "search")] if corpus else []
+        self.detail_records = [load_record(f) for f in corpus_files(corpus, "detail")] if corpus else []
+        self.counts = {"login": 0, "search": 0, "detail": 0, "challenge": 0, "uploaded": 0}
+        self._lock = threading.Lock()
+        self.base_url = None
+
+    # -- page builders -------------------------------------------------------
+
+    @staticmethod
+    def job_id(query, page, index):
+        digest = hashlib.blake2b(f"{query}:{page}:{index}".encode(), digest_size=8).hexdigest()
+        return f"~01{digest}"
+
+    def _recorded(self, records, key):
+        record = records[key % len(records)]
+        return record["html"].replace(REAL_BASE_URL, self.base_url)
+
+    def login_page(self):
+        target = "/nx/search/jobs/?q=www&sort=recency&page=1&per_page=50"
+        return f"""<!doctype html><html><head><title>Log in - Upwork</title>
+<meta http-equiv="refresh" content="{self.login_delay};url={target}"></head>
+<body><form><input type="email" name="login" id="login_username"><button id="login_password_continue">Continue</button></form>
+</body></html>"""
+
+    def search_page(self, query, page):
+        if self.search_records:
+            return self._recorded(self.search_records, page - 1)
+        tiles = []
+        if page <= self.pages:
+            for index in range(self.per_page):
+                minutes = ((page - 1) * self.per_page + index) * 3 + 1
+                label = f"{minutes} minutes ago" if minutes < 60 else f"{minutes // 60} hours ago"
+                job_id = self.job_id(query, page, index)
+                title = html.escape(f"{query.title()} project {page}-{index}: build and ship a website")
+                tiles.append(f"""<article data-test="JobTile">
+  <h2 class="h5 mb-0 mr-2 job-tile-title"><a href="/jobs/{job_id}">{title}</a></h2>
+  <small data-test="job-pubilshed-date"><span>Posted</span> <span>{label}</span></small>
+  <p>Looking for help with {html.escape(query)}; fixed price, intermediate level.</p>
+</article>""")
+        return f"""<!doctype html><html><head><title>{html.escape(query)} Jobs | Upwork</title></head>
+<body><main><section>{''.join(tiles)}</section></main></body></html>"""
+
+    def detail_page(self, job_id):
+        if self.detail_records:
+            return self._recorded(self.detail_records, int(hashlib.md5(job_id.encode()).hexdigest(), 16))
+        rnd = random.Random(job_id)
+        posted = f"{rnd.randint(2, 59)} minutes ago"
+        location = rnd.choice(LOCATIONS)
+        title = html.escape(f"Build and ship a website ({job_id[-6:]})")
+        paragraphs = "".join(
+            f"<p>We are a growing company looking for an experienced developer. Requirement {i}: "
+            f"responsive pages, clean code and clear communication.</p>" for i in range(rnd.randint(2, 6))
+        )
+        return f"""<!doctype html><html><head><title>{title} - Upwork</title></head>
+<body><main><div class="job-details-content">
+  <h4 class="d-flex"><span class="flex-1">{title}</span></h4>
+  <div class="posted-on-line"><span>{posted}</span></div>
+  <div data-test="PostedOn"><span>Posted {posted}</span></div>
+  <div data-test="LocationLabel"><span>{location}</span></div>
+  <div class="d-inline-flex align-items-center text-base-sm"><p class="text-light-on-muted m-0">{location}</p></div>
+  <div data-test="Description">{paragraphs}<p>More about us: <a href="https://example.com/{job_id[-6:]}">example.com</a></p></div>
+</div></main></body></html>"""
+
+    @staticmethod
+    def challenge_page(delay):
+        return f"""<!doctype html><html><head><title>Just a moment...</title></head>
+<body><p>Checking your browser before accessing the site.</p>
+<script>setTimeout(function () {{ location.reload(); }}, {int(delay * 1000)});</script></body></html>"""
+
+    # -- accounting ----------------------------------------------------------
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def roll_challenge(self):
+        with self._lock:
+            return self.challenge_rate > 0 and self.random.random() < self.challenge_rate
+
+    def wait(self):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0 * random.uniform(0.5, 1.5))
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            site.wait()
+            if parsed.path.startswith("/ab/account-security/login"):
+                site.count("login")
+                return self._send(200, site.login_page(), headers={"Set-Cookie": "mock_session=1; Path=/"})
+            if parsed.path.startswith("/nx/search/jobs") or parsed.path.startswith("/jobs/"):
+                if site.roll_challenge():
+                    site.count("challenge")
+                    return self._send(403, site.challenge_page(site.challenge_delay))
+                if parsed.path.startswith("/jobs/"):
+                    site.count("detail")
+                    return self._send(200, site.detail_page(parsed.path[len("/jobs/"):]))
+                params = parse_qs(parsed.query)
+                site.count("search")
+                return self._send(200, site.search_page(params.get("q", ["www"])[0], int(params.get("page", ["1"])[0])))
+            if parsed.path in ("/", "/favicon.ico"):
+                return self._send(200, "<html><head><title>Upwork (mock)</title></head><body></body></html>")
+            return self._send(404, "not found", content_type="text/plain")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            path = urlparse(self.path).path
+            if path.startswith("/api/job_listings/bulk"):
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                listings = json.loads(body or b"{}").get("job_listings") or []
+                for _ in listings:
+                    site.count("uploaded")
+                results = [{"job_url": item.get("job_url"), "status": "created"} for item in listings]
+                return self._send(200, json.dumps({"results": results}), content_type="application/json")
+            if path.startswith("/api/job_listings"):
+                site.count("uploaded")
+                return self._send(201, json.dumps({"ok": True, "bytes": len(body)}), content_type="application/json")
+            # Rails progress endpoints (/scrapers/<id>/...) are accepted and ignored
+            return self._send(200, "{}", content_type="application/json")
+
+    return Handler
+
+
+def start_server(site, host="127.0.0.1", port=0):
+    """Serve `site` on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    site.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="mock-upwork", daemon=True).start()
+    return server, site.base_url
+
+
+def add_site_arguments(parser):
+    parser.add_argument("--pages", type=int, default=5, help="Search pages per query before results run out")
+    parser.add_argument("--per-page", type=int, default=50, help="Job tiles per search page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean response latency in ms (+/- 50%% jitter)")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="Share of page loads answered with a challenge")
+    parser.add_argument("--challenge-delay", type=float, default=2.0, help="Seconds before a challenge page clears itself")
+    parser.add_argument("--login-delay", type=float, default=0.5, help="Seconds before the login page signs in")
+    parser.add_argument("--corpus", default=None, help="Serve pages from a recorded corpus session instead of synthetic ones")
+
+
+def site_from_args(args):
+    return MockUpwork(pages=args.pages, per_page=args.per_page, latency_ms=args.latency,
+                      challenge_rate=args.challenge_rate, challenge_delay=args.challenge_delay,
+                      login_delay=args.login_delay, corpus=args.corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Upwork server for offline scraper runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    site = site_from_args(args)
+    server, base_url = start_server(site, args.host, args.port)
+    print(f"[Mock] Serving on {base_url} (UPWORK_BASE_URL={base_url})")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[Mock] {site.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
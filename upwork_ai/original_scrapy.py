@@ -2,12 +2,10 @@ import os
 import re
 import shutil
 import subprocess
-import spacy
 import json
 from bs4 import BeautifulSoup
 
-# Load spaCy model for AI-based extraction
-nlp = spacy.load("en_core_web_sm")
+from scraper.resources import get_nlp
 
 # Regex patterns for email, phone, and social media
 email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
@@ -21,7 +19,7 @@ social_patterns = {
 
 # Function to extract contact info using AI (spaCy NER)
 def ai_extract_contact_info(text):
-    doc = nlp(text)
+    doc = get_nlp("en_core_web_sm")(text)  # loaded on first call, not at import
     emails = []
     phones = []
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded page corpus through the offline parsers, with no browser or network.
+
+Record a corpus by running any scraper with SCRAPER_RECORD=1 (see scraper/corpus.py), then:
+
+    python3 upwork_ai/replay_corpus.py                      # latest session, all CPUs
+    python3 upwork_ai/replay_corpus.py --corpus upwork_ai/corpus/20261018-101500 --workers 4 --repeat 3
+
+Search pages go through parse_search_tiles (the lxml twin of scraper.tile_harvest).
+Detail pages go through both scrape_job_details variants:
+  main     main.scrape_job_details' strategies, one by one (page_parser.detail_strategies)
+  summary  run_upwork_latest / run_standalone XPaths (page_parser.parse_job_summary)
+The report has jobs/sec per variant, field coverage and per-strategy latency.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scraper.corpus import DEFAULT_ROOT, corpus_files, latest_session, load_record
+from scraper.page_parser import DETAIL_ACCEPT, detail_strategies, parse_document, parse_job_summary, parse_search_tiles
+
+FIELDS = ("title", "description", "location", "posted_time", "job_link")
+
+
+def replay_file(file_path):
+    """Parse one recorded page; returns timings and coverage (runs in a worker process)."""
+    record = load_record(file_path)
+    html = record["html"]
+    if record["kind"] == "search":
+        start = time.perf_counter()
+        tiles = parse_search_tiles(html)
+        return {
+            "kind": "search",
+            "seconds": time.perf_counter() - start,
+            "tiles": len(tiles),
+            "with_href": sum(1 for t in tiles if t.get("href")),
+            "with_date": sum(1 for t in tiles if t.get("date_label")),
+        }
+
+    result = {"kind": "detail", "variants": {}, "strategies": []}
+    start = time.perf_counter()
+    tree = parse_document(html)
+    details = {"job_link": record.get("url")}
+    for field, strategies in detail_strategies(tree).items():
+        for name, fn in strategies:
+            s = time.perf_counter()
+            try:
+                value = fn()
+            except Exception:
+                value = None
+            hit = bool(value) and DETAIL_ACCEPT[field](value)
+            result["strategies"].append((field, name, hit, time.perf_counter() - s))
+            if hit:
+                details[field] = value
+                break
+    result["variants"]["main"] = (time.perf_counter() - start, [f for f in FIELDS if details.get(f)])
+
+    start = time.perf_counter()
+    summary = parse_job_summary(html)
+    result["variants"]["summary"] = (time.perf_counter() - start, [f for f in FIELDS if summary.get(f)])
+    return result
+
+
+def report(results, wall_seconds):
+    search = [r for r in results if r["kind"] == "search"]
+    details = [r for r in results if r["kind"] == "detail"]
+    print(f"[Replay] {len(results)} pages ({len(search)} search, {len(details)} detail) in {wall_seconds:.2f}s wall, "
+          f"{len(details) / wall_seconds if wall_seconds else 0:.1f} detail pages/sec overall")
+
+    if search:
+        seconds = sum(r["seconds"] for r in search)
+        tiles = sum(r["tiles"] for r in search)
+        print(f"[Replay] search: {tiles} tiles, avg {seconds / len(search) * 1000:.1f} ms/page, "
+              f"href {sum(r['with_href'] for r in search)}/{tiles}, date {sum(r['with_date'] for r in search)}/{tiles}")
+
+    for variant in ("main", "summary"):
+        timings = [r["variants"][variant] for r in details]
+        if not timings:
+            continue
+        seconds = sum(t for t, _ in timings)
+        coverage = ", ".join(f"{f} {sum(1 for _, found in timings if f in found) / len(timings):.0%}" for f in FIELDS)
+        print(f"[Replay] {variant}: {len(timings) / seconds if seconds else 0:.1f} jobs/sec per worker, "
+              f"avg {seconds / len(timings) * 1000:.1f} ms/job; coverage: {coverage}")
+
+    per_strategy = {}
+    for r in details:
+        for field, name, hit, seconds in r["strategies"]:
+            s = per_strategy.setdefault((field, name), [0, 0, 0.0])
+            s[0] += 1
+            s[1] += 1 if hit else 0
+            s[2] += seconds
+    for (field, name), (tries, hits, seconds) in per_strategy.items():
+        print(f"[Replay]   {field}/{name}: {hits}/{tries} hits, avg {seconds / tries * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the offline parsers against a recorded page corpus")
+    parser.add_argument("--corpus", default=None, help=f"Session directory (default: latest under {DEFAULT_ROOT})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the corpus this many times")
+    args = parser.parse_args()
+
+    session = args.corpus or latest_session()
+    files = corpus_files(session) if session else []
+    if not files:
+        print(f"[Replay] No recorded pages found (corpus: {session or DEFAULT_ROOT}); record with SCRAPER_RECORD=1")
+        return
+    print(f"[Replay] Corpus {session}: {len(files)} pages x{args.repeat}, {args.workers} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(pool.map(replay_file, files * max(1, args.repeat), chunksize=4))
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,12 @@ try:
     import undetected_chromedriver as uc
 except Exception:
     uc = None
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from scraper.seen_urls import fetch_known_urls, load_seen_urls
+from scraper.readiness import PageReadiness
+from scraper.corpus import PageRecorder
+from scraper.site import LOGIN_URL, search_url
+from scraper.batch_writer import JobBatchWriter, content_hash, flush_on_exit
 
 # Database connection - update this for your setup
 DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql+pg8000://postgres@localhost:5432/lead_system_development")
@@ -107,7 +112,7 @@ def setup_driver(use_uc=False):
 
 def wait_for_login(driver):
     """Navigate to login and wait for user to complete it"""
-    login_url = 'https://www.upwork.com/ab/account-security/login'
+    login_url = LOGIN_URL
     print(f"[Login] Opening {login_url}")
     driver.get(login_url)
 
@@ -121,7 +126,7 @@ def wait_for_login(driver):
     input("Press Enter once you've successfully logged in...")
 
     # Test access to jobs page
-    jobs_url = "https://www.upwork.com/nx/search/jobs/?q=www&sort=recency&page=1&per_page=50"
+    jobs_url = search_url("www", 1)
     print("[Login] Testing access to jobs page...")
     driver.get(jobs_url)
     time.sleep(3)
@@ -140,6 +145,11 @@ def human_pause(min_s=1.5, max_s=3.5):
     """Random pause to mimic human behavior"""
     time.sleep(random.uniform(min_s, max_s))
 
+# Wait for the page to actually be ready, then pad only up to a human-like pace from navigation start
+RECORDER = PageRecorder.from_env()
+SEARCH_READY = PageReadiness("search", pace=(2, 4), recorder=RECORDER)
+DETAIL_READY = PageReadiness("detail", pace=(1.5, 3), recorder=RECORDER)
+
 def age_in_hours(date_text):
     """Convert job posting age text to hours"""
     if not date_text:
@@ -173,19 +183,21 @@ def age_in_hours(date_text):
 
     return 0.0
 
-def get_job_urls(driver, max_pages=3, max_hours=24):
-    """Scrape job URLs from search pages"""
+def get_job_urls(driver, max_pages=3, max_hours=24, seen_urls=None, engine=None):
+    """Scrape job URLs from search pages, skipping jobs already in the database"""
     print(f"[Scrape] Looking for jobs posted in last {max_hours} hours...")
 
     job_urls = []
     consecutive_old_jobs = 0
+    skipped_known = 0
 
     for page in range(1, max_pages + 1):
-        url = f"https://www.upwork.com/nx/search/jobs/?q=www&sort=recency&page={page}&per_page=50"
+        url = search_url("www", page)
         print(f"[Scrape] Page {page}: {url}")
 
+        started = time.monotonic()
         driver.get(url)
-        human_pause(2, 4)
+        SEARCH_READY.settle(driver, started, css="article[data-test='JobTile'], section[data-test*='job-tile']")
 
         # Find job cards
         job_cards = driver.find_elements(By.XPATH, "//article[@data-test='JobTile'] | //section[contains(@data-test,'job-tile')]")
@@ -195,6 +207,8 @@ def get_job_urls(driver, max_pages=3, max_hours=24):
             break
 
         print(f"[Scrape] Found {len(job_cards)} jobs on page {page}")
+        page_start = len(job_urls)
+        page_hits = []
 
         for card in job_cards:
             # Get job URL
@@ -208,6 +222,10 @@ def get_job_urls(driver, max_pages=3, max_hours=24):
             if not job_url:
                 continue
 
+            # Known jobs: the local index answers without I/O; only its hits hit the DB
+            if seen_urls is not None and job_url in seen_urls:
+                page_hits.append(job_url)
+
             # Get posting date
             date_text = None
             try:
@@ -222,19 +240,39 @@ def get_job_urls(driver, max_pages=3, max_hours=24):
                 consecutive_old_jobs += 1
                 if consecutive_old_jobs >= 5:  # Stop if we hit 5 old jobs in a row
                     print(f"[Scrape] Hit {consecutive_old_jobs} consecutive old jobs, stopping")
+                    skipped_known += drop_known(job_urls, page_start, page_hits, engine)
+                    print(f"[Scrape] Skipped {skipped_known} jobs already in database")
                     return job_urls
                 continue
 
             consecutive_old_jobs = 0
             job_urls.append({"url": job_url, "post_date": date_text})
 
-    print(f"[Scrape] Found {len(job_urls)} recent jobs")
+        skipped_known += drop_known(job_urls, page_start, page_hits, engine)
+
+    print(f"[Scrape] Found {len(job_urls)} recent jobs ({skipped_known} already in database skipped)")
     return job_urls
 
+def drop_known(job_urls, page_start, page_hits, engine):
+    """Confirm a page's seen-URL hits in one query and drop confirmed ones from job_urls"""
+    if not page_hits:
+        return 0
+    try:
+        with engine.connect() as conn:
+            known = fetch_known_urls(conn, page_hits)
+    except Exception as e:
+        print(f"[Scrape] Duplicate check failed ({e}); keeping page as-is")
+        return 0
+    kept = [j for j in job_urls[page_start:] if j["url"] not in known]
+    dropped = len(job_urls) - page_start - len(kept)
+    job_urls[page_start:] = kept
+    return dropped
+
 def scrape_job_details(driver, job_url):
     """Scrape details from a single job page"""
+    started = time.monotonic()
     driver.get(job_url)
-    human_pause(1.5, 3)
+    DETAIL_READY.settle(driver, started, css="div[data-test='Description']")
 
     details = {}
 
@@ -275,28 +313,8 @@ def scrape_job_details(driver, job_url):
 
     return details
 
-def save_job_to_db(engine, job_data):
-    """Save job to database"""
-    sql = text("""
-        INSERT INTO job_listings (
-            job_url, title, description, location, post_date, posted_time, job_link,
-            fresh, source, listing_type, created_at, updated_at
-        ) VALUES (
-            :job_url, :title, :description, :location, :post_date, :posted_time, :job_link,
-            :fresh, :source, :listing_type, NOW(), NOW()
-        )
-        ON CONFLICT (job_url) DO UPDATE SET
-            title = EXCLUDED.title,
-            description = EXCLUDED.description,
-            location = EXCLUDED.location,
-            post_date = EXCLUDED.post_date,
-            posted_time = EXCLUDED.posted_time,
-            job_link = EXCLUDED.job_link,
-            updated_at = NOW()
-    """)
-
-    with engine.begin() as conn:
-        conn.execute(sql, job_data)
+# run_standalone leaves fresh/source/listing_type (and the insert-only post_date) of existing rows alone
+UPDATE_COLUMNS = ["title", "description", "location", "posted_time", "job_link", "content_hash"]
 
 def main():
     parser = argparse.ArgumentParser(description="Standalone Upwork scraper")
@@ -315,6 +333,7 @@ def main():
 
     # Set up browser
     driver = setup_driver(use_uc=args.uc)
+    writer = None
 
     try:
         # Login phase
@@ -323,15 +342,19 @@ def main():
             return
 
         # Get job URLs
-        job_urls = get_job_urls(driver, max_pages=args.pages, max_hours=args.hours)
+        seen_urls = load_seen_urls(engine)
+        job_urls = get_job_urls(driver, max_pages=args.pages, max_hours=args.hours,
+                                seen_urls=seen_urls, engine=engine)
 
         if not job_urls:
             print("❌ No recent jobs found")
             return
 
-        # Scrape each job
+        # Scrape each job; rows are upserted in multi-row batches while the browser moves on
         print(f"\n📝 Scraping {len(job_urls)} jobs...")
-        saved_count = 0
+        writer = JobBatchWriter(engine, update_columns=UPDATE_COLUMNS)
+        flush_on_exit(writer)
+        pending = []
 
         for i, job_info in enumerate(job_urls, 1):
             job_url = job_info["url"]
@@ -352,17 +375,28 @@ def main():
                     "source": "upwork",
                     "listing_type": "job"
                 }
+                job_data["content_hash"] = content_hash(job_data)
 
-                save_job_to_db(engine, job_data)
-                saved_count += 1
-
-                title = details.get("title", "Untitled")[:50]
-                print(f"     ✅ Saved: {title}")
+                pending.append((job_url, writer.add(job_data)))
+                title = (details.get("title") or "Untitled")[:50]
+                print(f"     ✅ Scraped: {title}")
 
             except Exception as e:
                 print(f"     ❌ Error: {e}")
 
+        writer.close()
+        saved_count = 0
+        for job_url, future in pending:
+            if future.exception() is None:
+                saved_count += 1
+            else:
+                print(f"     ❌ DB error for {job_url}: {future.exception()}")
+        for line in writer.summary_lines():
+            print(f"   💾 {line}")
+
         print(f"\n🎉 Done! Saved {saved_count}/{len(job_urls)} jobs to database")
+        for ready in (SEARCH_READY, DETAIL_READY):
+            print(f"   ⏱️  {ready.summary()}")
 
     except KeyboardInterrupt:
         print("\n⚠️  Interrupted by user")
@@ -373,6 +407,8 @@ def main():
             driver.quit()
         except:
             pass
+        if writer is not None:
+            writer.close()
         engine.dispose()
 
 if __name__ == "__main__":
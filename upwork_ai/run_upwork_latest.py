@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
 import os
 import time
-import shutil
 import random
 import platform
 import requests
@@ -16,7 +16,32 @@ try:
     import undetected_chromedriver as uc  # optional alternative driver
 except Exception:
     uc = None
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from scraper.seen_urls import fetch_known_urls, load_seen_urls
+from scraper.detail_pool import PolitenessBudget, close_drivers, open_worker_drivers
+try:
+    from scraper.http_fetch import ChallengePage, HttpDetailFetcher, session_from_driver
+    from scraper.page_parser import parse_job_summary  # requires lxml
+except Exception:
+    parse_job_summary = None
+from scraper.pipeline import StreamingPipeline
+from scraper.orchestrator import AsyncOrchestrator, AsyncPipeline
+from scraper.blocking import ResourceBlocker, page_load_strategy
+from scraper.readiness import PageReadiness
+from scraper.corpus import PageRecorder
+from scraper.tile_harvest import harvest_tiles
+from scraper.queries import QueryFanout, load_queries, parse_queries
+from scraper.site import LOGIN_URL, search_url
+from scraper.chrome import HEADLESS, PROFILE_BASE_DIR, STABLE_PROFILE, find_chrome_binary
+from scraper.rails import RAILS_BASE_URL, SCRAPER_ID, send_to_rails
+from scraper.warm_browser import (RunLease, attach_driver, daemon_address, detach_driver, record_stealth, session_status,
+                                  stealth_registered)
+from scraper.watermarks import load_watermark, posted_at_from_label, save_watermark
+from scraper.journal import RunJournal
+from scraper.profile_pool import ProfilePool
+from scraper.progress import ProgressPublisher
+from scraper.batch_writer import JobBatchWriter, content_hash, flush_on_exit
+from scraper.api_upload import BulkUploader
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql+pg8000://postgres@localhost:5432/lead_system_development")
 # Force pg8000 driver if the URL came without a driver
@@ -32,29 +57,6 @@ FORCE_LOGIN_PAGE = os.environ.get("FORCE_LOGIN_PAGE", "false").lower() in ("1",
 UPLOAD_DEST = os.environ.get("UPLOAD_DEST", "db").lower()
 RAILS_API_URL = os.environ.get("RAILS_API_URL", "http://localhost:3000/api/job_listings")
 
-# Rails communication setup
-RAILS_BASE_URL = os.environ.get("RAILS_BASE_URL", "http://localhost:4242")
-SCRAPER_ID = os.environ.get("SCRAPER_ID")
-
-def send_to_rails(endpoint, data=None):
-    """Send API request to Rails app"""
-    if not SCRAPER_ID:
-        print(f"[Warning] SCRAPER_ID not set, skipping Rails communication")
-        return
-
-    url = f"{RAILS_BASE_URL}/scrapers/{SCRAPER_ID}/{endpoint}"
-    try:
-        if data:
-            response = requests.post(url, json=data, timeout=10)
-        else:
-            response = requests.post(url, timeout=10)
-        if response.status_code == 200:
-            print(f"[Rails] {endpoint} - success")
-        else:
-            print(f"[Rails] {endpoint} - failed: {response.status_code}")
-    except Exception as e:
-        print(f"[Rails] {endpoint} - error: {e}")
-
 def wait_for_continue(driver, target_url: str, max_wait_seconds: int = 1800):
     """Wait for explicit Continue signal when running via Rails; otherwise, allow a manual Enter fallback.
 
@@ -163,57 +165,44 @@ def wait_until_jobs_accessible(driver, target_url: str, max_wait_seconds: int =
             return False
         time.sleep(5)
 
-def log_progress(message):
-    """Send progress message to Rails for display"""
+# Set by main() for the run
+ORCHESTRATOR = None
+# Progress then goes out in coalesced background batches instead of one blocking POST per message
+PROGRESS = None
+
+def log_progress(message, low_priority=False):
+    """Send progress message to Rails for display (per-job chatter is low priority and may be merged)"""
     print(f"[Progress] {message}")
-    send_to_rails("add_progress", {"message": message})
+    if PROGRESS is not None:
+        PROGRESS.publish(message, low_priority=low_priority)
+    else:
+        send_to_rails("add_progress", {"message": message})
 
 # Very small, targeted scraper: open Upwork, let user log in, scrape a few pages of 'www' recent jobs,
 # then POST minimal fields to Rails API. Avoids detection using undetected-chromedriver.
 
-def find_chrome_binary():
-    # Allow override via environment variable
-    override = os.environ.get("CHROME_BIN")
-    if override and os.path.exists(override):
-        return override
-    candidates = [
-        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-        "/Applications/Google Chrome 2.app/Contents/MacOS/Google Chrome",
-        "/Applications/Google Chrome Canary.app/Contents/MacOS/Google Chrome Canary",
-        "/Applications/Chromium.app/Contents/MacOS/Chromium",
-        "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
-        "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
-        "/opt/homebrew/bin/chromium",
-        "/usr/local/bin/google-chrome",
-        "/usr/bin/google-chrome",
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
+def lease_profile() -> str:
+    """Lease a pool copy of the stable profile, or a throwaway temp profile when every slot is taken."""
+    lease = PROFILES.lease()
+    if lease is not None:
+        return lease.path
+    temp_profile = os.path.join(PROFILES.base_dir, f"chrome_profile_tmp_{int(time.time())}_{os.getpid()}")
+    os.makedirs(temp_profile, exist_ok=True)
+    return temp_profile
 
 
-def setup_driver(driver_type: str = "selenium"):
+def setup_driver(driver_type: str = "selenium", profile_dir: str = None):
     # We'll align UA and UA-CH to the actual Chrome version after driver starts
 
-    # Base directories
-    base_dir = os.path.join(os.getcwd(), "upwork_ai")
-    os.makedirs(base_dir, exist_ok=True)
+    if profile_dir:
+        # Dedicated profile (e.g. a detail worker): no lock negotiation with the stable profile
+        os.makedirs(profile_dir, exist_ok=True)
+        return _start_driver(driver_type, profile_dir)
 
-    # Stable base profile for persistent login; live in repo workspace
-    stable_profile = os.path.join(base_dir, "chrome_profile")
+    # Stable base profile for persistent login, shared with browser_daemon.py
+    stable_profile = STABLE_PROFILE
     os.makedirs(stable_profile, exist_ok=True)
 
-    # Create a unique temporary profile per run for fallback
-    run_id = f"{int(time.time())}_{os.getpid()}"
-    temp_profile = os.path.join(base_dir, f"chrome_profile_tmp_{run_id}")
-    if os.path.exists(temp_profile):
-        try:
-            shutil.rmtree(temp_profile)
-        except Exception:
-            pass
-    os.makedirs(temp_profile, exist_ok=True)
-
     # Detect if the stable profile is locked by checking Chrome's singleton lock files
     lock_files = [
         os.path.join(stable_profile, "SingletonLock"),
@@ -228,15 +217,13 @@ def setup_driver(driver_type: str = "selenium"):
         time.sleep(2)
         waited += 2
     if any(os.path.exists(f) for f in lock_files):
-        print("Stable profile still locked; falling back to a temporary profile for this run.")
-        # Create a brand-new unique temp dir to guarantee no lock contention
-        run_id_tmp = f"{int(time.time())}_{os.getpid()}"
-        use_profile = os.path.join(base_dir, f"chrome_profile_tmp_{run_id_tmp}")
-        try:
-            os.makedirs(use_profile, exist_ok=False)
-        except Exception:
-            pass
+        print("Stable profile still locked; falling back to a pooled copy of it for this run.")
+        use_profile = lease_profile()
 
+    return _start_driver(driver_type, use_profile)
+
+
+def _start_driver(driver_type: str, use_profile: str):
     # Set up Selenium options (used by both UC and fallback)
     sel_opts = SeleniumOptions()
     # Avoid passing a static --user-agent; we'll override via CDP to match installed Chrome
@@ -248,6 +235,9 @@ def setup_driver(driver_type: str = "selenium"):
     sel_opts.add_argument("--lang=en-US,en;q=0.9")
     sel_opts.add_argument(f"--user-data-dir={use_profile}")
     sel_opts.add_argument("--profile-directory=Default")
+    sel_opts.page_load_strategy = page_load_strategy()
+    if HEADLESS:
+        sel_opts.add_argument("--headless=new")
     # Keep browser open if the driver stops unexpectedly (prevents sudden close on edge cases)
     try:
         sel_opts.add_experimental_option("detach", True)
@@ -284,8 +274,22 @@ def setup_driver(driver_type: str = "selenium"):
     else:
         driver = webdriver.Chrome(options=sel_opts)
 
+    return prepare_driver(driver)
+
+
+def prepare_driver(driver, stealth_scripts: bool = True):
+    """Window size, request blocking and stealth patches; also applied to attached warm browsers.
+
+    The stealth patches are new-document scripts that stay registered on the tab after the
+    session ends, so an attached warm browser gets them only once (stealth_scripts=False after).
+    """
     driver.set_window_size(1280, 900)
 
+    # Skip images, media, fonts and trackers (SCRAPER_BLOCK); the scrapers only read DOM text
+    BLOCKER.apply(driver)
+    if not stealth_scripts:
+        return driver
+
     # Stronger stealth: navigator.webdriver, languages, plugins, vendor, platform, WebGL parameters
     try:
         driver.execute_cdp_cmd(
@@ -337,13 +341,37 @@ def setup_driver(driver_type: str = "selenium"):
     return driver
 
 
+def attach_warm_browser():
+    """Attach to browser_daemon.py's logged-in Chrome; returns (driver, lease) or (None, None)."""
+    address = daemon_address()
+    if not address:
+        return None, None
+    lease = RunLease()
+    if not lease.acquire():
+        print("[Daemon] Warm browser is busy with another run; launching a fresh one")
+        return None, None
+    start = time.perf_counter()
+    try:
+        driver = attach_driver(address, page_load_strategy())
+    except Exception as e:
+        lease.release()
+        print(f"[Daemon] Could not attach to {address}: {e}")
+        return None, None
+    registered = stealth_registered(driver)
+    prepare_driver(driver, stealth_scripts=not registered)
+    if not registered:
+        record_stealth(driver)
+    print(f"[Daemon] Attached to warm browser at {address} in {time.perf_counter() - start:.2f}s")
+    return driver, lease
+
+
 def wait_for_login(driver, timeout_seconds: int = 1200) -> bool:
     """
     Navigate to login, signal Rails that login is ready, then wait for continue signal from Rails UI.
     After continue signal, verify access to the protected jobs page, then continue.
     """
-    login_url = 'https://www.upwork.com/ab/account-security/login'
-    target_url = "https://www.upwork.com/nx/search/jobs/?q=www&sort=recency&page=1&per_page=50"
+    login_url = LOGIN_URL
+    target_url = search_url("www", 1)
     driver.get(login_url)
 
     # Signal to Rails that login page is ready (no-op if SCRAPER_ID not set)
@@ -399,6 +427,25 @@ def maybe_human_pause(min_s=1.5, max_s=3.5):
     time.sleep(random.uniform(min_s, max_s))
 
 
+# Readiness waits replace the fixed post-navigation sleeps; pacing targets count from navigation start
+JOB_TILE_CSS = "article[data-test='JobTile'], section[data-test*='job-tile']"
+BLOCKER = ResourceBlocker.from_env()
+RECORDER = PageRecorder.from_env()
+# Reusable copies of the stable profile for worker/search browsers and for runs that find it locked
+PROFILES = ProfilePool(PROFILE_BASE_DIR)
+SEARCH_READY = PageReadiness("search", pace=(3.5, 6.5), meter=BLOCKER, recorder=RECORDER)
+DETAIL_READY = PageReadiness("detail", pace=(1.7, 3.2), meter=BLOCKER, recorder=RECORDER)
+
+
+CHALLENGE_TOKENS = ["captcha", "challenge", "verify", "cf-challenge", "cloudflare", "just a moment"]
+
+
+def looks_like_challenge(url: str, title: str) -> bool:
+    url = (url or "").lower()
+    title = (title or "").lower()
+    return any(t in url for t in CHALLENGE_TOKENS) or any(t in title for t in CHALLENGE_TOKENS)
+
+
 def ensure_no_challenge(driver, max_wait: int = 600):
     try:
         url = (driver.current_url or "").lower()
@@ -407,8 +454,7 @@ def ensure_no_challenge(driver, max_wait: int = 600):
             title = (driver.title or "").lower()
         except Exception:
             pass
-        challenge_tokens = ["captcha", "challenge", "verify", "cf-challenge", "cloudflare", "just a moment"]
-        if any(t in url for t in challenge_tokens) or any(t in title for t in challenge_tokens):
+        if looks_like_challenge(url, title):
             print("Site challenge detected. Solve it in Chrome; I'll wait…")
             start = time.time()
             while time.time() - start < max_wait:
@@ -419,81 +465,148 @@ def ensure_no_challenge(driver, max_wait: int = 600):
                 except Exception:
                     url = ""
                     title = ""
-                if not any(t in url for t in challenge_tokens) and not any(t in title for t in challenge_tokens):
+                if not looks_like_challenge(url, title):
                     print("Challenge cleared; continuing…")
                     break
     except Exception:
         pass
 
 
-def get_recent_job_urls(driver, max_pages: int, max_hours_old: int):
-    results = []
+def drop_known_urls(items, seen_urls, engine):
+    """Remove items whose URL is already stored. The seen-URL index answers locally;
+    only its positive hits are confirmed against Postgres, in one query."""
+    if seen_urls is None or not items:
+        return items
+    hits = [item["url"] for item in items if item["url"] in seen_urls]
+    if not hits:
+        return items
+    try:
+        with engine.connect() as conn:
+            known = fetch_known_urls(conn, hits)
+    except Exception as e:
+        print(f"[SeenUrls] Confirmation query failed ({e}); keeping {len(hits)} unconfirmed hits")
+        return items
+    if known:
+        print(f"[Scraper] Skipping {len(known)} already-stored jobs")
+    return [item for item in items if item["url"] not in known]
+
+
+def harvest_tiles_per_element(driver):
+    """Per-card WebDriver probes; slow (one round trip per XPath attempt) but tolerant."""
+    tiles = []
+    job_cards = driver.find_elements(By.XPATH, "//article[@data-test='JobTile'] | //section[contains(@data-test,'job-tile')]")
+    for card in job_cards:
+        # Link
+        href = None
+        for xp_link in [".//h2//a", ".//h4//a", ".//a[@data-test='job-title']/@href"]:
+            try:
+                if "@href" in xp_link:
+                    el = card.find_element(By.XPATH, xp_link.replace("/@href", ""))
+                    href = el.get_attribute("href")
+                else:
+                    el = card.find_element(By.XPATH, xp_link)
+                    href = el.get_attribute("href")
+                if href:
+                    break
+            except Exception:
+                continue
+
+        # Date label
+        label = None
+        for xp_date in [
+            ".//small[contains(@data-test,'published-date')]//span[last()]",
+            ".//small[contains(@data-test,'pubilshed-date')]//span[last()]",
+            ".//small[contains(@data-test,'posted')]//span[last()]",
+            ".//small[contains(@data-test,'date')]//span[last()]",
+        ]:
+            try:
+                el = card.find_element(By.XPATH, xp_date)
+                label = el.text
+                if label:
+                    break
+            except Exception:
+                continue
+        tiles.append({"href": href, "date_label": label})
+    return tiles
+
+
+def iter_recent_job_pages(driver, max_pages: int, max_hours_old: int, seen_urls=None, engine=None,
+                          query: str = "www", watermark=None, counters=None, start_page: int = 1):
+    """Yield the new, recent jobs of each search page as soon as that page is harvested.
+
+    With a watermark, pagination of this query stops at the newest job of its last successful run.
+    """
     consecutive_old = 0
     old_limit = 5
-    for page in range(1, max_pages + 1):
-        url = f"https://www.upwork.com/nx/search/jobs/?q=www&sort=recency&page={page}&per_page=50"
+    for page in range(start_page, max_pages + 1):
+        url = search_url(query, page)
+        started = time.monotonic()
         driver.get(url)
-        maybe_human_pause(2.0, 4.0)
+        SEARCH_READY.settle(driver, started, css=JOB_TILE_CSS)
         ensure_no_challenge(driver)
 
-        # Collect job tiles robustly
-        job_cards = driver.find_elements(By.XPATH, "//article[@data-test='JobTile'] | //section[contains(@data-test,'job-tile')]")
-        if not job_cards:
+        # Collect job tiles in one injected script; fall back to per-element probes only if it finds nothing
+        tiles, harvest_seconds = harvest_tiles(driver)
+        harvest_mode = "script"
+        if not tiles:
+            start = time.perf_counter()
+            tiles = harvest_tiles_per_element(driver)
+            harvest_seconds += time.perf_counter() - start
+            harvest_mode = "per-element"
+        print(f"[Harvest] {query!r} page {page}: {len(tiles)} tiles via {harvest_mode} in {harvest_seconds * 1000:.0f} ms")
+        if counters is not None:
+            counters.pages += 1
+            counters.tiles += len(tiles)
+        if not tiles:
+            if counters is not None:
+                counters.stop = "empty page"
             # Extra diagnostics to help understand why we might see 0 URLs
             try:
                 print(f"[Scraper] No job cards on page {page}. URL={driver.current_url} Title={driver.title}")
             except Exception:
                 print(f"[Scraper] No job cards on page {page}. (Could not get URL/title)")
             break
-        for card in job_cards:
-            # Link
-            href = None
-            for xp_link in [".//h2//a", ".//h4//a", ".//a[@data-test='job-title']/@href"]:
-                try:
-                    if "@href" in xp_link:
-                        el = card.find_element(By.XPATH, xp_link.replace("/@href", ""))
-                        href = el.get_attribute("href")
-                    else:
-                        el = card.find_element(By.XPATH, xp_link)
-                        href = el.get_attribute("href")
-                    if href:
-                        break
-                except Exception:
-                    continue
-
-            # Date label
-            label = None
-            for xp_date in [
-                ".//small[contains(@data-test,'published-date')]//span[last()]",
-                ".//small[contains(@data-test,'pubilshed-date')]//span[last()]",
-                ".//small[contains(@data-test,'posted')]//span[last()]",
-                ".//small[contains(@data-test,'date')]//span[last()]",
-            ]:
-                try:
-                    el = card.find_element(By.XPATH, xp_date)
-                    label = el.text
-                    if label:
-                        break
-                except Exception:
-                    continue
-
+        page_items = []
+        hit_old_limit = False
+        hit_watermark = False
+        for tile in tiles:
+            href = tile.get("href")
+            label = tile.get("date_label")
             if not href:
                 continue
 
+            if watermark is not None:
+                posted_at = posted_at_from_label(label)
+                watermark.observe(href, posted_at)
+                if watermark.crossed(href, posted_at):
+                    print(f"[Watermark] {query!r} reached {watermark} at {href}")
+                    hit_watermark = True
+                    break
+
             if age_in_hours(label) >= max_hours_old:
                 consecutive_old += 1
                 if consecutive_old >= old_limit:
-                    return results
+                    hit_old_limit = True
+                    break
                 continue
             consecutive_old = 0
-            results.append({"url": href, "post_date": label})
-        maybe_human_pause(1.5, 2.5)
-    return results
-
-
-def scrape_job_details(driver, job_url: str):
+            page_items.append({"url": href, "post_date": label})
+        page_items = drop_known_urls(page_items, seen_urls, engine)
+        if watermark is not None:
+            for item in page_items:
+                watermark.hold(item["url"])  # released by on_saved once the write commits
+        log_progress(f"{query}: page {page}: {len(page_items)} new jobs queued")
+        yield page_items
+        if hit_old_limit or hit_watermark:
+            if counters is not None:
+                counters.stop = "watermark" if hit_watermark else "old jobs"
+            return
+
+
+def scrape_job_details(driver, job_url: str, pause=None):
+    started = time.monotonic()
     driver.get(job_url)
-    maybe_human_pause(1.7, 3.2)
+    DETAIL_READY.settle(driver, started, css="div[data-test='Description']", pace=pause)
     ensure_no_challenge(driver)
     data = {}
     try:
@@ -520,72 +633,139 @@ def scrape_job_details(driver, job_url: str):
     return data
 
 
-def upsert_job(engine, job):
-    sql = text(
-        """
-        INSERT INTO job_listings (
-            job_url, title, description, location, post_date, posted_time, job_link,
-            fresh, source, listing_type, created_at, updated_at
-        ) VALUES (
-            :job_url, :title, :description, :location, :post_date, :posted_time, :job_link,
-            :fresh, :source, :listing_type, NOW(), NOW()
-        )
-        ON CONFLICT (job_url) DO UPDATE SET
-            title = EXCLUDED.title,
-            description = EXCLUDED.description,
-            location = EXCLUDED.location,
-            post_date = EXCLUDED.post_date,
-            posted_time = EXCLUDED.posted_time,
-            job_link = EXCLUDED.job_link,
-            fresh = EXCLUDED.fresh,
-            source = EXCLUDED.source,
-            listing_type = EXCLUDED.listing_type,
-            updated_at = NOW();
-        """
-    )
-    with engine.begin() as conn:
-        conn.execute(sql, job)
-
-
-def post_job_to_api(job):
-    """Send a single job listing to the Rails API (/api/job_listings)."""
-    payload = {"job_listing": job}
-    try:
-        resp = requests.post(RAILS_API_URL, json=payload, timeout=15)
-        if resp.status_code in (200, 201):
-            return True, None
-        return False, f"{resp.status_code} {resp.text[:200]}"
-    except Exception as e:
-        return False, str(e)
-
-
 def main():
+    """Run one scrape; returns the number of jobs saved, or None if the run did not complete."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--hours", type=int, default=24)
     parser.add_argument("--pages", type=int, default=3)
     parser.add_argument("--driver", choices=["selenium", "uc"], default=os.environ.get("SCRAPER_DRIVER", "selenium"))
+    parser.add_argument("--fetch-mode", choices=["browser", "http"], default=os.environ.get("SCRAPER_FETCH_MODE", "browser"),
+                        help="How job detail pages are loaded: full browser render, or HTTP with the browser's cookies")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SCRAPER_WORKERS", "1")),
+                        help="Detail workers: browsers (1 = reuse the login browser), or HTTP connections with --fetch-mode=http")
+    parser.add_argument("--worker-pause", default=os.environ.get("SCRAPER_WORKER_PAUSE"),
+                        help="Per-worker pause range after each job page load, as 'min,max' seconds "
+                             "(default: the detail pacing, SCRAPER_PACE_DETAIL or 1.7,3.2)")
+    parser.add_argument("--min-interval", type=float, default=float(os.environ.get("SCRAPER_MIN_INTERVAL", "1.0")),
+                        help="Global minimum seconds between job page loads across all workers")
+    parser.add_argument("--queries", default=None,
+                        help="Comma separated search queries (default: SCRAPER_QUERIES, then the scraper's config_json, then 'www')")
+    parser.add_argument("--search-workers", type=int, default=int(os.environ.get("SCRAPER_SEARCH_WORKERS", "1")),
+                        help="Browsers paginating queries concurrently (1 = all queries in turn on the login browser)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted run from its journal instead of starting over")
+    parser.add_argument("--browser", choices=["auto", "attach", "launch"], default=os.environ.get("SCRAPER_BROWSER", "auto"),
+                        help="attach: use the warm browser kept by browser_daemon.py and fail without one; "
+                             "auto: use it when available, else launch Chrome; launch: always start a fresh Chrome")
+    parser.add_argument("--orchestrator", choices=["async", "threads"], default=os.environ.get("SCRAPER_ORCHESTRATOR", "async"),
+                        help="async: asyncio loop with one executor per browser and bounded write tasks; threads: StreamingPipeline")
+    parser.add_argument("--verbose", action="store_true", default=os.environ.get("SCRAPER_VERBOSE", "") not in ("", "0"),
+                        help="Print per-page readiness timings (SCRAPER_VERBOSE=1)")
     args = parser.parse_args()
-
-    # Build SQLAlchemy engine only in DB mode
+    worker_pause = tuple(float(x) for x in args.worker_pause.split(",", 1)) if args.worker_pause else None
+    SEARCH_READY.verbose = DETAIL_READY.verbose = args.verbose
+    if args.fetch_mode == "http" and parse_job_summary is None:
+        print("[Scraper] --fetch-mode=http needs lxml (pip install lxml); using the browser")
+        args.fetch_mode = "browser"
+
+    # Attach first: with --browser attach and no usable daemon the run stops before anything starts
+    driver, lease = attach_warm_browser() if args.browser != "launch" else (None, None)
+    attached = driver is not None
+    if not attached and args.browser == "attach":
+        raise SystemExit("[Daemon] --browser attach: no warm browser available "
+                         "(start browser_daemon.py, or use --browser auto)")
+
+    # Build SQLAlchemy engine only in DB mode; scraped jobs are upserted in multi-row batches
+    # by a write-behind thread, so the browser never waits on Postgres
     engine = None
     if UPLOAD_DEST == "db":
         engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
+        writer = JobBatchWriter(engine)
+    else:
+        # API mode: gzip'd batches to /api/job_listings/bulk over one keep-alive session
+        writer = BulkUploader(RAILS_API_URL)
+    flush_on_exit(writer)
 
-    driver = setup_driver(args.driver)
-    print("Opening Upwork and waiting for login…")
-    try:
-        # Wait for user to complete login in the Chrome window, then click Continue in Rails UI
-        wait_for_login(driver, timeout_seconds=600)
-        log_progress("Login completed, starting to collect job URLs...")
+    global ORCHESTRATOR, PROGRESS
+    if args.orchestrator == "async":
+        ORCHESTRATOR = AsyncOrchestrator().start()
+    if SCRAPER_ID:
+        PROGRESS = ProgressPublisher(f"{RAILS_BASE_URL}/scrapers/{SCRAPER_ID}/add_progress").start()
 
-        urls = get_recent_job_urls(driver, max_pages=args.pages, max_hours_old=args.hours)
-        log_progress(f"Found {len(urls)} job URLs to scrape")
+    def make_pipeline(scrape, **kwargs):
+        if ORCHESTRATOR is not None:
+            return AsyncPipeline(ORCHESTRATOR, scrape, write_job, on_saved=on_saved, on_error=on_error, **kwargs)
+        return StreamingPipeline(scrape, write_job, on_saved=on_saved, on_error=on_error, **kwargs)
 
-        scraped_count = 0
-        for i, item in enumerate(urls, 1):
-            log_progress(f"Scraping job {i}/{len(urls)}: {item.get('url', 'Unknown URL')}")
+    # Every extra browser of this run gets its own slot (plus one for a locked stable profile)
+    PROFILES.size = max(PROFILES.size, args.workers + args.search_workers + 1)
+    PROFILES.prune()
+
+    if not attached:
+        driver = setup_driver(args.driver)
+    journal = None
+    completed = False
+    try:
+        logged_in, expires = session_status(driver) if attached else (False, None)
+        if logged_in:
+            until = time.strftime("%Y-%m-%d %H:%M", time.localtime(expires)) if expires else "end of browser session"
+            log_progress(f"Warm browser already logged in (session valid until {until}), starting to collect job URLs...")
+        else:
+            print("Opening Upwork and waiting for login…")
+            # Wait for user to complete login in the Chrome window, then click Continue in Rails UI
+            wait_for_login(driver, timeout_seconds=600)
+            log_progress("Login completed, starting to collect job URLs...")
+
+        seen_urls = load_seen_urls(engine) if engine is not None else None
+        queries = parse_queries(args.queries) if args.queries else load_queries(engine, SCRAPER_ID)
+        watermarks = {q: load_watermark(engine, q) for q in queries}
+
+        # Run journal: harvested pages, scraped details and committed writes, so --resume
+        # re-fetches only unfinished jobs and skips queries that were already paginated
+        journal = RunJournal.open(resume=args.resume, queries=queries, hours=args.hours, pages=args.pages)
+        resumed = journal.pending_items()
+        queries = [q for q in queries if q not in journal.queries_done]
+        if resumed:
+            log_progress(f"Resuming {len(resumed)} unfinished jobs from the last run")
+        log_progress(f"Searching {len(queries)} queries: {', '.join(queries)}")
+
+        # Several queries can paginate concurrently on extra search browsers; those leave the
+        # login browser free for the detail stage, which runs on the caller's thread
+        search_drivers = []
+        if args.search_workers > 1 and len(queries) > 1:
+            search_drivers = open_worker_drivers(
+                driver,
+                lambda i: setup_driver(args.driver, profile_dir=lease_profile()),
+                min(args.search_workers, len(queries)),
+            )
 
-            details = scrape_job_details(driver, item["url"]) or {}
+        def query_pages(drv, query, counters):
+            page = journal.last_page.get(query, 0)
+            for items in iter_recent_job_pages(drv, max_pages=args.pages, max_hours_old=args.hours, seen_urls=seen_urls,
+                                               engine=engine, query=query, watermark=watermarks[query],
+                                               counters=counters, start_page=page + 1):
+                page += 1
+                journal.record_page(query, page, items)
+                yield items
+            journal.record_query_done(query)
+
+        fanout = QueryFanout(queries, query_pages, search_drivers or [driver], seen=journal.harvested)
+        pages = itertools.chain([resumed], fanout.pages()) if resumed else fanout.pages()
+        verb = "Uploaded" if UPLOAD_DEST == "api" else "Saved"
+
+        def make_scraper(drv, budget=None):
+            def scrape_item(item):
+                if item["url"] in journal.scraped:
+                    return journal.scraped[item["url"]]
+                log_progress(f"Scraping job {pipeline.stats.scraped + 1}/{pipeline.stats.harvested}: {item.get('url', 'Unknown URL')}",
+                             low_priority=True)
+                if budget is not None:
+                    budget.acquire()
+                details = scrape_job_details(drv, item["url"], pause=worker_pause) or {}
+                return build_job(item, details)
+            return scrape_item
+
+        def build_job(item, details):
             job = {
                 "job_url": item.get("url"),
                 "post_date": item.get("post_date"),
@@ -598,42 +778,138 @@ def main():
                 "source": "upwork",
                 "listing_type": "job",
             }
-            try:
-                if UPLOAD_DEST == "api":
-                    ok, err = post_job_to_api(job)
-                    if ok:
-                        scraped_count += 1
-                        job_title = job.get('title', 'Untitled')[:50] + ('...' if len(job.get('title', '')) > 50 else '')
-                        log_progress(f"✅ Uploaded: {job_title}")
-                        print(f"Uploaded: {job['job_url']}")
-                    else:
-                        log_progress(f"❌ Failed to upload job: {err}")
-                        print(f"API error for {job['job_url']}: {err}")
-                else:
-                    upsert_job(engine, job)
-                    scraped_count += 1
-                    job_title = job.get('title', 'Untitled')[:50] + ('...' if len(job.get('title', '')) > 50 else '')
-                    log_progress(f"✅ Saved: {job_title}")
-                    print(f"Upserted: {job['job_url']}")
-            except Exception as e:
-                if UPLOAD_DEST == "api":
-                    log_progress(f"❌ Failed to upload job: {e}")
-                    print(f"API error for {job['job_url']}: {e}")
-                else:
-                    log_progress(f"❌ Failed to save job: {e}")
-                    print(f"DB error for {job['job_url']}: {e}")
-
-        log_progress(f"🎉 Scraping completed! Successfully saved {scraped_count}/{len(urls)} jobs")
+            job["content_hash"] = content_hash(job)
+            journal.record_scraped(job)
+            return job
+
+        def write_job(job):
+            return writer.add(job)
+
+        def on_saved(job):
+            title = job.get('title') or 'Untitled'
+            job_title = title[:50] + ('...' if len(title) > 50 else '')
+            log_progress(f"✅ {verb}: {job_title}", low_priority=True)
+            print(f"{'Uploaded' if UPLOAD_DEST == 'api' else 'Upserted'}: {job['job_url']}")
+            journal.record_committed(job["job_url"])
+            # A job shared by several queries is only scraped for one of them; release it everywhere
+            for wm in watermarks.values():
+                wm.release(job["job_url"])
+
+        def on_error(job, e):
+            # Called with the scraped record when a write fails, and with the harvested
+            # item ({"url", "post_date"}) when its detail scrape raised
+            if "job_url" not in job:
+                log_progress(f"❌ Failed to scrape job: {e}")
+                print(f"Scrape error for {job.get('url')}: {e}")
+            elif UPLOAD_DEST == "api":
+                log_progress(f"❌ Failed to upload job: {e}")
+                print(f"API error for {job['job_url']}: {e}")
+            else:
+                log_progress(f"❌ Failed to save job: {e}")
+                print(f"DB error for {job['job_url']}: {e}")
+
+        # HTTP mode: detail pages come over keep-alive connections carrying the browser's session;
+        # URLs that hit a challenge are retried in the browser after the run
+        browser_fallback = []
+
+        def make_http_scraper(fetcher, budget):
+            def scrape_item(item):
+                if item["url"] in journal.scraped:
+                    return journal.scraped[item["url"]]
+                budget.acquire()
+                try:
+                    html = fetcher.fetch(item["url"])
+                except ChallengePage as e:
+                    print(f"[HTTP] Challenge for {item['url']}: {e}; deferring to browser")
+                    browser_fallback.append(item)
+                    return None
+                return build_job(item, parse_job_summary(html))
+            return scrape_item
+
+        # Detail workers: extra browsers on their own profiles sharing the login cookies
+        worker_drivers = []
+        fetcher = None
+        if args.fetch_mode == "http":
+            fetcher = HttpDetailFetcher(session_from_driver(driver, pool_size=args.workers), looks_like_challenge)
+            log_progress(f"HTTP detail fetch: {max(1, args.workers)} connections, ≥{args.min_interval:.1f}s between requests")
+        elif args.workers > 1:
+            worker_drivers = open_worker_drivers(
+                driver,
+                lambda i: setup_driver(args.driver, profile_dir=lease_profile()),
+                args.workers,
+            )
+            log_progress(f"Detail pool: {len(worker_drivers)} worker browsers, ≥{args.min_interval:.1f}s between page loads")
+        budget = PolitenessBudget(args.min_interval)
+        if fetcher is not None:
+            detail_workers = [make_http_scraper(fetcher, budget) for _ in range(max(1, args.workers))]
+        else:
+            detail_workers = [make_scraper(d, budget) for d in worker_drivers]
 
-        # Done: close the browser cleanly now
+        pipeline = make_pipeline(make_scraper(driver), detail_workers=detail_workers)
         try:
-            driver.quit()
-        except Exception:
-            pass
+            stats = pipeline.run(pages)
+        finally:
+            close_drivers(worker_drivers + search_drivers)
+        for line in fanout.summary_lines():
+            print(f"[Queries] {line}")
+        for line in stats.summary_lines():
+            print(f"[Pipeline] {line}")
+        for ready in (SEARCH_READY, DETAIL_READY):
+            print(f"[Readiness] {ready.summary()}")
+        for line in BLOCKER.summary_lines():
+            print(f"[Blocking] {line}")
+        saved = stats.saved
+
+        if fetcher is not None:
+            print(f"[Pipeline] {fetcher.summary()}")
+            if browser_fallback:
+                log_progress(f"Retrying {len(browser_fallback)} challenged jobs in the browser")
+                fallback = make_pipeline(make_scraper(driver))
+                saved += fallback.run([browser_fallback]).saved
+
+        # Marks stop short of jobs still held (scrape or write failed); a query that raised keeps its old mark
+        for query, wm in watermarks.items():
+            stop = fanout.counters[query].stop if query in fanout.counters else None
+            if stop and stop.startswith("error"):
+                print(f"[Watermark] Keeping {wm}: query ended with {stop}")
+                continue
+            if save_watermark(engine, wm):
+                print(f"[Watermark] Advanced to {wm}")
+
+        log_progress(f"🎉 Scraping completed! Successfully saved {saved}/{stats.harvested} jobs")
+        completed = True
+
+        # Done: close the browser cleanly now (a warm daemon browser stays open for the next run)
+        if attached:
+            detach_driver(driver)
+        else:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        return saved
     except Exception as e:
         # Leave the browser open so you can finish any challenges or inspect; report error to log
         print(f"[Scraper] Error before completion: {e}")
     finally:
+        if lease is not None:
+            lease.release()
+        PROFILES.release_all()
+        if journal is not None:
+            journal.close(finished=completed)
+        if ORCHESTRATOR is not None:
+            ORCHESTRATOR.close()
+            for line in ORCHESTRATOR.summary_lines():
+                print(f"[Orchestrator] {line}")
+            ORCHESTRATOR = None
+        if PROGRESS is not None:
+            PROGRESS.close()
+            for line in PROGRESS.summary_lines():
+                print(f"[Progress] {line}")
+            PROGRESS = None
+        writer.close()
+        for line in writer.summary_lines():
+            print(f"[Writer] {line}")
         if engine is not None:
             try:
                 engine.dispose()
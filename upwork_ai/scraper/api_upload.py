@@ -0,0 +1,143 @@
+"""
+Bulk uploads of scraped jobs to the Rails API (UPLOAD_DEST=api).
+
+post_job_to_api sent one POST per job on a fresh connection, and Rails did
+one find_or_initialize_by per request. BulkUploader is a WriteBehind writer
+whose "connection" is a keep-alive requests.Session: queued listings go out
+as gzip-compressed JSON batches to /api/job_listings/bulk, which answers with
+one result per listing, so a 150-job run takes a handful of requests.
+
+Connection errors, 429 and 5xx answers are retried with exponential backoff;
+other errors fail the listings of that batch. A Rails app without the bulk
+route (404) is detected once and the uploader falls back to one POST per
+listing on the same session.
+
+write_batch(session, listings) is thread-safe, so a pool of threads with a
+session each (upload_to_rails.py) can share one uploader and its counters.
+"""
+import gzip
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.batch_writer import WriteBehind
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UploadError(RuntimeError):
+    pass
+
+
+class BulkUploader(WriteBehind):
+    name = "api-uploader"
+
+    def __init__(self, url: str, batch_size: int = None, retries: int = 3, backoff: float = 1.0,
+                 timeout: float = 30.0, **kwargs):
+        batch_size = batch_size or int(os.environ.get("SCRAPER_API_BATCH", "50"))
+        super().__init__(None, batch_size=batch_size, **kwargs)
+        self.url = url.rstrip("/")
+        self.bulk_url = f"{self.url}/bulk"
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bulk_supported = True
+        self.requests = 0
+        self.retried = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+        self.statuses = {}
+        self._counters = threading.Lock()
+
+    def _count(self, **deltas):
+        with self._counters:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _count_status(self, status):
+        with self._counters:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def connect(self):
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        return session
+
+    def _post(self, session, url, payload, compress=True):
+        """POST payload as JSON (gzip'd when compress), retrying transient failures; returns the response."""
+        raw = json.dumps(payload, default=str).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        body = raw
+        if compress:
+            body = gzip.compress(raw, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count(retried=1)
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.8, 1.2))
+            self._count(requests=1, bytes_raw=len(raw), bytes_sent=len(body))
+            try:
+                response = session.post(url, data=body, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = UploadError(str(e))
+                continue
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            error = UploadError(f"{response.status_code} {response.text[:200]}")
+        raise error
+
+    def write_batch(self, session, records):
+        if self.bulk_supported:
+            response = self._post(session, self.bulk_url, {"job_listings": records})
+            if response.status_code == 404:
+                print("[Upload] Rails has no /api/job_listings/bulk route; posting listings one by one")
+                self.bulk_supported = False
+            else:
+                if response.status_code != 200:
+                    raise UploadError(f"{response.status_code} {response.text[:200]}")
+                results = response.json().get("results") or []
+                if len(results) != len(records):
+                    raise UploadError(f"expected {len(records)} results, got {len(results)}")
+                errors = []
+                for result in results:
+                    status = result.get("status", "error")
+                    self._count_status(status)
+                    errors.append(None if status != "error" else UploadError("; ".join(result.get("errors") or [status])))
+                return errors
+        errors = []
+        for job in records:
+            response = self._post(session, self.url, {"job_listing": job}, compress=False)
+            if response.status_code in (200, 201):
+                self._count_status("posted")
+                errors.append(None)
+            else:
+                errors.append(UploadError(f"{response.status_code} {response.text[:200]}"))
+        return errors
+
+    def _run_batch(self, session, records):
+        # No transaction to retry row by row: the bulk endpoint already answers per listing
+        try:
+            errors = self.write_batch(session, records)
+            self.stats.commits += 1
+            return errors
+        except Exception as e:
+            print(f"[Upload] Batch of {len(records)} listings failed: {e}")
+            return [e] * len(records)
+
+    def summary_lines(self):
+        flushes = self.stats.flush_seconds
+        latency = (f"avg {sum(flushes) / len(flushes) * 1000:.0f} ms, max {max(flushes) * 1000:.0f} ms"
+                   if flushes else "n/a")
+        ratio = f"{self.bytes_sent / self.bytes_raw:.0%}" if self.bytes_raw else "n/a"
+        statuses = ", ".join(f"{count} {status}" for status, count in sorted(self.statuses.items())) or "none"
+        return [
+            f"{self.stats.rows} listings uploaded, {self.stats.failed} failed, in {self.stats.batches} batches / "
+            f"{self.requests} requests ({self.retried} retries)",
+            f"Results: {statuses}; batch latency {latency}; gzip {self.bytes_sent / 1024:.0f} KiB sent ({ratio} of JSON)",
+        ]
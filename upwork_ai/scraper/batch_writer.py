@@ -0,0 +1,346 @@
+"""
+Write-behind, batched writes into job_listings.
+
+The scrapers used to write inline on the browser thread, one transaction per
+job, so Postgres latency added straight to scrape time. A WriteBehind writer
+owns a dedicated thread holding one pooled connection. add() puts a record on
+a bounded queue and returns a concurrent.futures.Future at once (both
+pipelines accept such a Future from write()). When queue_size records are
+already pending, add() blocks until the writer catches up (backpressure).
+
+The thread drains the queue in batches, each in one transaction, when
+batch_size records are queued or the oldest has waited max_delay seconds.
+One bad row aborts the whole transaction, so a failed batch is retried one
+record per transaction and only that record fails. close() flushes
+everything queued; flush_on_exit() makes SIGTERM and interpreter exit take
+the same path as Ctrl-C.
+
+JobBatchWriter upserts scraped jobs with one multi-row
+
+    INSERT INTO job_listings (...) VALUES (...), (...), ... ON CONFLICT (job_url) DO UPDATE ...
+
+per batch; JobDetailsWriter applies scraped details to existing stub rows.
+Both store content_hash(), a fingerprint of the scraped text, and the upsert
+only rewrites a row when its fingerprint differs, so re-scraping an unchanged
+listing leaves the row (and its updated_at) alone. Every column the gated
+update writes is therefore either part of the fingerprint (HASH_FIELDS) or
+left out of the update: post_date holds the relative label ("5 minutes ago")
+and is only set on insert.
+"""
+import abc
+import atexit
+import hashlib
+import os
+import re
+import signal
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+
+from sqlalchemy import text
+
+JOB_COLUMNS = ["job_url", "title", "description", "location", "post_date", "posted_time", "job_link",
+               "fresh", "source", "listing_type", "content_hash"]
+UPDATE_COLUMNS = [c for c in JOB_COLUMNS[1:] if c != "post_date"]
+DETAIL_COLUMNS = ["title", "description", "location", "posted_time", "job_link", "content_hash"]
+HASH_FIELDS = ["title", "description", "location", "posted_time", "job_link"]
+# "Posted 5 minutes ago" changes on every scrape while the listing does not
+_RELATIVE_TIME = re.compile(r"\bago\b|\byesterday\b|\bjust now\b", re.IGNORECASE)
+
+
+def content_hash(job) -> str:
+    """BLAKE2b of the whitespace-normalized scraped fields; relative posted times are left out."""
+    parts = []
+    for field in HASH_FIELDS:
+        value = unicodedata.normalize("NFC", " ".join(str(job.get(field) or "").split()))
+        if field == "posted_time" and _RELATIVE_TIME.search(value):
+            value = ""
+        parts.append(value)
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def upsert_statement(rows, update_columns=UPDATE_COLUMNS):
+    """(statement, params) upserting all rows with one multi-row INSERT ... ON CONFLICT (job_url).
+
+    Rows whose content_hash is unchanged are not updated; the statement returns one
+    `inserted` flag per row it inserted or updated.
+    """
+    values, params = [], {}
+    for i, row in enumerate(rows):
+        values.append("(" + ", ".join(f":{c}_{i}" for c in JOB_COLUMNS) + ", NOW(), NOW())")
+        params.update({f"{c}_{i}": row.get(c) for c in JOB_COLUMNS})
+        params[f"content_hash_{i}"] = row.get("content_hash") or content_hash(row)
+    updates = "".join(f"{c} = EXCLUDED.{c}, " for c in update_columns)
+    sql = (f"INSERT INTO job_listings ({', '.join(JOB_COLUMNS)}, created_at, updated_at) "
+           f"VALUES {', '.join(values)} "
+           f"ON CONFLICT (job_url) DO UPDATE SET {updates}updated_at = NOW() "
+           f"WHERE job_listings.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+           f"RETURNING (xmax = 0) AS inserted")
+    return text(sql), params
+
+
+class WriterStats:
+    def __init__(self):
+        self.rows = 0
+        self.failed = 0
+        self.commits = 0
+        self.batches = 0
+        self.row_retries = 0
+        self.flush_seconds = []
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.max_depth = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+
+    def summary_lines(self):
+        busy = sum(self.flush_seconds)
+        rate = self.rows / busy if busy else 0.0
+        flushes = self.flush_seconds
+        latency = (f"avg {busy / len(flushes) * 1000:.0f} ms, max {max(flushes) * 1000:.0f} ms"
+                   if flushes else "n/a")
+        queued = self.rows + self.failed
+        wait = (f"avg {self.queue_wait_total / queued * 1000:.0f} ms, max {self.queue_wait_max * 1000:.0f} ms"
+                if queued else "n/a")
+        return [
+            f"{self.rows} rows written, {self.failed} failed, in {self.batches} batches / {self.commits} commits "
+            f"({self.row_retries} batches retried row by row)",
+            f"{rate:.0f} rows/s while flushing; flush latency {latency}",
+            f"Queue wait {wait}; depth max {self.max_depth}; "
+            f"producers blocked {self.blocked} times ({self.blocked_seconds:.1f}s)",
+        ]
+
+
+class WriteBehind(abc.ABC):
+    """Bounded queue drained in batches by a writer thread with its own connection.
+
+    Subclasses implement write_batch(conn, records), which runs inside one
+    transaction and returns one error (or None) per record; raising fails the
+    transaction and sends every record through a transaction of its own.
+    """
+
+    name = "writer"
+
+    def __init__(self, engine, batch_size: int = None, max_delay: float = None, queue_size: int = None):
+        self.engine = engine
+        self.batch_size = batch_size or int(os.environ.get("SCRAPER_WRITE_BATCH", "25"))
+        self.max_delay = max_delay if max_delay is not None else float(os.environ.get("SCRAPER_WRITE_DELAY", "2.0"))
+        self.queue_size = max(self.batch_size, queue_size or int(os.environ.get("SCRAPER_WRITE_QUEUE", "200")))
+        self.stats = WriterStats()
+        self._buffer = []  # (record, future, queued_at)
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = None
+        self._exit_hooked = False
+        self._previous_sigterm = None
+
+    def connect(self):
+        """The resource the writer thread holds for its lifetime and hands to every flush."""
+        return self.engine.connect()
+
+    @abc.abstractmethod
+    def write_batch(self, conn, records):
+        """Write records inside the current transaction; one error (or None) per record."""
+
+    def _committed(self):
+        """Called after each transaction that write_batch ran in has committed."""
+
+    def add(self, record) -> Future:
+        """Queue a record, blocking while queue_size records are pending; the Future resolves on commit."""
+        future = Future()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            if len(self._buffer) >= self.queue_size:
+                start = time.perf_counter()
+                self.stats.blocked += 1
+                while len(self._buffer) >= self.queue_size:
+                    self._cond.wait()
+                self.stats.blocked_seconds += time.perf_counter() - start
+            self._buffer.append((record, future, time.monotonic()))
+            self.stats.max_depth = max(self.stats.max_depth, len(self._buffer))
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+        return future
+
+    def _next_batch(self):
+        with self._cond:
+            while True:
+                if self._buffer:
+                    wait = self._buffer[0][2] + self.max_delay - time.monotonic()
+                    if len(self._buffer) >= self.batch_size or wait <= 0 or self._closing:
+                        batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+                        self._cond.notify_all()  # wake producers blocked on a full queue
+                        return batch
+                    self._cond.wait(wait)
+                elif self._closing:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _loop(self):
+        conn = None
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                try:
+                    conn = conn or self.connect()
+                except Exception as e:
+                    print(f"[Writer] Could not connect ({str(e).splitlines()[0]}); failing {len(batch)} records")
+                    self.stats.failed += len(batch)
+                    for _, future, _ in batch:
+                        future.set_exception(e)
+                    continue
+                self._flush(conn, batch)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _flush(self, conn, batch):
+        now = time.monotonic()
+        for _, _, queued_at in batch:
+            self.stats.queue_wait_total += now - queued_at
+            self.stats.queue_wait_max = max(self.stats.queue_wait_max, now - queued_at)
+        start = time.perf_counter()
+        errors = self._run_batch(conn, [record for record, _, _ in batch])
+        self.stats.flush_seconds.append(time.perf_counter() - start)
+        self.stats.batches += 1
+        for (_, future, _), error in zip(batch, errors):
+            if error is None:
+                self.stats.rows += 1
+                future.set_result(True)
+            else:
+                self.stats.failed += 1
+                future.set_exception(error)
+
+    def _run_batch(self, conn, records):
+        """Write one batch; returns one error (or None) per record. Here: one transaction,
+        retried one record per transaction when it fails."""
+        try:
+            with conn.begin():
+                errors = self.write_batch(conn, records)
+            self.stats.commits += 1
+            self._committed()
+            return errors
+        except Exception as e:
+            print(f"[Writer] Batch of {len(records)} failed ({str(e).splitlines()[0]}); retrying row by row")
+            self.stats.row_retries += 1
+            return [self._write_alone(conn, record) for record in records]
+
+    def _write_alone(self, conn, record):
+        try:
+            with conn.begin():
+                error = self.write_batch(conn, [record])[0]
+            self.stats.commits += 1
+            self._committed()
+            return error
+        except Exception as e:
+            return e
+
+    def close(self):
+        """Flush everything queued and stop the writer thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._unhook_exit()
+
+    def _unhook_exit(self):
+        """Undo flush_on_exit(): drop the atexit entry and put the previous SIGTERM handler back."""
+        if not self._exit_hooked:
+            return
+        self._exit_hooked = False
+        atexit.unregister(self.close)
+        if self._previous_sigterm is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self._previous_sigterm)
+            self._previous_sigterm = None
+
+    def summary_lines(self):
+        return self.stats.summary_lines()
+
+
+class JobBatchWriter(WriteBehind):
+    """Upsert scraped job dicts (JOB_COLUMNS) with one multi-row statement per batch."""
+
+    name = "batch-writer"
+
+    def __init__(self, engine, update_columns=UPDATE_COLUMNS, **kwargs):
+        super().__init__(engine, **kwargs)
+        self.update_columns = update_columns
+        self.inserted = 0
+        self.changed = 0
+        self.unchanged = 0
+        # (inserted, changed, unchanged) of the open transaction, counted once it commits
+        self._pending = (0, 0, 0)
+
+    def write_batch(self, conn, records):
+        self._pending = (0, 0, 0)
+        # Within one statement a job_url may only appear once; the latest scrape wins
+        latest = {job["job_url"]: job for job in records}
+        written = conn.execute(*upsert_statement(list(latest.values()), self.update_columns)).all()
+        inserted = sum(1 for row in written if row.inserted)
+        self._pending = (inserted, len(written) - inserted, len(latest) - len(written))
+        return [None] * len(records)
+
+    def _committed(self):
+        inserted, changed, unchanged = self._pending
+        self.inserted += inserted
+        self.changed += changed
+        self.unchanged += unchanged
+        self._pending = (0, 0, 0)
+
+    def summary_lines(self):
+        return super().summary_lines() + [
+            f"Inserted {self.inserted}, changed {self.changed}, unchanged {self.unchanged} (content hash)"
+        ]
+
+
+class JobDetailsWriter(WriteBehind):
+    """Apply (job_url, details) to stored stub rows; empty details still clear `fresh` so the job is not retried."""
+
+    name = "details-writer"
+
+    def write_batch(self, conn, records):
+        errors = []
+        for job_url, details in records:
+            result = None
+            if details:
+                sets = "".join(f"{c} = :{c}, " for c in DETAIL_COLUMNS)
+                params = {c: details.get(c) for c in DETAIL_COLUMNS}
+                params["content_hash"] = content_hash(details)
+                result = conn.execute(
+                    text(f"UPDATE job_listings SET {sets}fresh = false, updated_at = NOW() "
+                         f"WHERE job_url = :job_url AND content_hash IS DISTINCT FROM :content_hash"),
+                    dict(params, job_url=job_url),
+                )
+            if not result or not result.rowcount:
+                # Unchanged details (or none scraped): only clear fresh, leaving the row's text and updated_at
+                result = conn.execute(text("UPDATE job_listings SET fresh = false WHERE job_url = :job_url"),
+                                      {"job_url": job_url})
+            errors.append(None if result.rowcount else LookupError(f"no job_listings row for {job_url}"))
+        return errors
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt(f"signal {signum}")
+
+
+def flush_on_exit(writer):
+    """Flush `writer` at interpreter exit, and turn SIGTERM into KeyboardInterrupt so the
+    caller's finally blocks (and writer.close()) run as they do on Ctrl-C.
+
+    writer.close() undoes both, restoring the SIGTERM handler that was there before;
+    hooking the same writer twice is a no-op."""
+    if writer._exit_hooked:
+        return
+    writer._exit_hooked = True
+    atexit.register(writer.close)
+    if threading.current_thread() is threading.main_thread():
+        writer._previous_sigterm = signal.signal(signal.SIGTERM, _interrupt)
@@ -0,0 +1,109 @@
+"""
+CDP request-blocking profile for scraper browsers.
+
+Images, media, fonts and known trackers are blocked with Network.setBlockedURLs,
+so search and job pages only download what the scrapers read. Configure with:
+
+    SCRAPER_BLOCK=images,media,fonts,trackers   (default; "none" disables)
+    SCRAPER_BLOCK_EXTRA=*pattern1*,*pattern2*   (additional URL patterns)
+    SCRAPER_BLOCK_COMPARE=1                     (alternate blocked/unblocked pages per browser)
+    SCRAPER_PAGE_LOAD=eager                     (page_load_strategy; default "normal")
+
+After each page load, transferred bytes and load time are read from the
+Performance timeline and bucketed by whether blocking was on, so the run
+summary can compare both. Cross-origin resources without Timing-Allow-Origin
+report a transfer size of 0, so byte counts are a lower bound.
+"""
+import os
+import threading
+
+BLOCK_CATEGORIES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg", "*.wav"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+        "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*", "*segment.com*",
+        "*fullstory.com*", "*optimizely.com*", "*bing.com/bat*", "*linkedin.com/px*", "*ads-twitter.com*",
+        "*newrelic.com*", "*nr-data.net*", "*sentry.io*", "*clarity.ms*",
+    ],
+}
+DEFAULT_CATEGORIES = ("images", "media", "fonts", "trackers")
+
+_PAGE_COST_JS = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const res = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const r of res) { bytes += r.transferSize || 0; }
+const load = nav.loadEventEnd > 0 ? nav.loadEventEnd : (nav.domContentLoadedEventEnd || 0);
+return [bytes, load, res.length];
+"""
+
+
+def page_load_strategy():
+    """Selenium page_load_strategy from SCRAPER_PAGE_LOAD ('normal' or 'eager')."""
+    strategy = os.environ.get("SCRAPER_PAGE_LOAD", "normal").lower()
+    return strategy if strategy in ("normal", "eager", "none") else "normal"
+
+
+class ResourceBlocker:
+    def __init__(self, categories=DEFAULT_CATEGORIES, extra_patterns=(), compare: bool = False):
+        self.categories = [c for c in categories if c in BLOCK_CATEGORIES]
+        self.patterns = [p for c in self.categories for p in BLOCK_CATEGORIES[c]] + list(extra_patterns)
+        self.compare = compare
+        self._enabled = {}
+        self._buckets = {True: [0, 0, 0.0], False: [0, 0, 0.0]}  # pages, bytes, load ms
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        raw = os.environ.get("SCRAPER_BLOCK", ",".join(DEFAULT_CATEGORIES)).lower()
+        categories = () if raw in ("", "none", "off", "0") else tuple(c.strip() for c in raw.split(","))
+        extra = [p.strip() for p in os.environ.get("SCRAPER_BLOCK_EXTRA", "").split(",") if p.strip()]
+        compare = os.environ.get("SCRAPER_BLOCK_COMPARE", "false").lower() in ("1", "true", "yes")
+        return cls(categories, extra, compare)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.patterns)
+
+    def apply(self, driver, enabled: bool = True):
+        """Install (or clear) the block list on a driver; takes effect from the next request."""
+        enabled = enabled and self.active
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns if enabled else []})
+        except Exception as e:
+            print(f"[Blocking] Could not apply block list: {e}")
+            enabled = False
+        with self._lock:
+            self._enabled[id(driver)] = enabled
+        return enabled
+
+    def sample(self, driver):
+        """Record the cost of the page just loaded; in compare mode, flip blocking for the next one."""
+        try:
+            transferred, load_ms, _count = driver.execute_script(_PAGE_COST_JS)
+        except Exception:
+            return
+        with self._lock:
+            enabled = self._enabled.get(id(driver), False)
+            bucket = self._buckets[enabled]
+            bucket[0] += 1
+            bucket[1] += int(transferred or 0)
+            bucket[2] += float(load_ms or 0)
+        if self.compare and self.active:
+            self.apply(driver, not enabled)
+
+    def summary_lines(self):
+        extra = len(self.patterns) - sum(len(BLOCK_CATEGORIES[c]) for c in self.categories)
+        profile = ", ".join(self.categories) or "none"
+        if extra:
+            profile += f" + {extra} extra patterns"
+        lines = [f"Block profile: {profile}; page load strategy: {page_load_strategy()}"]
+        for enabled, label in ((True, "with blocking"), (False, "without blocking")):
+            pages, transferred, load_ms = self._buckets[enabled]
+            if pages:
+                lines.append(f"{label}: {pages} pages, avg {transferred / pages / 1024:.0f} KiB transferred, "
+                             f"avg load {load_ms / pages:.0f} ms")
+        return lines
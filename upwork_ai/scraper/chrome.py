@@ -0,0 +1,35 @@
+"""
+Where Chrome and its profiles live, shared by run_upwork_latest.py and browser_daemon.py.
+
+Profiles are kept next to the scripts (upwork_ai/chrome_profile and the pool
+copies beside it) whatever the working directory, so a run attaching to the
+daemon's browser and a run launching its own use the same login.
+"""
+import os
+
+# Headless Chrome (benchmarks against the mock server); the real site needs a visible window for login
+HEADLESS = os.environ.get("SCRAPER_HEADLESS", "false").lower() in ("1", "true", "yes")
+PROFILE_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STABLE_PROFILE = os.path.join(PROFILE_BASE_DIR, "chrome_profile")
+
+
+def find_chrome_binary():
+    # Allow override via environment variable
+    override = os.environ.get("CHROME_BIN")
+    if override and os.path.exists(override):
+        return override
+    candidates = [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Google Chrome 2.app/Contents/MacOS/Google Chrome",
+        "/Applications/Google Chrome Canary.app/Contents/MacOS/Google Chrome Canary",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+        "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
+        "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+        "/opt/homebrew/bin/chromium",
+        "/usr/local/bin/google-chrome",
+        "/usr/bin/google-chrome",
+    ]
+    for p in candidates:
+        if os.path.exists(p):
+            return p
+    return None
@@ -0,0 +1,75 @@
+"""
+Recorded-page corpus for offline benchmarking.
+
+With SCRAPER_RECORD set, every search and detail page the scrapers settle on
+is saved as a gzip'd JSON record (kind, url, recorded_at, html) under
+
+    <root>/<session>/<kind>-<seq>.json.gz     plus <root>/<session>/manifest.json
+
+where root is SCRAPER_RECORD (or upwork_ai/corpus when it is just "1") and
+session is the recording start time, so each recording is its own version of
+the corpus. replay_corpus.py feeds a session back through the offline parsers.
+"""
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+
+CORPUS_FORMAT = 1
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "corpus")
+
+
+class PageRecorder:
+    def __init__(self, root: str = DEFAULT_ROOT, session: str = None):
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(root, self.session)
+        os.makedirs(self.path, exist_ok=True)
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        raw = os.environ.get("SCRAPER_RECORD", "").strip()
+        if raw.lower() in ("", "0", "false", "no"):
+            return None
+        recorder = cls(DEFAULT_ROOT if raw.lower() in ("1", "true", "yes") else raw)
+        print(f"[Corpus] Recording pages to {recorder.path}")
+        return recorder
+
+    def record(self, driver, kind: str):
+        """Save the driver's current page; never raises into the scraper."""
+        try:
+            record = {"format": CORPUS_FORMAT, "kind": kind, "url": driver.current_url,
+                      "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "html": driver.page_source}
+        except Exception as e:
+            print(f"[Corpus] Could not snapshot {kind} page: {e}")
+            return None
+        with self._lock:
+            seq = self.counts[kind] = self.counts.get(kind, 0) + 1
+            manifest = {"format": CORPUS_FORMAT, "session": self.session, "pages": dict(self.counts)}
+        file_path = os.path.join(self.path, f"{kind}-{seq:05d}.json.gz")
+        with gzip.open(file_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f)
+        with self._lock:
+            with open(os.path.join(self.path, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1)
+        return file_path
+
+
+def latest_session(root: str = DEFAULT_ROOT):
+    sessions = sorted(d for d in glob.glob(os.path.join(root, "*")) if os.path.isdir(d))
+    return sessions[-1] if sessions else None
+
+
+def corpus_files(session_path: str, kind: str = None):
+    return sorted(glob.glob(os.path.join(session_path, f"{kind or '*'}-*.json.gz")))
+
+
+def load_record(file_path: str):
+    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+        record = json.load(f)
+    if record.get("format") != CORPUS_FORMAT:
+        raise ValueError(f"{file_path}: unsupported corpus format {record.get('format')}")
+    return record
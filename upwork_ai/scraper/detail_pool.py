@@ -0,0 +1,90 @@
+"""
+Helpers for scraping job details with several browsers sharing one login.
+
+Extra Chrome instances are started on their own worker profiles and receive
+the logged-in session cookies from the primary driver over CDP. A global
+PolitenessBudget spaces navigations across all workers, so adding workers
+raises throughput without raising the request rate above the configured
+floor.
+"""
+import threading
+import time
+
+from scraper.site import UPWORK_BASE_URL, cookie_domain
+
+_COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+class PolitenessBudget:
+    """Global minimum spacing between navigations, shared by every worker thread."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = max(0.0, float(min_interval))
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def export_cookies(driver):
+    """All cookies of the browser (every domain), via CDP."""
+    return driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+
+
+def import_cookies(driver, cookies, fallback_url: str = UPWORK_BASE_URL + "/"):
+    """Install cookies exported from another browser; falls back to add_cookie on one origin."""
+    params = []
+    for c in cookies:
+        p = {k: c[k] for k in _COOKIE_PARAM_KEYS if k in c}
+        if c.get("session") or p.get("expires", 0) in (-1, 0):
+            p.pop("expires", None)
+        params.append(p)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+        return len(params)
+    except Exception as e:
+        print(f"[Pool] CDP cookie import failed ({e}); falling back to add_cookie")
+    driver.get(fallback_url)
+    imported = 0
+    for c in cookies:
+        if cookie_domain() not in c.get("domain", ""):
+            continue
+        try:
+            driver.add_cookie({k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c})
+            imported += 1
+        except Exception:
+            continue
+    return imported
+
+
+def open_worker_drivers(primary, make_driver, count: int):
+    """Start `count` extra browsers via make_driver(index) and copy the primary's session into each."""
+    cookies = export_cookies(primary)
+    drivers = []
+    for index in range(1, count + 1):
+        try:
+            driver = make_driver(index)
+        except Exception as e:
+            print(f"[Pool] Could not start worker browser {index}: {e}")
+            continue
+        n = import_cookies(driver, cookies)
+        print(f"[Pool] Worker {index} ready with {n} session cookies")
+        drivers.append(driver)
+    return drivers
+
+
+def close_drivers(drivers):
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,79 @@
+"""
+Cookie-handoff HTTP fetching of job detail pages.
+
+After the user logs in through Selenium, the browser's cookies and user agent
+are copied into a pooled keep-alive requests.Session. Detail pages are then
+fetched over plain HTTP and parsed in-process, without a browser render. A
+response that looks like a challenge page is reported back so the caller can
+retry that URL in the browser.
+"""
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.detail_pool import export_cookies
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+class ChallengePage(Exception):
+    """The HTTP response was a bot challenge or login wall; fetch this URL in the browser."""
+
+
+def session_from_driver(driver, pool_size: int = 4):
+    """Build a keep-alive session carrying the live browser's cookies and user agent."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent")
+    except Exception:
+        user_agent = None
+    session.headers.update({
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    for c in export_cookies(driver):
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    return session
+
+
+class HttpDetailFetcher:
+    """Fetch detail HTML over the shared session; raise ChallengePage when the browser is needed."""
+
+    def __init__(self, session, is_challenge, timeout: float = 15):
+        self.session = session
+        self.is_challenge = is_challenge
+        self.timeout = timeout
+        self.fetched = 0
+        self.challenged = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> str:
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(url, timeout=self.timeout)
+        finally:
+            with self._lock:
+                self.seconds += time.perf_counter() - start
+        match = _TITLE_RE.search(resp.text or "")
+        title = match.group(1).strip() if match else ""
+        if resp.status_code in (401, 403, 429) or self.is_challenge(resp.url, title) or "/account-security/login" in resp.url:
+            with self._lock:
+                self.challenged += 1
+            raise ChallengePage(f"{resp.status_code} {resp.url} ({title[:60]})")
+        resp.raise_for_status()
+        with self._lock:
+            self.fetched += 1
+        return resp.text
+
+    def summary(self) -> str:
+        avg = self.seconds / max(1, self.fetched + self.challenged)
+        return f"HTTP fetch: {self.fetched} pages, {self.challenged} sent back to browser, avg {avg * 1000:.0f} ms"
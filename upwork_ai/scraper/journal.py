@@ -0,0 +1,129 @@
+"""
+Append-only run journal so an interrupted scrape can resume.
+
+Each line of the JSONL file is one event:
+
+    {"ev": "run", ...}                                  a new run started
+    {"ev": "page", "query", "page", "items": [...]}     search page harvested
+    {"ev": "query_done", "query"}                       query paginated to the end
+    {"ev": "scraped", "job": {...}}                     detail scraped (job payload)
+    {"ev": "committed", "url"}                          job written to the DB / API
+    {"ev": "finished"}                                  run completed
+
+Events are buffered and fsync'd in batches (every `sync_every` events or
+`sync_seconds`, and on close), so a crash loses at most the last batch, which
+only means re-doing that little work. A torn last line is ignored on replay.
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "SCRAPER_JOURNAL",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "run_journal.jsonl"),
+)
+
+
+class RunJournal:
+    def __init__(self, path: str = DEFAULT_PATH, sync_every: int = 20, sync_seconds: float = 2.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        # Replayed state: url -> item (harvest order), url -> scraped job, committed urls
+        self.harvested = {}
+        self.scraped = {}
+        self.committed = set()
+        self.last_page = {}
+        self.queries_done = set()
+        self.finished = False
+        self._torn = False
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH, resume: bool = False, **run_info):
+        """Open the journal; with resume, replay an unfinished previous run and keep appending to it."""
+        journal = cls(path)
+        if resume and os.path.exists(path):
+            journal._replay()
+            if journal.finished:
+                print(f"[Journal] Last run in {path} finished; starting a new run")
+                journal = cls(path)
+                resume = False
+        else:
+            resume = False
+        journal._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and journal._torn:
+            journal._file.write("\n")
+        if resume:
+            print(f"[Journal] Resuming: {len(journal.harvested)} harvested, {len(journal.scraped)} scraped, "
+                  f"{len(journal.committed)} committed, {len(journal.queries_done)} queries finished")
+        journal._append({"ev": "run", "resume": resume, "at": time.strftime("%Y-%m-%dT%H:%M:%S"), **run_info})
+        journal.sync()
+        return journal
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._torn = not line.endswith("\n")
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn write at the crash point
+                kind = event.get("ev")
+                if kind == "page":
+                    self.last_page[event["query"]] = event["page"]
+                    for item in event.get("items", []):
+                        self.harvested.setdefault(item["url"], item)
+                elif kind == "query_done":
+                    self.queries_done.add(event["query"])
+                elif kind == "scraped":
+                    self.scraped[event["job"]["job_url"]] = event["job"]
+                elif kind == "committed":
+                    self.committed.add(event["url"])
+                elif kind == "finished":
+                    self.finished = True
+
+    def pending_items(self):
+        """Harvested items not yet committed, in harvest order."""
+        return [item for url, item in self.harvested.items() if url not in self.committed]
+
+    def _append(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event, default=str) + "\n")
+            self._pending += 1
+            due = self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_seconds
+        if due:
+            self.sync()
+
+    def sync(self):
+        with self._lock:
+            if self._file is None or self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+            self._last_sync = time.monotonic()
+
+    def record_page(self, query: str, page: int, items):
+        self._append({"ev": "page", "query": query, "page": page, "items": items})
+
+    def record_query_done(self, query: str):
+        self._append({"ev": "query_done", "query": query})
+
+    def record_scraped(self, job):
+        self._append({"ev": "scraped", "job": job})
+
+    def record_committed(self, url: str):
+        self._append({"ev": "committed", "url": url})
+
+    def close(self, finished: bool = False):
+        if self._file is None:
+            return
+        if finished:
+            self._append({"ev": "finished"})
+        self.sync()
+        self._file.close()
@@ -3,6 +3,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 import time
 
+from scraper.site import LOGIN_URL
+
 class UpworkLogin:
     def __init__(self, driver, username, password):
         self.driver = driver
@@ -10,7 +12,7 @@ class UpworkLogin:
         self.password = password
 
     def login(self):
-        self.driver.get("https://www.upwork.com/ab/account-security/login")
+        self.driver.get(LOGIN_URL)
         self.driver.find_element("id", "login_username").send_keys(self.username)
         self.driver.find_element("id", "login_password_continue").click()
         time.sleep(2)
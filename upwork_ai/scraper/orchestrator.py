@@ -0,0 +1,191 @@
+"""
+Asyncio orchestration for the scrapers.
+
+AsyncOrchestrator runs one event loop on a background thread for the life of a
+run. Blocking calls are pushed into an IO executor through named lanes, each
+with its own concurrency bound:
+
+    db         handing records to the writer (writer.add queues and returns a
+               Future, but blocks while the write-behind queue is full, so it
+               must not run on the loop thread; 1, so records keep their order)
+
+Progress messages to Rails go through scraper.progress.ProgressPublisher,
+which has its own thread. AsyncPipeline is the asyncio counterpart of
+scraper.pipeline.StreamingPipeline (same constructor and stats): every browser
+gets a single-thread executor, so its WebDriver calls stay serialized, while
+writes are awaited as bounded concurrent tasks.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from scraper.pipeline import PipelineStats, notify
+
+DEFAULT_LANES = {"db": 1}
+
+_STOP = object()
+
+
+class AsyncOrchestrator:
+    def __init__(self, lanes=None):
+        self.lanes = dict(DEFAULT_LANES, **(lanes or {}))
+        self.loop = asyncio.new_event_loop()
+        self._io = ThreadPoolExecutor(max_workers=sum(self.lanes.values()), thread_name_prefix="orchestrator-io")
+        self._thread = threading.Thread(target=self.loop.run_forever, name="orchestrator-loop", daemon=True)
+        self._semaphores = {}
+        self.lane_stats = {name: [0, 0, 0.0] for name in self.lanes}  # done, failed, busy seconds
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    async def call(self, lane, fn, *args):
+        """Run blocking fn(*args) in the IO executor, at most lanes[lane] at a time."""
+        semaphore = self._semaphores.get(lane)
+        if semaphore is None:
+            semaphore = self._semaphores[lane] = asyncio.Semaphore(self.lanes.get(lane, 1))
+        async with semaphore:
+            stats = self.lane_stats.setdefault(lane, [0, 0, 0.0])
+            start = time.perf_counter()
+            try:
+                result = await self.loop.run_in_executor(self._io, fn, *args)
+            except Exception:
+                stats[1] += 1
+                raise
+            finally:
+                stats[2] += time.perf_counter() - start
+            stats[0] += 1
+            return result
+
+    def run(self, coro):
+        """Run a coroutine on the orchestrator loop and block the calling thread for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        """Stop the loop; AsyncPipeline.run() has already awaited its writes."""
+        if not self._thread.is_alive():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self._io.shutdown(wait=False)
+
+    def summary_lines(self):
+        lines = []
+        for lane, (done, failed, seconds) in self.lane_stats.items():
+            if done or failed:
+                lines.append(f"{lane}: {done} done, {failed} failed, {seconds:.1f}s busy "
+                             f"(max {self.lanes.get(lane, 1)} concurrent)")
+        return lines
+
+
+class AsyncPipeline:
+    """StreamingPipeline on an AsyncOrchestrator loop.
+
+    scrape/detail_workers run in one single-thread executor each (one per
+    browser); in serial mode harvesting shares the scrape executor and the next
+    page is only pulled once the current one is scraped, as before. Records are
+    written on the orchestrator's db lane; at most write_queue_size writes may be
+    pending before detail scraping waits (backpressure); a write that returns a
+    concurrent.futures.Future stays pending until it resolves. on_saved /
+    on_error run on the loop thread through scraper.pipeline.notify(), so an
+    exception in them cannot end a detail consumer; as in StreamingPipeline,
+    on_error gets the harvested item when its scrape raised.
+    """
+
+    def __init__(self, orchestrator, scrape, write, on_saved=None, on_error=None, write_queue_size=25,
+                 detail_workers=None, detail_queue_size=50):
+        self.orchestrator = orchestrator
+        self.scrape = scrape
+        self.write = write
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self.write_queue_size = write_queue_size
+        self.detail_workers = list(detail_workers or [])
+        self.detail_queue_size = detail_queue_size
+        self.stats = PipelineStats()
+
+    def run(self, pages):
+        """Consume an iterable of per-page item lists; returns PipelineStats once all writes finish."""
+        return self.orchestrator.run(self._run(pages))
+
+    async def _run(self, pages):
+        loop = asyncio.get_running_loop()
+        serial = not self.detail_workers
+        scrapers = [self.scrape] if serial else self.detail_workers
+        executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"browser-{i}") for i in range(len(scrapers))]
+        harvest_executor = executors[0] if serial else ThreadPoolExecutor(max_workers=1, thread_name_prefix="harvest")
+        details = asyncio.Queue(maxsize=self.detail_queue_size)
+        write_slots = asyncio.Semaphore(self.write_queue_size)
+        writes = set()
+        pages = iter(pages)
+
+        async def harvest():
+            try:
+                while True:
+                    if serial:
+                        await details.join()
+                    page_items = await loop.run_in_executor(harvest_executor, next, pages, _STOP)
+                    if page_items is _STOP:
+                        return
+                    self.stats.pages += 1
+                    self.stats.harvested += len(page_items)
+                    for item in page_items:
+                        self.stats.detail_depths.append(details.qsize())
+                        await details.put(item)
+            finally:
+                for _ in scrapers:
+                    await details.put(_STOP)
+
+        async def write_one(record):
+            try:
+                result = await self.orchestrator.call("db", self.write, record)
+                if isinstance(result, Future):
+                    await asyncio.wrap_future(result)
+            except Exception as e:
+                self.stats.record_failed()
+                notify(self.on_error, record, e)
+            else:
+                self.stats.record_saved()
+                notify(self.on_saved, record)
+            finally:
+                write_slots.release()
+
+        async def detail(scrape, executor):
+            while True:
+                item = await details.get()
+                try:
+                    if item is _STOP:
+                        return
+                    try:
+                        record = await loop.run_in_executor(executor, scrape, item)
+                    except Exception as e:
+                        self.stats.record_scraped()
+                        self.stats.record_failed()
+                        notify(self.on_error, item, e)
+                        continue
+                    self.stats.record_scraped()
+                    if record is None:
+                        continue
+                    self.stats.write_depths.append(len(writes))
+                    await write_slots.acquire()  # waits when write_queue_size writes are already pending
+                    task = loop.create_task(write_one(record))
+                    writes.add(task)
+                    task.add_done_callback(writes.discard)
+                finally:
+                    details.task_done()
+
+        try:
+            results = await asyncio.gather(harvest(), *[detail(s, e) for s, e in zip(scrapers, executors)],
+                                           return_exceptions=True)
+            while writes:
+                await asyncio.gather(*list(writes), return_exceptions=True)
+        finally:
+            if hasattr(pages, "close"):
+                await loop.run_in_executor(harvest_executor, pages.close)
+            for executor in set(executors + [harvest_executor]):
+                executor.shutdown(wait=False)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return self.stats
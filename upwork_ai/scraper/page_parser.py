@@ -0,0 +1,254 @@
+"""
+Offline parsing of Upwork search and job detail pages.
+
+The browser only navigates and waits; the page is snapshotted once with
+driver.page_source and every extraction strategy runs in-process with lxml
+XPath. All functions here are pure (html in, dicts out), so they can run on
+a worker thread while the browser loads the next page, or against recorded
+pages with no browser at all.
+
+Strategy order and thresholds mirror main.scrape_job_details.
+"""
+import re
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+from scraper.site import UPWORK_BASE_URL
+
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# main.get_job_urls search-page XPaths
+SEARCH_LINK_XPATH = "//article[@data-test='JobTile']//h2[@class='h5 mb-0 mr-2 job-tile-title']//a"
+SEARCH_DATE_XPATH = "//article[@data-test='JobTile']//small[@data-test='job-pubilshed-date']//span[last()]"
+
+TITLE_XPATHS = [
+    ("h1", "//h1"),
+    ("h4.d-flex span.flex-1", f"//h4[{_has_class('d-flex')}]//span[{_has_class('flex-1')}]"),
+    ("h2", "//h2"),
+    ("data-test", "//*[@data-test='JobTitle' or @data-test='job-title']"),
+    ("main heading", "//main//h1 | //main//h2 | //main//h3 | //article//h1 | //article//h2"),
+]
+
+LOCATION_XPATHS = [
+    "//div[@class='d-inline-flex align-items-center text-base-sm']//p[@class='text-light-on-muted m-0']",
+    "//p[contains(@class, 'text-light-on-muted m-0')]",
+    "//*[@data-test='LocationLabel']",
+    "//div[contains(@class, 'location')]/span",
+    "//*[contains(text(), 'Location')]//following-sibling::*[1]",
+]
+
+POSTED_TIME_XPATHS = [
+    "//div[@class='posted-on-line']//span",
+    "//div[contains(text(), 'Posted')]//span",
+    "//*[@data-test='PostedOn']",
+    "//span[contains(text(), 'Posted')]",
+    "//time/@datetime",
+]
+
+
+def element_text(el) -> str:
+    """Approximate WebElement.text: visible text with line breaks at block boundaries."""
+    parts = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if tag in _SKIP_TAGS:
+            if node.tail:
+                parts.append(node.tail)
+            return
+        block = tag in _BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        if node.text and tag:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+        if block:
+            parts.append("\n")
+        if node.tail:
+            parts.append(node.tail)
+
+    tail = el.tail
+    el.tail = None
+    try:
+        walk(el)
+    finally:
+        el.tail = tail
+    lines = (re.sub(r"[ \t\r\f\v\xa0]+", " ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _first_text(tree, xpath):
+    found = tree.xpath(xpath)
+    if not found:
+        return None
+    first = found[0]
+    if isinstance(first, str):
+        return first.strip()
+    return element_text(first).strip()
+
+
+def parse_document(page_source: str):
+    return lxml_html.fromstring(page_source or "<html></html>")
+
+
+def parse_search_page(page_source: str, base_url: str = UPWORK_BASE_URL):
+    """Return (job_urls, job_dates) using main.get_job_urls' XPaths."""
+    tree = parse_document(page_source)
+    job_urls = [urljoin(base_url, a.get("href")) for a in tree.xpath(SEARCH_LINK_XPATH) if a.get("href")]
+    job_dates = [element_text(el) for el in tree.xpath(SEARCH_DATE_XPATH)]
+    return job_urls, job_dates
+
+
+def parse_search_tiles(page_source: str, base_url: str = UPWORK_BASE_URL):
+    """Per-tile {href, date_label, title, snippet}, matching scraper.tile_harvest output."""
+    tree = parse_document(page_source)
+    tiles = []
+    for card in tree.xpath("//article[@data-test='JobTile'] | //section[contains(@data-test,'job-tile')]"):
+        link = None
+        for xp in [".//h2//a", ".//h4//a", ".//a[@data-test='job-title']"]:
+            found = [a for a in card.xpath(xp) if a.get("href")]
+            if found:
+                link = found[0]
+                break
+        label = None
+        for xp in [
+            ".//small[contains(@data-test,'published-date')]//span[last()]",
+            ".//small[contains(@data-test,'pubilshed-date')]//span[last()]",
+            ".//small[contains(@data-test,'posted')]//span[last()]",
+            ".//small[contains(@data-test,'date')]//span[last()]",
+        ]:
+            label = _first_text(card, xp)
+            if label:
+                break
+        tiles.append({
+            "href": urljoin(base_url, link.get("href")) if link is not None else None,
+            "date_label": label,
+            "title": element_text(link) if link is not None else None,
+            "snippet": " ".join(element_text(card).split())[:400],
+        })
+    return tiles
+
+
+def largest_text_block(tree):
+    """Description strategy 4: the largest div text inside <main> (20 < len < 10000)."""
+    mains = tree.xpath("//main")
+    if not mains:
+        return None
+    largest_text = ""
+    for div in mains[0].iter("div"):
+        text = element_text(div).strip()
+        if 20 < len(text) < 10000 and len(text) > len(largest_text):
+            largest_text = text
+    return largest_text or None
+
+
+def body_text_slice(tree):
+    """Description strategy 6: body text minus the first two and last three lines."""
+    bodies = tree.xpath("//body")
+    if not bodies:
+        return None
+    lines = [line.strip() for line in element_text(bodies[0]).split("\n") if line.strip() and len(line.strip()) > 10]
+    if len(lines) > 5:
+        job_description = "\n".join(lines[2:-3])
+        if len(job_description) > 20:
+            return job_description
+    return None
+
+
+# Per-field acceptance rules of main.scrape_job_details
+DETAIL_ACCEPT = {
+    "title": lambda title: len(title) > 5,
+    "description": lambda description: len(description) > 20,
+    "location": lambda location: location != "Location",
+    "posted_time": bool,
+}
+
+
+def _paragraph_text(tree):
+    paragraphs = [element_text(p).strip() for p in tree.xpath("//main//p | //section//p | //article//p")]
+    return "\n".join(p for p in paragraphs if p and len(p) > 10) or None
+
+
+def detail_strategies(tree):
+    """{field: [(name, fn)]} in declared order; names match main's strategies for StrategyRegistry stats."""
+    return {
+        "title": [(name, lambda xp=xpath: _first_text(tree, xp)) for name, xpath in TITLE_XPATHS],
+        "description": [
+            ("article", lambda: _first_text(tree, "//article")),
+            ("data-test Description", lambda: _first_text(tree, "//div[@data-test='Description']")),
+            ("description class", lambda: _first_text(
+                tree, "//div[contains(@class, 'description') or contains(@class, 'job-description') or contains(@class, 'details-section')]")),
+            ("largest main div", lambda: largest_text_block(tree)),
+            ("paragraphs", lambda: _paragraph_text(tree)),
+            ("body text", lambda: body_text_slice(tree)),
+        ],
+        "location": [(xpath, lambda xp=xpath: _first_text(tree, xp)) for xpath in LOCATION_XPATHS],
+        "posted_time": [(xpath, lambda xp=xpath: _first_text(tree, xp)) for xpath in POSTED_TIME_XPATHS],
+    }
+
+
+def _first_accepted(strategies, accept):
+    for _name, fn in strategies:
+        value = fn()
+        if value and accept(value):
+            return value
+    return None
+
+
+def extract_title(tree):
+    return _first_accepted(detail_strategies(tree)["title"], DETAIL_ACCEPT["title"])
+
+
+def extract_description(tree):
+    return _first_accepted(detail_strategies(tree)["description"], DETAIL_ACCEPT["description"])
+
+
+def extract_location(tree):
+    return _first_accepted(detail_strategies(tree)["location"], DETAIL_ACCEPT["location"])
+
+
+def extract_posted_time(tree):
+    return _first_accepted(detail_strategies(tree)["posted_time"], DETAIL_ACCEPT["posted_time"])
+
+
+def parse_job_details(page_source: str, job_url: str):
+    """Build the same job_details dict as main.scrape_job_details from a page snapshot."""
+    tree = parse_document(page_source)
+    return {
+        "title": extract_title(tree),
+        "description": extract_description(tree),
+        "location": extract_location(tree),
+        "posted_time": extract_posted_time(tree),
+        "job_link": job_url,
+    }
+
+
+def parse_job_summary(page_source: str, base_url: str = UPWORK_BASE_URL):
+    """Same fields and XPaths as run_upwork_latest.scrape_job_details, from a page snapshot."""
+    tree = parse_document(page_source)
+    data = {}
+    for key, xpath in [
+        ("title", "//div[contains(@class,'job-details-content')]//h4"),
+        ("posted_time", "//div[@data-test='PostedOn']//span"),
+        ("description", "//div[@data-test='Description']"),
+        ("location", "//div[@data-test='LocationLabel']//span"),
+    ]:
+        found = tree.xpath(xpath)
+        if found:
+            data[key] = element_text(found[0])
+    links = tree.xpath("//div[@data-test='Description']//a[@href]")
+    if links:
+        data["job_link"] = urljoin(base_url, links[0].get("href"))
+    return data
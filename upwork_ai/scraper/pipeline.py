@@ -0,0 +1,199 @@
+"""
+Streaming harvest -> detail -> write pipeline.
+
+Search pages are harvested lazily, one page at a time, so detail scraping
+starts as soon as the first page is in. Scraped records go through a bounded
+queue to a dedicated writer thread, so the browser never waits on Postgres or
+the Rails API unless the writer falls a full queue behind (backpressure).
+
+By default the harvester and the detail scraper share one browser and run on
+the caller's thread. When detail_workers are given (one scrape callable per
+extra browser), the harvester feeds a bounded detail queue drained by one
+thread per worker.
+"""
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+
+_STOP = object()
+
+
+def notify(callback, *args):
+    """Call an on_saved/on_error callback; an exception in it is printed, never raised into
+    the worker that called it (a dead worker strands its queue)."""
+    if callback is None:
+        return
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"[Pipeline] {getattr(callback, '__name__', 'callback')} failed: {e!r}")
+
+
+class PipelineStats:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_saved_after = None
+        self.pages = 0
+        self.harvested = 0
+        self.scraped = 0
+        self.saved = 0
+        self.failed = 0
+        self.detail_depths = []
+        self.write_depths = []
+        self._lock = threading.Lock()
+
+    def record_saved(self):
+        with self._lock:
+            self.saved += 1
+            if self.first_saved_after is None:
+                self.first_saved_after = time.perf_counter() - self.started_at
+
+    def record_scraped(self):
+        with self._lock:
+            self.scraped += 1
+
+    def record_failed(self):
+        with self._lock:
+            self.failed += 1
+
+    @staticmethod
+    def _depth_summary(depths):
+        if not depths:
+            return "n/a"
+        return f"avg {sum(depths) / len(depths):.1f}, max {max(depths)}"
+
+    def summary_lines(self):
+        elapsed = time.perf_counter() - self.started_at
+        first = f"{self.first_saved_after:.1f}s" if self.first_saved_after is not None else "n/a"
+        return [
+            f"Pages harvested: {self.pages} ({self.harvested} jobs)",
+            f"Jobs scraped: {self.scraped}, saved: {self.saved}, failed: {self.failed}",
+            f"Time to first saved job: {first} (run time {elapsed:.1f}s)",
+            f"Detail queue depth: {self._depth_summary(self.detail_depths)}",
+            f"Write queue depth: {self._depth_summary(self.write_depths)}",
+        ]
+
+
+class StreamingPipeline:
+    """Run scrape(item) on the caller's thread (or each of detail_workers on its own
+    thread) and write(record) on a writer thread.
+
+    scrape(item) returns a record to write, or None to skip the item.
+    write(record) raises on failure, or returns a concurrent.futures.Future
+    when the write completes later (e.g. scraper.batch_writer); the record
+    then counts as saved once the Future resolves. on_saved(record) /
+    on_error(record, exc) are called from the writer thread (or the thread
+    resolving the Future); a detail worker that raises reports
+    on_error(item, exc) from its own thread, so on_error gets either shape.
+    Exceptions raised by the callbacks are printed and otherwise ignored.
+    """
+
+    def __init__(self, scrape, write, on_saved=None, on_error=None, write_queue_size=25,
+                 detail_workers=None, detail_queue_size=50):
+        self.scrape = scrape
+        self.write = write
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self.write_queue = queue.Queue(maxsize=write_queue_size)
+        self.detail_workers = list(detail_workers or [])
+        self.detail_queue = queue.Queue(maxsize=detail_queue_size)
+        self.stats = PipelineStats()
+        self._deferred = []
+
+    def _emit(self, record):
+        self.stats.record_scraped()
+        if record is None:
+            return
+        self.stats.write_depths.append(self.write_queue.qsize())
+        self.write_queue.put(record)  # blocks when the writer is a full queue behind
+
+    def _detail_loop(self, scrape):
+        while True:
+            item = self.detail_queue.get()
+            try:
+                if item is _STOP:
+                    return
+                try:
+                    record = scrape(item)
+                except Exception as e:
+                    self.stats.record_scraped()
+                    self.stats.record_failed()
+                    notify(self.on_error, item, e)
+                    continue
+                self._emit(record)
+            finally:
+                self.detail_queue.task_done()
+
+    def _writer_loop(self):
+        while True:
+            record = self.write_queue.get()
+            try:
+                if record is _STOP:
+                    return
+                try:
+                    result = self.write(record)
+                except Exception as e:
+                    self._finish(record, e)
+                    continue
+                if isinstance(result, Future):
+                    self._deferred.append(result)
+                    result.add_done_callback(lambda f, r=record: self._finish(r, f.exception()))
+                else:
+                    self._finish(record, None)
+            finally:
+                self.write_queue.task_done()
+
+    def _finish(self, record, error):
+        if error is not None:
+            self.stats.record_failed()
+            notify(self.on_error, record, error)
+            return
+        self.stats.record_saved()
+        notify(self.on_saved, record)
+
+    def run(self, pages):
+        """Consume an iterable of per-page item lists; returns PipelineStats once all writes finish."""
+        writer = threading.Thread(target=self._writer_loop, name="pipeline-writer", daemon=True)
+        writer.start()
+        try:
+            if self.detail_workers:
+                self._run_pooled(pages)
+            else:
+                self._run_serial(pages)
+        finally:
+            self.write_queue.put(_STOP)
+            writer.join()
+            wait(self._deferred)
+        return self.stats
+
+    def _run_serial(self, pages):
+        backlog = collections.deque()
+        for page_items in pages:
+            self.stats.pages += 1
+            self.stats.harvested += len(page_items)
+            backlog.extend(page_items)
+            while backlog:
+                self.stats.detail_depths.append(len(backlog))
+                self._emit(self.scrape(backlog.popleft()))
+
+    def _run_pooled(self, pages):
+        threads = [
+            threading.Thread(target=self._detail_loop, args=(scrape,), name=f"pipeline-detail-{i}", daemon=True)
+            for i, scrape in enumerate(self.detail_workers, 1)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for page_items in pages:
+                self.stats.pages += 1
+                self.stats.harvested += len(page_items)
+                for item in page_items:
+                    self.stats.detail_depths.append(self.detail_queue.qsize())
+                    self.detail_queue.put(item)  # blocks when every worker is busy and the queue is full
+        finally:
+            for _ in threads:
+                self.detail_queue.put(_STOP)
+            for t in threads:
+                t.join()
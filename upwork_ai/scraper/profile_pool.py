@@ -0,0 +1,185 @@
+"""
+Pool of reusable Chrome profiles cloned from the logged-in stable profile.
+
+Instead of a fresh chrome_profile_tmp_<ts>_<pid> directory per run (cold,
+logged out, never deleted), scrapers lease one of N pool slots:
+
+    upwork_ai/chrome_profile_pool_<n>/        profile copy
+    upwork_ai/chrome_profile_pool_<n>.lock    flock held for the lease
+
+A slot is (re)cloned from chrome_profile when it is missing or older than the
+stable profile's cookie store, so leased browsers start logged in. Clones use
+copy-on-write reflinks where the filesystem supports them (APFS clonefile,
+btrfs/XFS reflink) and plain copies otherwise; caches are skipped. Files are
+not hardlinked: Chrome rewrites its SQLite stores in place, which would
+write through to the stable profile.
+"""
+import fcntl
+import glob
+import os
+import platform
+import shutil
+import subprocess
+import time
+
+SKIP_NAMES = {
+    "SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "Cache", "Code Cache", "GPUCache",
+    "GrShaderCache", "ShaderCache", "DawnCache", "Service Worker", "Crashpad", "BrowserMetrics",
+}
+_STALE_PREFIXES = ("chrome_profile_tmp_", "chrome_profile_worker_", "chrome_profile_search_")
+
+
+def _is_locked(profile_dir: str) -> bool:
+    return any(os.path.lexists(os.path.join(profile_dir, name)) for name in ("SingletonLock", "SingletonCookie", "SingletonSocket"))
+
+
+def _cookie_mtime(profile_dir: str) -> float:
+    paths = [os.path.join(profile_dir, "Default", "Network", "Cookies"), os.path.join(profile_dir, "Default", "Cookies")]
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0.0)
+
+
+def _reflink_copy(src: str, dst: str) -> bool:
+    """Clone a whole tree copy-on-write with the platform's cp; False when unsupported."""
+    if platform.system() == "Darwin":
+        cmd = ["cp", "-c", "-R", src, dst]
+    else:
+        cmd = ["cp", "-a", "--reflink=always", src, dst]
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=300).returncode == 0
+    except Exception:
+        return False
+
+
+def clone_profile(src: str, dst: str) -> str:
+    """Snapshot src into dst (atomically replaced); returns the copy method used."""
+    staging = f"{dst}.staging-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    if _reflink_copy(src, staging):
+        method = "reflink"
+        for root, dirs, files in os.walk(staging):
+            for name in [n for n in dirs + files if n in SKIP_NAMES]:
+                path = os.path.join(root, name)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+                if name in dirs:
+                    dirs.remove(name)
+    else:
+        shutil.rmtree(staging, ignore_errors=True)
+        method = "copy"
+        shutil.copytree(src, staging, symlinks=True, ignore=lambda _d, names: [n for n in names if n in SKIP_NAMES],
+                        ignore_dangling_symlinks=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    os.replace(staging, dst)
+    return method
+
+
+class ProfileLease:
+    def __init__(self, path: str, lock_file):
+        self.path = path
+        self._lock_file = lock_file
+
+    def release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ProfilePool:
+    def __init__(self, base_dir: str, size: int = None, stable_name: str = "chrome_profile"):
+        self.base_dir = base_dir
+        self.size = size or int(os.environ.get("SCRAPER_PROFILE_POOL", "4"))
+        self.stable = os.path.join(base_dir, stable_name)
+        self.leases = []
+
+    def slot_path(self, n: int) -> str:
+        return os.path.join(self.base_dir, f"chrome_profile_pool_{n}")
+
+    def lease(self):
+        """Lock a free slot, refreshing it from the stable profile if stale; None when all are taken."""
+        for n in range(1, self.size + 1):
+            path = self.slot_path(n)
+            lock_file = open(f"{path}.lock", "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._refresh(path)
+            lease = ProfileLease(path, lock_file)
+            self.leases.append(lease)
+            return lease
+        print(f"[Profiles] All {self.size} pool profiles are leased")
+        return None
+
+    def _refresh(self, path: str):
+        stable_cookies = _cookie_mtime(self.stable)
+        if os.path.isdir(path) and _cookie_mtime(path) >= stable_cookies:
+            return
+        if not os.path.isdir(self.stable):
+            os.makedirs(path, exist_ok=True)
+            return
+        if os.path.isdir(path) and _is_locked(self.stable):
+            # Keep the existing copy rather than snapshot cookie stores mid-write
+            return
+        start = time.perf_counter()
+        try:
+            method = clone_profile(self.stable, path)
+            print(f"[Profiles] Cloned {self.stable} -> {path} via {method} in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            print(f"[Profiles] Could not clone stable profile ({e}); using {path} as is")
+            os.makedirs(path, exist_ok=True)
+        # A copied Singleton* symlink would make Chrome think the slot is in use
+        for name in ("SingletonLock", "SingletonCookie", "SingletonSocket"):
+            if os.path.lexists(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+
+    def release_all(self):
+        for lease in self.leases:
+            lease.release()
+        self.leases = []
+
+    def prune(self, max_age_hours: float = 24.0):
+        """Delete legacy per-run profile dirs and pool slots beyond `size` that nobody holds."""
+        removed = 0
+        cutoff = time.time() - max_age_hours * 3600
+        for path in glob.glob(os.path.join(self.base_dir, "chrome_profile_*")):
+            name = os.path.basename(path)
+            if not os.path.isdir(path):
+                continue
+            if name.startswith(_STALE_PREFIXES):
+                if _is_locked(path) or os.path.getmtime(path) > cutoff:
+                    continue
+            elif name.startswith("chrome_profile_pool_") and ".staging-" not in name:
+                try:
+                    n = int(name.rsplit("_", 1)[1])
+                except ValueError:
+                    continue
+                if n <= self.size:
+                    continue
+                lock_file = open(f"{path}.lock", "a+")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue
+                lock_file.close()
+                os.remove(f"{path}.lock")
+            elif ".staging-" in name:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+            else:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        if removed:
+            print(f"[Profiles] Pruned {removed} stale profile directories")
+        return removed
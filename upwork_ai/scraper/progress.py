@@ -0,0 +1,119 @@
+"""
+Coalescing, non-blocking progress channel to the Rails UI.
+
+log_progress used to POST every message synchronously on a fresh connection,
+several times per job, so a slow Rails server slowed the scrape itself.
+ProgressPublisher.publish() only appends to an in-memory queue; a background
+thread wakes every `interval` seconds and sends everything queued as one
+{"messages": [...]} POST over a single keep-alive session.
+
+The queue is bounded. When it is full (Rails slow or down), a low-priority
+message replaces the newest queued low-priority one (merged), otherwise the
+oldest low-priority message is dropped to make room, so the scraping thread
+never waits.
+"""
+import collections
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+
+class ProgressPublisher:
+    def __init__(self, url: str, interval: float = 0.5, max_queue: int = 100, max_batch: int = 50,
+                 timeout: float = 10.0):
+        self.url = url
+        self.interval = interval
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._queue = collections.deque()  # [message dict, low_priority]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._loop, name="progress-publisher", daemon=True)
+        self.published = 0
+        self.sent = 0
+        self.batches = 0
+        self.failed = 0
+        self.merged = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.send_seconds = 0.0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, message: str, low_priority: bool = False):
+        """Queue a message for the next batch; never blocks on the network."""
+        entry = {"message": message, "timestamp": datetime.now().astimezone().isoformat(timespec="seconds")}
+        with self._lock:
+            self.published += 1
+            if len(self._queue) >= self.max_queue:
+                if low_priority and self._queue[-1][1]:
+                    self._queue[-1][0] = entry
+                    self.merged += 1
+                    return
+                victim = next((item for item in self._queue if item[1]), None)
+                if victim is None and low_priority:
+                    self.dropped += 1
+                    return
+                self._queue.remove(victim if victim is not None else self._queue[0])
+                self.dropped += 1
+            self._queue.append([entry, low_priority])
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft()[0] for _ in range(count)]
+
+    def _send(self, batch):
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json={"messages": batch}, timeout=self.timeout)
+            ok = response.status_code == 200
+            if not ok:
+                print(f"[Rails] add_progress - failed: {response.status_code}")
+        except Exception as e:
+            ok = False
+            print(f"[Rails] add_progress - error: {e}")
+        self.send_seconds += time.perf_counter() - start
+        self.batches += 1
+        if ok:
+            self.sent += len(batch)
+        else:
+            self.failed += len(batch)
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            batch = self._take_batch()
+            while batch:
+                self._send(batch)
+                batch = self._take_batch() if len(batch) == self.max_batch else []
+            if self._closing:
+                return
+
+    def close(self, timeout: float = 10.0):
+        """Send whatever is still queued (up to timeout), then stop the publisher thread."""
+        self._closing = True
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.session.close()
+
+    def summary_lines(self):
+        avg_ms = self.send_seconds / self.batches * 1000 if self.batches else 0.0
+        return [
+            f"{self.sent}/{self.published} messages sent in {self.batches} posts (avg {avg_ms:.0f} ms)",
+            f"Merged {self.merged}, dropped {self.dropped}, failed {self.failed}; "
+            f"queue depth max {self.max_depth}, {self.depth} left",
+        ]
@@ -0,0 +1,178 @@
+"""
+Multi-query search fan-out with cross-query dedupe.
+
+A run covers a set of search queries: SCRAPER_QUERIES (comma separated), else the
+"queries" list in the scraper's scrapers.config_json row, else "www". QueryFanout
+paginates the queries on one or more search browsers and merges their pages into
+a single stream in which each job URL appears once. Per-query counters are
+kept for the run summary.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import text
+
+
+DEFAULT_QUERIES = ("www",)
+
+
+def parse_queries(raw):
+    """Normalize a list (or comma separated string) of queries, dropping blanks and repeats."""
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    queries = []
+    for q in raw or ():
+        q = str(q).strip()
+        if q and q not in queries:
+            queries.append(q)
+    return queries
+
+
+def load_queries(engine=None, scraper_id=None):
+    """Resolve the run's query set: SCRAPER_QUERIES, then scrapers.config_json, then DEFAULT_QUERIES."""
+    queries = parse_queries(os.environ.get("SCRAPER_QUERIES", ""))
+    if queries:
+        return queries
+    if engine is not None and scraper_id:
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text("SELECT config_json FROM scrapers WHERE id = :id"),
+                                   {"id": int(scraper_id)}).first()
+            config = json.loads(row[0]) if row and row[0] else {}
+            queries = parse_queries(config.get("queries") if isinstance(config, dict) else None)
+        except Exception as e:
+            print(f"[Queries] Could not read queries for scraper {scraper_id}: {e}")
+    return queries or list(DEFAULT_QUERIES)
+
+
+class QueryCounters:
+    def __init__(self, query: str):
+        self.query = query
+        self.pages = 0
+        self.tiles = 0
+        self.new = 0
+        self.duplicates = 0
+        self.stop = "max pages"
+        self.seconds = 0.0
+
+    def __str__(self):
+        return (f"{self.query!r}: {self.pages} pages, {self.tiles} tiles, {self.new} new, "
+                f"{self.duplicates} already seen this run, stopped on {self.stop}, {self.seconds:.1f}s")
+
+
+_DONE = object()
+
+
+class QueryFanout:
+    """Paginate several queries and yield one deduped stream of page item lists.
+
+    iter_pages(driver, query, counters) yields lists of {"url": ...} items for one
+    query. With one driver the queries run back to back on the caller's thread;
+    with several, each driver takes queries from a shared queue on its own thread.
+    """
+
+    def __init__(self, queries, iter_pages, drivers, buffer_pages: int = 8, seen=()):
+        self.queries = list(queries)
+        self.iter_pages = iter_pages
+        self.drivers = list(drivers)
+        self.buffer_pages = buffer_pages
+        self.counters = {q: QueryCounters(q) for q in self.queries}
+        self.started = None
+        self.finished = None
+        # URLs already handed out (e.g. by a resumed run) are not yielded again
+        self._seen = set(seen)
+        self._lock = threading.Lock()
+
+    def _dedupe(self, items, counters):
+        fresh = []
+        with self._lock:
+            for item in items:
+                url = item.get("url")
+                if url in self._seen:
+                    counters.duplicates += 1
+                    continue
+                self._seen.add(url)
+                fresh.append(item)
+            counters.new += len(fresh)
+        return fresh
+
+    def _run_query(self, driver, query):
+        counters = self.counters[query]
+        start = time.perf_counter()
+        try:
+            for items in self.iter_pages(driver, query, counters):
+                yield self._dedupe(items, counters)
+        except Exception as e:
+            counters.stop = f"error: {e}"
+            print(f"[Queries] {query!r} failed: {e}")
+        finally:
+            counters.seconds = time.perf_counter() - start
+
+    def pages(self):
+        self.started = time.perf_counter()
+        try:
+            if len(self.drivers) <= 1 or len(self.queries) <= 1:
+                for query in self.queries:
+                    yield from self._run_query(self.drivers[0], query)
+            else:
+                yield from self._pages_threaded()
+        finally:
+            self.finished = time.perf_counter()
+
+    def _pages_threaded(self):
+        todo = queue.Queue()
+        for query in self.queries:
+            todo.put(query)
+        out = queue.Queue(maxsize=self.buffer_pages)
+        stop = threading.Event()
+
+        def put(obj):
+            while not stop.is_set():
+                try:
+                    out.put(obj, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker(driver):
+            try:
+                while not stop.is_set():
+                    try:
+                        query = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    for items in self._run_query(driver, query):
+                        if not put(items):
+                            return
+            finally:
+                put(_DONE)
+
+        threads = [threading.Thread(target=worker, args=(d,), name=f"search-{i}", daemon=True)
+                   for i, d in enumerate(self.drivers)]
+        for t in threads:
+            t.start()
+        try:
+            remaining = len(threads)
+            while remaining:
+                obj = out.get()
+                if obj is _DONE:
+                    remaining -= 1
+                    continue
+                yield obj
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=5)
+
+    def summary_lines(self):
+        lines = [str(self.counters[q]) for q in self.queries]
+        if self.started is not None and self.finished is not None:
+            serial = sum(c.seconds for c in self.counters.values())
+            wall = self.finished - self.started
+            lines.append(f"{len(self.queries)} queries on {min(len(self.drivers), len(self.queries))} search browsers: "
+                         f"{len(self._seen)} unique URLs, {wall:.1f}s wall vs {serial:.1f}s summed per query")
+        return lines
@@ -0,0 +1,32 @@
+"""
+Status calls from a scraper process to the Rails UI that started it.
+
+Rails passes SCRAPER_ID (and RAILS_BASE_URL) in the environment; without a
+SCRAPER_ID, e.g. when a script is run from a terminal, every call is skipped.
+"""
+import os
+
+import requests
+
+RAILS_BASE_URL = os.environ.get("RAILS_BASE_URL", "http://localhost:4242")
+SCRAPER_ID = os.environ.get("SCRAPER_ID")
+
+
+def send_to_rails(endpoint, data=None):
+    """Send API request to Rails app"""
+    if not SCRAPER_ID:
+        print("[Warning] SCRAPER_ID not set, skipping Rails communication")
+        return
+
+    url = f"{RAILS_BASE_URL}/scrapers/{SCRAPER_ID}/{endpoint}"
+    try:
+        if data:
+            response = requests.post(url, json=data, timeout=10)
+        else:
+            response = requests.post(url, timeout=10)
+        if response.status_code == 200:
+            print(f"[Rails] {endpoint} - success")
+        else:
+            print(f"[Rails] {endpoint} - failed: {response.status_code}")
+    except Exception as e:
+        print(f"[Rails] {endpoint} - error: {e}")
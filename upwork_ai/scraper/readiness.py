@@ -0,0 +1,138 @@
+"""
+Event-driven page readiness plus a separate pacing (jitter) policy.
+
+Instead of a fixed sleep after every navigation, PageReadiness waits on real
+signals: document.readyState, presence of the element the scraper needs, and
+network idle (no new resource entries in the Performance timeline for a short
+window).
+
+Network idle is read from the Performance API rather than from CDP
+Network.requestWillBeSent/loadingFinished events: Selenium's execute_cdp_cmd
+can send CDP commands but does not deliver events, and the same probe works on
+an attached daemon browser and under undetected-chromedriver. The trade-off is
+that only finished requests are visible. A request still in flight has no
+resource entry yet, so a slow XHR started before the window closed is not
+waited for, and websocket traffic never shows up. The element wait is the
+signal that matters for the scrapers; idle is a best effort on top of it. Human-like pacing is then applied as a target total time per page,
+measured from the start of navigation, so only the time still missing is
+slept. Per-page stats record how long the page actually needed versus how
+long a fixed sleep would have taken; the per-page line is only printed when
+verbose (SCRAPER_VERBOSE=1), summary() reports the totals either way.
+"""
+import os
+import random
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+_READY_PROBE_JS = "return [document.readyState, performance.getEntriesByType('resource').length];"
+
+
+def pace_from_env(kind: str, default):
+    """Read a 'min,max' pacing range from SCRAPER_PACE_<KIND>, falling back to default."""
+    raw = os.environ.get(f"SCRAPER_PACE_{kind.upper()}")
+    if not raw:
+        return tuple(default)
+    try:
+        lo, hi = (float(x) for x in raw.split(",", 1))
+        return (lo, hi)
+    except ValueError:
+        print(f"[Readiness] Ignoring malformed SCRAPER_PACE_{kind.upper()}={raw!r}")
+        return tuple(default)
+
+
+def wait_until_ready(driver, css: str = None, timeout: float = 10.0, idle_window: float = 0.5) -> bool:
+    """Block until the page is loaded, `css` is present and the network has gone quiet."""
+    deadline = time.monotonic() + timeout
+    ok = True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
+        )
+        if css:
+            WebDriverWait(driver, max(0.1, deadline - time.monotonic()), poll_frequency=0.1).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, css))
+            )
+    except Exception:
+        ok = False
+
+    # Network idle: resource count unchanged for idle_window (bounded by the overall timeout).
+    # Entries appear when a request finishes, so in-flight XHRs and websockets are not seen
+    last_count = None
+    stable_since = time.monotonic()
+    while time.monotonic() < deadline:
+        try:
+            state, count = driver.execute_script(_READY_PROBE_JS)
+        except Exception:
+            break
+        now = time.monotonic()
+        if count != last_count or state != "complete":
+            last_count = count
+            stable_since = now
+        elif now - stable_since >= idle_window:
+            break
+        time.sleep(0.1)
+    return ok
+
+
+class PageReadiness:
+    """Readiness wait + pacing for one kind of page (search, detail), with stats."""
+
+    def __init__(self, kind: str, pace=(2.0, 4.0), legacy_sleep=None, timeout: float = 10.0, idle_window: float = 0.5,
+                 meter=None, recorder=None, verbose=None):
+        self.kind = kind
+        self.verbose = os.environ.get("SCRAPER_VERBOSE", "") not in ("", "0") if verbose is None else verbose
+        # Optional per-page cost sampler (e.g. scraper.blocking.ResourceBlocker), called once the page is ready
+        self.meter = meter
+        # Optional scraper.corpus.PageRecorder that snapshots every ready page
+        self.recorder = recorder
+        self.pace = pace_from_env(kind, pace)
+        # Mean of the fixed sleep this replaces, for the "removed idle time" figure
+        legacy = legacy_sleep or pace
+        self.legacy_mean = (legacy[0] + legacy[1]) / 2.0
+        self.timeout = timeout
+        self.idle_window = idle_window
+        self.pages = 0
+        self.needed = 0.0
+        self.padded = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def settle(self, driver, started: float, css: str = None, pace=None) -> bool:
+        """Wait for readiness, then sleep only what is left of the pacing target.
+
+        `started` is time.monotonic() taken just before driver.get().
+        """
+        ok = wait_until_ready(driver, css=css, timeout=self.timeout, idle_window=self.idle_window)
+        needed = time.monotonic() - started
+        if self.meter is not None:
+            self.meter.sample(driver)
+        if self.recorder is not None:
+            self.recorder.record(driver, self.kind)
+        lo, hi = pace or self.pace
+        pad = max(0.0, random.uniform(lo, hi) - needed)
+        if pad:
+            time.sleep(pad)
+        with self._lock:
+            self.pages += 1
+            self.needed += needed
+            self.padded += pad
+            if not ok:
+                self.timeouts += 1
+        if self.verbose:
+            print(f"[Readiness] {self.kind}: ready after {needed:.2f}s, paced +{pad:.2f}s "
+                  f"(fixed sleep was ~{self.legacy_mean:.1f}s after load)")
+        return ok
+
+    def summary(self) -> str:
+        if not self.pages:
+            return f"{self.kind}: no pages"
+        avg_needed = self.needed / self.pages
+        avg_padded = self.padded / self.pages
+        # Old flow: load time (≈ needed) + fixed sleep; new flow: needed + pad
+        removed = self.pages * self.legacy_mean - self.padded
+        return (f"{self.kind}: {self.pages} pages, avg needed {avg_needed:.2f}s, avg paced {avg_padded:.2f}s, "
+                f"{self.timeouts} readiness timeouts, ~{removed:.0f}s idle removed vs fixed sleeps")
@@ -0,0 +1,77 @@
+"""
+Lazily created heavy resources shared by the upwork_ai scripts.
+
+main.py, analyze_contact_info.py and debug_job_selectors.py each opened a
+Postgres session at import time (analyze_contact_info exited the process when
+it could not), and original_scrapy.py ran spacy.load() at import, so `import`,
+`--help` or pulling one helper out of a script paid for a connection attempt
+and a model load. These factories build the resource on first call and cache
+it for the rest of the process:
+
+    get_engine(url)    SQLAlchemy engine per URL (create_engine never connects)
+    get_session(url)   the shared ORM session on that engine
+    get_nlp(model)     a loaded spaCy pipeline
+
+SQLAlchemy and spaCy are imported inside the factories, so a script that
+never touches the database or the model never imports them from here.
+Browser drivers follow the same rule: setup_driver() imports
+undetected_chromedriver when it is called. benchmark_imports.py measures the
+resulting import times.
+"""
+import os
+import threading
+
+DEFAULT_DATABASE_URL = "postgresql://postgres@localhost:5432/lead_system_development"
+
+_lock = threading.Lock()
+_engines = {}
+_sessions = {}
+_models = {}
+
+
+def database_url(url: str = None) -> str:
+    return url or os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+
+def get_engine(url: str = None, **kwargs):
+    """The process-wide engine for url (DATABASE_URL by default); kwargs only apply on first call."""
+    url = database_url(url)
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            from sqlalchemy import create_engine
+            kwargs.setdefault("pool_pre_ping", True)
+            engine = _engines[url] = create_engine(url, **kwargs)
+    return engine
+
+
+def get_session(url: str = None):
+    """The shared ORM session on get_engine(url), created on first use."""
+    url = database_url(url)
+    engine = get_engine(url)
+    with _lock:
+        session = _sessions.get(url)
+        if session is None:
+            from sqlalchemy.orm import Session
+            session = _sessions[url] = Session(bind=engine)
+    return session
+
+
+def close_session(url: str = None) -> bool:
+    """Close the shared session for url if one was ever created; True when it was."""
+    with _lock:
+        session = _sessions.pop(database_url(url), None)
+    if session is None:
+        return False
+    session.close()
+    return True
+
+
+def get_nlp(model: str = "en_core_web_sm"):
+    """spacy.load(model), once per process."""
+    with _lock:
+        nlp = _models.get(model)
+        if nlp is None:
+            import spacy
+            nlp = _models[model] = spacy.load(model)
+    return nlp
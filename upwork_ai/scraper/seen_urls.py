@@ -0,0 +1,184 @@
+"""
+Persistent membership index of job URLs already stored in job_listings.
+
+The index is a sorted array of 64-bit BLAKE2 hashes written to a local file
+and memory-mapped at startup, so collectors can skip known jobs without any
+network I/O. It is refreshed incrementally from rows whose created_at is newer
+than the last snapshot. A hit only means "probably stored"; callers confirm
+hits against the database with fetch_known_urls(), which compares the same
+normalized form the hashes are built from (no query string or trailing slash;
+job_listings has an expression index on it).
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+DEFAULT_PATH = os.environ.get(
+    "SEEN_URLS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "seen_urls.idx"),
+)
+
+_MAGIC = b"SEENURL1"
+# magic, entry count, watermark (created_at ISO string, NUL padded)
+_HEADER = struct.Struct("<8sQ32s")
+_ENTRY = struct.Struct("<Q")
+
+
+# Same normalization as normalize_url(), for the index index_job_listings_on_normalized_job_url
+_NORMALIZED_JOB_URL_SQL = "rtrim(split_part(btrim(job_url), '?', 1), '/')"
+
+
+def normalize_url(job_url: str) -> str:
+    """job_url without query string or trailing slash, the form url_hash() and fetch_known_urls() compare."""
+    return (job_url or "").strip().split("?", 1)[0].rstrip("/")
+
+
+def url_hash(job_url: str) -> int:
+    """Stable 64-bit hash of a normalized job URL."""
+    return int.from_bytes(hashlib.blake2b(normalize_url(job_url).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def fetch_known_urls(conn, job_urls):
+    """Return the subset of job_urls stored in job_listings, matched by normalized URL (one indexed query)."""
+    by_key = {}
+    for url in job_urls:
+        if url:
+            by_key.setdefault(normalize_url(url), set()).add(url)
+    if not by_key:
+        return set()
+    rows = conn.execute(
+        text(f"SELECT DISTINCT {_NORMALIZED_JOB_URL_SQL} FROM job_listings WHERE {_NORMALIZED_JOB_URL_SQL} = ANY(:keys)"),
+        {"keys": list(by_key)},
+    )
+    return {url for row in rows for url in by_key.get(row[0], ())}
+
+
+class SeenUrlFilter:
+    """Sorted hash array backed by an mmap'd file, plus an in-memory delta."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.watermark = None
+        self._file = None
+        self._mmap = None
+        self._base = ()
+        self._delta = set()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH):
+        seen = cls(path)
+        if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+            return seen
+        try:
+            seen._file = open(path, "rb")
+            seen._mmap = mmap.mmap(seen._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, mark = _HEADER.unpack_from(seen._mmap, 0)
+            if magic != _MAGIC or _HEADER.size + count * _ENTRY.size > len(seen._mmap):
+                print(f"[SeenUrls] Ignoring unreadable index at {path}")
+                seen.close()
+                return cls(path)
+            seen._base = memoryview(seen._mmap)[_HEADER.size:_HEADER.size + count * _ENTRY.size].cast("Q")
+            mark = mark.rstrip(b"\0").decode("ascii")
+            seen.watermark = datetime.fromisoformat(mark) if mark else None
+        except Exception as e:
+            print(f"[SeenUrls] Could not load {path}: {e}")
+            seen.close()
+            return cls(path)
+        return seen
+
+    def __len__(self):
+        return len(self._base) + len(self._delta)
+
+    def __contains__(self, job_url):
+        return self._has(url_hash(job_url))
+
+    def _has(self, h):
+        if h in self._delta:
+            return True
+        i = bisect.bisect_left(self._base, h)
+        return i < len(self._base) and self._base[i] == h
+
+    def add(self, job_url):
+        self._delta.add(url_hash(job_url))
+
+    def refresh(self, conn, batch_size: int = 5000) -> int:
+        """Pull job URLs created since the last snapshot; returns the number of rows read."""
+        sql = "SELECT job_url, created_at FROM job_listings"
+        params = {}
+        if self.watermark is not None:
+            # >= so rows sharing the watermark timestamp are never missed; those are already
+            # indexed and not added to the delta again, so save() has nothing to rewrite
+            sql += " WHERE created_at >= :since"
+            params["since"] = self.watermark
+        result = conn.execute(text(sql), params)
+        read = 0
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for job_url, created_at in rows:
+                h = url_hash(job_url)
+                if not self._has(h):
+                    self._delta.add(h)
+                if created_at is not None and (self.watermark is None or created_at > self.watermark):
+                    self.watermark = created_at
+            read += len(rows)
+        return read
+
+    def save(self):
+        """Merge the delta into the sorted array and atomically rewrite the file."""
+        if not self._delta and self._mmap is not None:
+            return
+        merged = sorted(set(self._base).union(self._delta))
+        mark = self.watermark.isoformat().encode("ascii") if self.watermark else b""
+        # A per-process temp file, so two scrapers saving at once cannot write into each other's
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                                        dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(merged), mark))
+                f.write(struct.pack(f"<{len(merged)}Q", *merged))
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.close()
+        os.replace(tmp_path, self.path)
+        fresh = SeenUrlFilter.load(self.path)
+        self.__dict__.update(fresh.__dict__)
+
+    def close(self):
+        if isinstance(self._base, memoryview):
+            self._base.release()
+        self._base = ()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_seen_urls(engine, path: str = DEFAULT_PATH):
+    """Load the on-disk index, catch up from the database and persist the snapshot."""
+    start = time.perf_counter()
+    seen = SeenUrlFilter.load(path)
+    loaded = len(seen)
+    if engine is not None:
+        try:
+            with engine.connect() as conn:
+                read = seen.refresh(conn)
+            seen.save()
+            print(f"[SeenUrls] {loaded} cached + {read} refreshed rows -> {len(seen)} known URLs "
+                  f"({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            print(f"[SeenUrls] Refresh failed ({e}); using cached index only")
+    return seen
@@ -0,0 +1,22 @@
+"""
+Where the scrapers point: the real site by default, or a local stand-in.
+
+Set UPWORK_BASE_URL (e.g. http://127.0.0.1:8765, as started by
+mock_upwork_server.py) to run every collector against another host.
+"""
+import os
+from urllib.parse import quote_plus, urlparse
+
+UPWORK_BASE_URL = os.environ.get("UPWORK_BASE_URL", "https://www.upwork.com").rstrip("/")
+LOGIN_URL = f"{UPWORK_BASE_URL}/ab/account-security/login"
+SEARCH_URL_TEMPLATE = UPWORK_BASE_URL + "/nx/search/jobs/?q={query}&sort=recency&page={page}&per_page=50"
+
+
+def search_url(query: str, page: int) -> str:
+    return SEARCH_URL_TEMPLATE.format(query=quote_plus(query), page=page)
+
+
+def cookie_domain() -> str:
+    """Registrable part of the base host ("upwork.com"), for filtering exported cookies."""
+    host = urlparse(UPWORK_BASE_URL).hostname or ""
+    return host[4:] if host.startswith("www.") else host
@@ -0,0 +1,142 @@
+"""
+Self-ordering registry of extraction strategies.
+
+Each field (title, description, ...) has several named strategies. The
+registry records, per field and strategy, a decayed hit rate and average
+cost, persists them to a JSON file across runs, and tries strategies best
+first: highest smoothed hit rate, then cheapest, then declared order. When
+Upwork changes markup, the strategies that start failing sink within a few
+jobs instead of being paid for on every page.
+
+Catch-all strategies registered in `fallbacks` (whole-page text scans and the
+like) are exempt: they "hit" on almost any page, so ranking them by hit rate
+would let them overtake the precise selectors for good. They always run last,
+in declared order, however their stats look.
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "SCRAPER_STRATEGY_STATS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "strategy_stats.json"),
+)
+
+
+class StrategyRegistry:
+    def __init__(self, path: str = DEFAULT_PATH, decay: float = 0.98):
+        self.path = path
+        self.decay = decay
+        self.stats = {}
+        self.jobs = 0
+        self.failed_lookups = 0
+        self.run_stats = {}
+        # (field, name) pairs whose time is also reported on its own, e.g. whole-page text scans
+        self.fallbacks = set()
+        self.fallback_seconds = 0.0
+        self._lock = threading.Lock()
+        self._loaded = True
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH):
+        registry = cls.lazy(path)
+        registry._ensure_loaded()
+        return registry
+
+    @classmethod
+    def lazy(cls, path: str = DEFAULT_PATH):
+        """A registry that reads its stats file on first use rather than at construction."""
+        registry = cls(path)
+        registry._loaded = False
+        return registry
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.stats = json.load(f).get("fields", {})
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"[Strategies] Ignoring unreadable stats file {self.path}: {e}")
+            self._loaded = True
+
+    def save(self):
+        self._ensure_loaded()
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            payload = {"updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "fields": self.stats}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _entry(self, field, name):
+        return self.stats.setdefault(field, {}).setdefault(name, {"tries": 0.0, "hits": 0.0, "cost": 0.0})
+
+    def _score(self, field, name):
+        e = self.stats.get(field, {}).get(name)
+        if not e:
+            return (0.5, 0.0)  # untried: neutral prior, assumed free
+        return ((e["hits"] + 1.0) / (e["tries"] + 2.0), e["cost"])
+
+    def ordered(self, field, strategies):
+        """strategies: [(name, fn)] in declared order; returns them best first, fallbacks last."""
+        self._ensure_loaded()
+
+        def key(pair):
+            index, (name, _) = pair
+            if (field, name) in self.fallbacks:
+                return (1, 0.0, 0.0, index)
+            rate, cost = self._score(field, name)
+            return (0, -rate, cost, index)
+
+        return [s for _, s in sorted(enumerate(strategies), key=key)]
+
+    def record(self, field, name, hit: bool, seconds: float):
+        self._ensure_loaded()
+        with self._lock:
+            e = self._entry(field, name)
+            e["tries"] = e["tries"] * self.decay + 1.0
+            e["hits"] = e["hits"] * self.decay + (1.0 if hit else 0.0)
+            e["cost"] = seconds if e["tries"] <= 1.0 else e["cost"] * 0.8 + seconds * 0.2
+            r = self.run_stats.setdefault((field, name), [0, 0, 0.0])
+            r[0] += 1
+            r[1] += 1 if hit else 0
+            r[2] += seconds
+            if not hit:
+                self.failed_lookups += 1
+            if (field, name) in self.fallbacks:
+                self.fallback_seconds += seconds
+
+    def extract(self, field, strategies, accept=bool):
+        """Try strategies best first; returns (value, strategy_name) or (None, None)."""
+        for name, fn in self.ordered(field, strategies):
+            start = time.perf_counter()
+            try:
+                value = fn()
+            except Exception:
+                value = None
+            hit = value is not None and accept(value)
+            self.record(field, name, hit, time.perf_counter() - start)
+            if hit:
+                return value, name
+        return None, None
+
+    def job_done(self):
+        with self._lock:
+            self.jobs += 1
+
+    def summary_lines(self):
+        lines = []
+        for (field, name), (tries, hits, seconds) in sorted(self.run_stats.items()):
+            lines.append(f"{field}/{name}: {hits}/{tries} hits, avg {seconds / tries * 1000:.0f} ms")
+        if self.jobs:
+            lines.append(f"Avg failed lookups per job: {self.failed_lookups / self.jobs:.2f}")
+        if self.fallbacks:
+            lines.append(f"Fallback strategies: {self.fallback_seconds:.2f}s total")
+        return lines
@@ -0,0 +1,59 @@
+"""
+Single round-trip text-block scan for the description fallbacks.
+
+Description strategies 4 (largest div inside <main>) and 6 (body text minus
+header/footer lines) used to call .text on every div through WebDriver, one
+HTTP round trip per element. TEXT_BLOCKS_JS does the same walk inside the
+page and returns the winning block, a selector path to it, and the body
+slice, so both fallbacks cost one call.
+"""
+import time
+
+# Length bounds and line slicing mirror page_parser.largest_text_block / body_text_slice
+TEXT_BLOCKS_JS = r"""
+const pathOf = (el) => {
+  const parts = [];
+  for (let node = el; node && node.nodeType === 1 && node !== document.body; node = node.parentElement) {
+    let part = node.tagName.toLowerCase();
+    if (node.id) { parts.unshift(part + "#" + node.id); break; }
+    const dataTest = node.getAttribute("data-test");
+    if (dataTest) {
+      part += "[data-test='" + dataTest + "']";
+    } else if (node.parentElement) {
+      const siblings = Array.from(node.parentElement.children).filter((s) => s.tagName === node.tagName);
+      if (siblings.length > 1) part += ":nth-of-type(" + (siblings.indexOf(node) + 1) + ")";
+    }
+    parts.unshift(part);
+  }
+  return parts.join(" > ");
+};
+let block = null, blockPath = null;
+const main = document.querySelector("main");
+if (main) {
+  let best = "";
+  let bestEl = null;
+  for (const div of main.querySelectorAll("div")) {
+    const text = (div.innerText || "").trim();
+    if (text.length > 20 && text.length < 10000 && text.length > best.length) { best = text; bestEl = div; }
+  }
+  if (bestEl) { block = best; blockPath = pathOf(bestEl); }
+}
+let body = null;
+if (document.body) {
+  const lines = (document.body.innerText || "").split("\n").map((l) => l.trim()).filter((l) => l.length > 10);
+  if (lines.length > 5) body = lines.slice(2, -3).join("\n");
+}
+return {block: block, path: blockPath, body: body};
+"""
+
+
+def scan_text_blocks(driver):
+    """Return ({block, path, body}, seconds) for the current page; missing parts are None."""
+    start = time.perf_counter()
+    try:
+        result = driver.execute_script(TEXT_BLOCKS_JS) or {}
+    except Exception as e:
+        print(f"[TextBlocks] Script scan failed: {e}")
+        result = {}
+    scan = {key: result.get(key) for key in ("block", "path", "body")}
+    return scan, time.perf_counter() - start
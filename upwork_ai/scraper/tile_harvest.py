@@ -0,0 +1,59 @@
+"""
+Single round-trip harvest of Upwork search result tiles.
+
+One injected script walks every job tile on the current search page and
+returns plain JSON, replacing the per-card find_element probes (each of
+which is a WebDriver HTTP call, and each miss an exception).
+"""
+import time
+
+# Selector order mirrors the per-element XPaths in run_upwork_latest.harvest_tiles_per_element
+TILE_HARVEST_JS = r"""
+const cards = document.querySelectorAll("article[data-test='JobTile'], section[data-test*='job-tile']");
+const linkSelectors = ["h2 a", "h4 a", "a[data-test='job-title']"];
+const dateSelectors = [
+  "small[data-test*='published-date']",
+  "small[data-test*='pubilshed-date']",
+  "small[data-test*='posted']",
+  "small[data-test*='date']",
+];
+const clean = (s) => (s || "").replace(/\s+/g, " ").trim();
+const out = [];
+for (const card of cards) {
+  let link = null;
+  for (const sel of linkSelectors) {
+    const el = card.querySelector(sel);
+    if (el && el.href) { link = el; break; }
+  }
+  let label = null;
+  for (const sel of dateSelectors) {
+    const small = card.querySelector(sel);
+    if (!small) continue;
+    const spans = small.querySelectorAll("span");
+    const text = spans.length ? clean(spans[spans.length - 1].innerText) : "";
+    if (text) { label = text; break; }
+  }
+  out.push({
+    href: link ? link.href : null,
+    date_label: label,
+    title: link ? clean(link.innerText) : null,
+    snippet: clean(card.innerText).slice(0, 400),
+  });
+}
+return out;
+"""
+
+
+def harvest_tiles(driver):
+    """Return ([{href, date_label, title, snippet}, ...], seconds) for the current page.
+
+    Returns an empty list when the script fails or finds no tiles, so callers can
+    fall back to the per-element path.
+    """
+    start = time.perf_counter()
+    try:
+        tiles = driver.execute_script(TILE_HARVEST_JS) or []
+    except Exception as e:
+        print(f"[Harvest] Script harvest failed: {e}")
+        tiles = []
+    return [t for t in tiles if isinstance(t, dict)], time.perf_counter() - start
@@ -1,9 +1,11 @@
 from bs4 import BeautifulSoup
 
+from scraper.site import UPWORK_BASE_URL
+
 class UpworkScraper:
     def __init__(self, driver):
         self.driver = driver
-        self.jobs_url = 'https://www.upwork.com/jobs/'
+        self.jobs_url = f'{UPWORK_BASE_URL}/jobs/'
     
     def scrape_jobs(self):
         try:
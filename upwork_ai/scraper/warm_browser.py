@@ -0,0 +1,151 @@
+"""
+Attach scraper runs to a long-lived, logged-in Chrome kept by browser_daemon.py.
+
+The daemon starts Chrome once with --remote-debugging-port on the stable
+profile and records its debuggerAddress in a small state file. A run checks
+that the address answers, takes the run lease (one run drives the browser at
+a time; the daemon's health checks skip while it is held) and attaches a
+ChromeDriver session via debuggerAddress, which takes well under a second
+instead of a cold Chrome start plus a login handshake.
+
+Session health is read from the auth cookies themselves: login is only needed
+when none of them is present and unexpired.
+
+Page.addScriptToEvaluateOnNewDocument scripts outlive the ChromeDriver
+session that added them, so the stealth patches are registered once per
+daemon Chrome and tab. The state file records which one has them
+(PREPARED_KEY); the daemon carries that entry over when it rewrites the file.
+"""
+import fcntl
+import json
+import os
+import time
+
+import requests
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as SeleniumOptions
+
+from scraper.detail_pool import export_cookies
+from scraper.site import cookie_domain
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = os.environ.get("SCRAPER_DAEMON_STATE", os.path.join(_BASE_DIR, "browser_daemon.json"))
+LEASE_PATH = STATE_PATH + ".lease"
+# Cookies Upwork sets for a signed-in user; any one of them unexpired counts as logged in
+AUTH_COOKIES = [c.strip() for c in os.environ.get(
+    "SCRAPER_AUTH_COOKIES", "master_access_token,oauth2_global_js_token,console_user,user_uid"
+).split(",") if c.strip()]
+PREPARED_KEY = "stealth_registered_for"
+
+
+def read_state(path: str = STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_state(state, path: str = STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def daemon_address(path: str = STATE_PATH, timeout: float = 0.5):
+    """debuggerAddress of a live daemon browser, or None."""
+    address = read_state(path).get("debugger_address")
+    if not address:
+        return None
+    try:
+        requests.get(f"http://{address}/json/version", timeout=timeout).raise_for_status()
+        return address
+    except Exception:
+        return None
+
+
+def attach_driver(address: str, page_load_strategy: str = "normal"):
+    opts = SeleniumOptions()
+    opts.debugger_address = address
+    opts.page_load_strategy = page_load_strategy
+    return webdriver.Chrome(options=opts)
+
+
+def _target(driver, state):
+    """The daemon Chrome (by pid) and tab (window handle = CDP target id) the driver is on."""
+    return f"{state.get('chrome_pid')}:{driver.current_window_handle}"
+
+
+def stealth_registered(driver, path: str = STATE_PATH) -> bool:
+    """True when this daemon Chrome tab already carries the stealth scripts from an earlier run."""
+    state = read_state(path)
+    return bool(state.get("chrome_pid")) and state.get(PREPARED_KEY) == _target(driver, state)
+
+
+def record_stealth(driver, path: str = STATE_PATH):
+    """Remember that the stealth scripts are registered on the driver's daemon tab; call under the RunLease."""
+    state = read_state(path)
+    if state.get("chrome_pid"):
+        state[PREPARED_KEY] = _target(driver, state)
+        write_state(state, path)
+
+
+def detach_driver(driver):
+    """End the ChromeDriver session without closing the daemon's browser."""
+    try:
+        driver.service.stop()
+    except Exception as e:
+        print(f"[Daemon] Could not stop chromedriver cleanly: {e}")
+
+
+def session_status(driver, now: float = None):
+    """(logged_in, earliest auth cookie expiry as epoch seconds or None for session cookies)."""
+    now = now or time.time()
+    domain = cookie_domain()
+    expiries = []
+    try:
+        cookies = export_cookies(driver)
+    except Exception as e:
+        print(f"[Daemon] Could not read cookies: {e}")
+        return False, None
+    for c in cookies:
+        if c.get("name") not in AUTH_COOKIES or domain not in c.get("domain", ""):
+            continue
+        expires = c.get("expires", -1)
+        if c.get("session") or expires in (-1, 0, None):
+            expiries.append(None)
+        elif expires > now:
+            expiries.append(expires)
+    if not expiries:
+        return False, None
+    dated = [e for e in expiries if e is not None]
+    return True, (min(dated) if dated else None)
+
+
+class RunLease:
+    """Exclusive, non-blocking lock on the daemon browser for the length of a run."""
+
+    def __init__(self, path: str = LEASE_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        self._file = open(self.path, "a+")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
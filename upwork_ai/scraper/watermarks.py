@@ -0,0 +1,151 @@
+"""
+Per-query crawl high-water marks stored in the Rails crawl_watermarks table.
+
+Search results are sorted by recency, so once a collector reaches the newest
+job stored by the last successful run, every later tile has been seen before
+and pagination can stop.
+
+The mark only moves past jobs that were dealt with. The collector observe()s
+every tile in page order (newest first) and hold()s each job it queues for
+scraping; the writer release()s a job once its write committed. On save the
+mark advances to the newest observed job that is older than every job still
+held, so a job whose scrape or write failed is paginated again next run.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+_LABEL_HOURS = [("minute", 1 / 60.0), ("hour", 1.0), ("day", 24.0), ("week", 24.0 * 7), ("month", 24.0 * 30)]
+
+
+def posted_at_from_label(label, now=None):
+    """Posting time for an Upwork relative label ("3 hours ago", "yesterday"), or None without a label.
+
+    main.py and run_upwork_latest.py keep their marks in the same (source, query) rows, so both
+    turn labels into timestamps here rather than with their own date parsers.
+    """
+    if not label:
+        return None
+    now = now or datetime.now()
+    s = label.lower()
+    if "just now" in s or "second" in s:
+        return now
+    if "yesterday" in s:
+        return now - timedelta(days=1)
+    try:
+        n = int(s.split()[0])
+    except (IndexError, ValueError):
+        return now
+    for unit, hours in _LABEL_HOURS:
+        if unit in s:
+            return now - timedelta(hours=n * hours)
+    return now
+
+
+class CrawlWatermark:
+    def __init__(self, query: str, source: str = "upwork", job_url=None, posted_at=None):
+        self.query = query
+        self.source = source
+        self.job_url = job_url
+        self.posted_at = posted_at
+        self.seen = []  # (job_url, posted_at) in collection order, newest first
+        self.held = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn, query: str, source: str = "upwork"):
+        row = conn.execute(
+            text("SELECT last_job_url, last_posted_at FROM crawl_watermarks WHERE source = :source AND query = :query"),
+            {"source": source, "query": query},
+        ).first()
+        if row is None:
+            return cls(query, source)
+        return cls(query, source, job_url=row[0], posted_at=row[1])
+
+    def __str__(self):
+        if not self.job_url:
+            return f"{self.source}:{self.query} (no watermark)"
+        return f"{self.source}:{self.query} at {self.job_url} ({self.posted_at})"
+
+    def crossed(self, job_url, posted_at=None, slack=timedelta(hours=1)) -> bool:
+        """True once the collector reaches the marked job, or a job clearly older than it.
+
+        Relative labels ("2 hours ago") are coarse, hence the slack on the timestamp check.
+        """
+        if self.job_url and job_url == self.job_url:
+            return True
+        if self.posted_at is not None and posted_at is not None:
+            return posted_at < self.posted_at - slack
+        return False
+
+    def observe(self, job_url, posted_at=None):
+        """Record a collected job; jobs must be observed in collection order."""
+        if job_url:
+            self.seen.append((job_url, posted_at))
+
+    def hold(self, job_url):
+        """Keep the mark from passing job_url until release(job_url)."""
+        with self._lock:
+            self.held.add(job_url)
+
+    def release(self, job_url):
+        """job_url was written; may be called from a writer thread."""
+        with self._lock:
+            self.held.discard(job_url)
+
+    def next_mark(self):
+        """(job_url, posted_at) the mark can advance to, or None when no observed job is safe to pass."""
+        with self._lock:
+            held = set(self.held)
+        start = 0
+        for i, (job_url, _) in enumerate(self.seen):
+            if job_url in held:
+                start = i + 1
+        return self.seen[start] if start < len(self.seen) else None
+
+    def save(self, conn):
+        """Advance the stored mark as far as next_mark() allows; call only after a run that ended normally."""
+        mark = self.next_mark()
+        if mark is None or mark[0] == self.job_url:
+            return False
+        now = datetime.utcnow()
+        conn.execute(
+            text(
+                """
+                INSERT INTO crawl_watermarks (source, query, last_job_url, last_posted_at, last_run_at, created_at, updated_at)
+                VALUES (:source, :query, :job_url, :posted_at, :now, :now, :now)
+                ON CONFLICT (source, query) DO UPDATE SET
+                    last_job_url = EXCLUDED.last_job_url,
+                    last_posted_at = EXCLUDED.last_posted_at,
+                    last_run_at = EXCLUDED.last_run_at,
+                    updated_at = EXCLUDED.updated_at
+                """
+            ),
+            {"source": self.source, "query": self.query, "job_url": mark[0], "posted_at": mark[1], "now": now},
+        )
+        self.job_url, self.posted_at = mark
+        return True
+
+
+def load_watermark(engine, query: str, source: str = "upwork"):
+    """Load the mark for a query; an unreachable DB yields an empty mark (full pagination)."""
+    if engine is None:
+        return CrawlWatermark(query, source)
+    try:
+        with engine.connect() as conn:
+            return CrawlWatermark.load(conn, query, source)
+    except Exception as e:
+        print(f"[Watermark] Could not load watermark for {query!r}: {e}")
+        return CrawlWatermark(query, source)
+
+
+def save_watermark(engine, watermark):
+    if engine is None:
+        return False
+    try:
+        with engine.begin() as conn:
+            return watermark.save(conn)
+    except Exception as e:
+        print(f"[Watermark] Could not save watermark for {watermark.query!r}: {e}")
+        return False
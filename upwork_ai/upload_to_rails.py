@@ -1,8 +1,30 @@
+"""
+Incrementally sync relevant job listings to the Rails API.
+
+    python3 upwork_ai/upload_to_rails.py                 # only rows changed since the last sync
+    python3 upwork_ai/upload_to_rails.py --full          # ignore the watermark and re-send everything
+    python3 upwork_ai/upload_to_rails.py --workers 8 --chunk 2000
+
+Rows are read through a server-side (named) cursor in --chunk sized pieces, ordered by
+(updated_at, id), so memory stays flat whatever the table size. Each chunk is split into
+bulk requests (scraper/api_upload.py) sent by --workers threads, each on its own keep-alive
+session. The (updated_at, id) of the last row of every fully uploaded chunk is saved to
+UPLOAD_STATE_PATH, in chunk order, so a rerun only sends rows changed since then and a
+failed chunk is re-sent next time. Tables without updated_at fall back to date_added.
+"""
+import argparse
 import json
-import psycopg2
-import requests
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import psycopg2
+
+from scraper.api_upload import BulkUploader
+
 # Database connection parameters
 DATABASE_CONFIG = {
     'dbname': 'upwork_scraper',
@@ -13,7 +35,13 @@ DATABASE_CONFIG = {
 }
 
 # Rails API endpoint URL
-RAILS_API_URL = "http://localhost:3000/api/job_listings"
+RAILS_API_URL = os.environ.get("RAILS_API_URL", "http://localhost:3000/api/job_listings")
+
+STATE_PATH = os.environ.get("UPLOAD_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "upload_state.json"))
+
+COLUMNS = ["id", "job_url", "title", "description", "location", "post_date", "posted_time",
+           "job_link", "relevance", "website_present", "website_url", "website_type", "date_added"]
+
 
 # Helper function to format datetime objects as strings
 def format_datetime(value):
@@ -21,56 +49,161 @@ def format_datetime(value):
         return value.isoformat()
     return value
 
-# Function to fetch job listings from the database and upload to Rails
-def fetch_job_listings():
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def watermark_column(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'job_listings'")
+        columns = {row[0] for row in cursor.fetchall()}
+    return "updated_at" if "updated_at" in columns else "date_added"
+
+
+def iter_changed_chunks(conn, column, watermark, chunk_size):
+    """Yield lists of (listing, (changed_at, id)) for relevant rows after the watermark, in key order."""
+    changed = f"COALESCE({column}, 'epoch'::timestamp)"
+    sql = f"SELECT {', '.join(COLUMNS)}, {changed} FROM job_listings WHERE relevance = TRUE"
+    params = ()
+    if watermark:
+        sql += f" AND ({changed}, id) > (%s::timestamp, %s)"
+        params = tuple(watermark)
+    sql += f" ORDER BY {changed}, id"
+    # Named cursor: rows stay on the server and arrive chunk_size at a time
+    with conn.cursor(name="job_listings_sync") as cursor:
+        cursor.itersize = chunk_size
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            chunk = []
+            for row in rows:
+                record = dict(zip(COLUMNS, row))
+                listing = {key: format_datetime(record[key]) for key in COLUMNS if key != "id"}
+                chunk.append((listing, (format_datetime(row[-1]), record["id"])))
+            yield chunk
+
+
+class ChunkSync:
+    """Upload chunks concurrently; advance the watermark only past chunks that fully succeeded, in order."""
+
+    def __init__(self, uploader, workers, batch_size, state):
+        self.uploader = uploader
+        self.batch_size = batch_size
+        self.state = state
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+        self.in_flight = threading.BoundedSemaphore(workers * 2)  # chunks held in memory at once
+        self.local = threading.local()
+        self.pending = deque()  # (last key, rows, future) in chunk order
+        self.blocked = False
+        self.sent = 0
+        self.failed = 0
+
+    def session(self):
+        if getattr(self.local, "session", None) is None:
+            self.local.session = self.uploader.connect()
+        return self.local.session
+
+    def upload_chunk(self, listings):
+        try:
+            errors = []
+            for start in range(0, len(listings), self.batch_size):
+                batch = listings[start:start + self.batch_size]
+                try:
+                    errors.extend(self.uploader.write_batch(self.session(), batch))
+                except Exception as e:
+                    errors.extend([e] * len(batch))
+            for listing, error in zip(listings, errors):
+                if error is not None:
+                    print(f"Failed to upload {listing['job_url']}: {error}")
+            return sum(error is not None for error in errors)
+        finally:
+            self.in_flight.release()
+
+    def submit(self, chunk):
+        self.in_flight.acquire()  # backpressure: the cursor waits while workers*2 chunks are pending
+        future = self.pool.submit(self.upload_chunk, [listing for listing, _ in chunk])
+        self.pending.append((chunk[-1][1], len(chunk), future))
+        self.advance()
+
+    def advance(self, wait=False):
+        while self.pending and (wait or self.pending[0][2].done()):
+            key, size, future = self.pending.popleft()
+            failures = future.result()
+            self.sent += size - failures
+            self.failed += failures
+            if failures:
+                self.blocked = True
+            if not self.blocked:
+                self.state["watermark"] = list(key)
+                self.state["synced_at"] = datetime.now().isoformat(timespec="seconds")
+                save_state(self.state)
+
+    def close(self):
+        self.advance(wait=True)
+        self.pool.shutdown()
+
+
+# Function to fetch changed job listings from the database and upload them to Rails
+def fetch_job_listings(chunk_size=1000, workers=4, batch_size=50, full=False):
+    started = time.perf_counter()
+    state = {} if full else load_state()
+    uploader = BulkUploader(RAILS_API_URL, batch_size=batch_size)
+    sync = None
     try:
         # Connect to the PostgreSQL database
         conn = psycopg2.connect(**DATABASE_CONFIG)
-        cursor = conn.cursor()
-
-        # Fetch job listings with only essential fields
-        cursor.execute("""
-            SELECT id, job_url, title, description, location, post_date, posted_time,
-                   job_link, relevance, website_present, website_url, website_type, date_added
-            FROM job_listings
-            WHERE relevance = TRUE;
-        """)
-        rows = cursor.fetchall()
-
-        # Loop through each listing and submit to the Rails API
-        for row in rows:
-            job_listing = {
-                "job_url": row[1],
-                "title": row[2],
-                "description": row[3],
-                "location": row[4],
-                "post_date": format_datetime(row[5]),
-                "posted_time": format_datetime(row[6]),
-                "job_link": row[7],
-                "relevance": row[8],
-                "website_present": row[9],
-                "website_url": row[10],
-                "website_type": row[11],
-                "date_added": format_datetime(row[12])  # Include date_added
-            }
-
-            # Send a POST request to the Rails API
+        try:
+            column = watermark_column(conn)
+            if state.get("column") not in (None, column):
+                state = {}
+            state["column"] = column
+            print(f"Syncing relevant listings changed after {state.get('watermark') or 'the beginning'} (by {column})")
+            sync = ChunkSync(uploader, workers, batch_size, state)
             try:
-                response = requests.post(RAILS_API_URL, json={"job_listing": job_listing})
-                if response.status_code == 201:
-                    print(f"Job listing {row[0]} uploaded successfully.")
-                else:
-                    print(f"Failed to upload job listing {row[0]}: {response.status_code} - {response.text}")
-            except requests.exceptions.RequestException as e:
-                print(f"Error sending data for job listing {row[0]}: {e}")
-
-        # Close database connection
-        cursor.close()
-        conn.close()
+                for chunk in iter_changed_chunks(conn, column, state.get("watermark"), chunk_size):
+                    sync.submit(chunk)
+            finally:
+                # Chunks already uploaded still move the watermark if the cursor fails part way
+                sync.close()
+        finally:
+            conn.close()
     except psycopg2.Error as e:
         print(f"Database connection or query error: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    if sync is None:
+        return
+    elapsed = time.perf_counter() - started
+    print(f"Uploaded {sync.sent} listings ({sync.failed} failed) in {elapsed:.1f}s; "
+          f"{uploader.requests} requests, {uploader.retried} retries")
+    if sync.blocked:
+        print("Watermark held at the first failed chunk; failed listings are re-sent on the next run")
+    print(f"Watermark: {state.get('watermark')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync relevant job listings to the Rails API")
+    parser.add_argument("--chunk", type=int, default=1000, help="Rows fetched from the server-side cursor at a time")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent upload connections")
+    parser.add_argument("--batch", type=int, default=50, help="Listings per bulk request")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved watermark and re-send every row")
+    args = parser.parse_args()
+    fetch_job_listings(chunk_size=args.chunk, workers=args.workers, batch_size=args.batch, full=args.full)
+
 
 if __name__ == "__main__":
-    fetch_job_listings()
+    main()